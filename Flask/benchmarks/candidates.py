@@ -0,0 +1,78 @@
+"""Joint candidate generation with per-section Python loops versus the NumPy eligibility
+matrices of schedule_eligibility, at 5000 sections and 200 rooms.
+
+Only the (section, professor, start block, room) candidates are enumerated; no model is
+built, since the joint formulation at this size is far too large to solve.
+
+Run from the Flask directory:
+    python -m benchmarks.candidates
+"""
+import random
+import time
+import numpy as np
+from models import db, Professor, TimeSlot
+from schedule_eligibility import Eligibility
+from schedule_presolve import eligible_rooms
+from schedule_snapshot import load_snapshot
+from benchmarks.catalog import make_app, seed_catalog
+
+NUM_COURSES = 1250
+SECTIONS_PER_COURSE = 4
+NUM_ROOMS = 200
+NUM_PROFESSORS = 300
+RESTRICTED_SLOTS_PER_PROFESSOR = 2
+
+
+def loop_candidates(inputs):
+    """Count the candidates the way the formulations used to: capacity, room restriction
+    and professor restriction checks inside the nested per-section loops."""
+    restricted_by_prof = {prof_id: set(slot_ids) for prof_id, slot_ids in inputs["restricted_slots_by_prof"].items()}
+    count = 0
+    for course in inputs["courses"]:
+        ts_list = inputs["time_slots_by_day"].get(course.meeting_days, [])
+        available_profs = inputs["course_to_professors"].get(course.id, [])
+        course_rooms = eligible_rooms(course, inputs["rooms"], inputs["room_restrictions_map"])
+        duration = course.slots_needed
+        for sec in inputs["sections_by_course"].get(course.id, []):
+            for prof_id in available_profs:
+                for start_index in range(len(ts_list) - duration + 1):
+                    block_slot_ids = tuple(ts.id for ts in ts_list[start_index: start_index + duration])
+                    if restricted_by_prof.get(prof_id, set()).intersection(block_slot_ids):
+                        continue
+                    for room in course_rooms:
+                        count += 1
+    return count
+
+
+def matrix_candidates(inputs):
+    """Count the candidates in the index built from the eligibility matrices, which the
+    sections of a course share."""
+    courses = Eligibility(inputs).candidate_index()[0]
+    sections = np.array([len(inputs["sections_by_course"].get(course.id, [])) for course in inputs["courses"]])
+    return int(sections[courses].sum())
+
+
+def main():
+    app = make_app()
+    with app.app_context():
+        seed_catalog(NUM_COURSES, SECTIONS_PER_COURSE, num_professors=NUM_PROFESSORS, num_rooms=NUM_ROOMS,
+                     professors_per_course=3)
+        rng = random.Random(0)
+        time_slots = TimeSlot.query.all()
+        for professor in Professor.query.all():
+            professor.time_restrictions = rng.sample(time_slots, RESTRICTED_SLOTS_PER_PROFESSOR)
+        db.session.commit()
+        inputs = load_snapshot(db.session)
+
+        for label, count_candidates in (("loops", loop_candidates), ("matrices", matrix_candidates)):
+            started = time.perf_counter()
+            count = count_candidates(inputs)
+            print(f"{label:>8}: {count} candidates in {time.perf_counter() - started:.3f}s")
+
+        started = time.perf_counter()
+        Eligibility(inputs)
+        print(f"matrices alone: {time.perf_counter() - started:.4f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+"""Synthetic catalogs for exercising the scheduler against a throwaway SQLite database."""
+import math
+import random
+from flask import Flask
+from sqlalchemy import insert
+from models import db, Course, Professor, Room, TimeSlot, Section, CourseProfessor, RoomRestriction, TimeRestrictions
+from schedule_time import format_clock
+
+SLOT_TIMES = ["8:00AM", "9:30AM", "11:00AM", "12:30PM", "2:00PM", "3:30PM"]
+
+# Used by seed_synthetic: (value, weight) pairs to draw room capacities and course
+# enrollment caps from, and the penalty of each of SLOT_TIMES (early and late slots are
+# unpopular).
+ROOM_CAPACITIES = ((24, 3), (36, 4), (48, 2), (80, 1), (150, 0.3))
+COURSE_SIZES = ((15, 2), (24, 4), (30, 3), (45, 1.5), (75, 0.5), (120, 0.2))
+SLOT_PENALTIES = [4, 1, 0, 0, 1, 3]
+
+
+def make_app(database_uri="sqlite://"):
+    """Create a bare Flask app bound to its own database so benchmarks never touch MySQL."""
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = database_uri
+    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    db.init_app(app)
+    return app
+
+
+def seed_catalog(num_courses, sections_per_course, num_professors, num_rooms, seed=0, professors_per_course=2):
+    """Fill the current app's database with a catalog of single-slot, three credit hour courses.
+
+    Each course is taught by professors_per_course professors picked round-robin, so every
+    professor ends up with roughly the same number of qualified sections.
+    """
+    rng = random.Random(seed)
+    db.drop_all()
+    db.create_all()
+
+    for day in ("MWF", "TTh"):
+        for slot_time in SLOT_TIMES:
+            db.session.add(TimeSlot(time=slot_time, meeting_days=day))
+
+    professors = [Professor(name=f"Professor {i}", max_credit_hours=3 * 2 * len(SLOT_TIMES))
+                  for i in range(num_professors)]
+    rooms = [Room(name=f"Room {i}", capacity=rng.choice([30, 40, 60])) for i in range(num_rooms)]
+    db.session.add_all(professors + rooms)
+    db.session.flush()
+
+    for i in range(num_courses):
+        course = Course(
+            name=f"Course {i}",
+            credit_hours=3,
+            meeting_days="MWF" if i % 2 == 0 else "TTh",
+            max_students=rng.choice([20, 25, 30]),
+            slots_needed=1,
+        )
+        course.professors = [professors[(i + offset) % num_professors]
+                             for offset in range(min(professors_per_course, num_professors))]
+        db.session.add(course)
+        db.session.flush()
+        for section_number in range(1, sections_per_course + 1):
+            db.session.add(Section(course_id=course.id, section_number=section_number))
+
+    db.session.commit()
+
+
+def seed_departments(num_departments, courses_per_department, sections_per_course, professors_per_department,
+                     rooms_per_department, share_rooms=False, seed=0):
+    """Fill the current app's database with departments that share no professors.
+
+    Unless share_rooms is set, each department's courses are also restricted to its own
+    rooms, so the departments are completely independent scheduling problems.
+    """
+    rng = random.Random(seed)
+    db.drop_all()
+    db.create_all()
+
+    for day in ("MWF", "TTh"):
+        for slot_time in SLOT_TIMES:
+            db.session.add(TimeSlot(time=slot_time, meeting_days=day))
+
+    for d in range(num_departments):
+        professors = [Professor(name=f"Professor {d}-{i}", max_credit_hours=3 * 2 * len(SLOT_TIMES))
+                      for i in range(professors_per_department)]
+        rooms = [Room(name=f"Room {d}-{i}", capacity=rng.choice([30, 40, 60])) for i in range(rooms_per_department)]
+        db.session.add_all(professors + rooms)
+        db.session.flush()
+
+        for i in range(courses_per_department):
+            course = Course(
+                name=f"Course {d}-{i}",
+                credit_hours=3,
+                meeting_days="MWF" if i % 2 == 0 else "TTh",
+                max_students=rng.choice([20, 25, 30]),
+                slots_needed=1,
+            )
+            course.professors = [professors[(i + offset) % professors_per_department]
+                                 for offset in range(min(2, professors_per_department))]
+            if not share_rooms:
+                course.rooms = rooms
+            db.session.add(course)
+            db.session.flush()
+            for section_number in range(1, sections_per_course + 1):
+                db.session.add(Section(course_id=course.id, section_number=section_number))
+
+    db.session.commit()
+
+
+# Used by seed_patterns: (meeting days, start, end) of slots in the common patterns of a
+# term. MW and MWF slots overlap, evening classes meet once a week for three hours and
+# labs take a whole afternoon.
+PATTERN_SLOTS = (
+    [("MWF", start, start + 50) for start in (480, 540, 600, 660, 720, 780)]
+    + [("MW", start, start + 75) for start in (510, 600, 780, 870)]
+    + [("TTh", start, start + 75) for start in (480, 570, 660, 750, 840)]
+    + [(day, 1080, 1245) for day in ("M", "T", "W", "Th")]
+    + [(day, 840, 1010) for day in ("T", "Th")]
+)
+# (meeting days, slots needed, weight) of the courses seed_patterns draws.
+COURSE_PATTERNS = (("MWF", 1, 4), ("MW", 1, 2), ("TTh", 1, 4), ("M", 1, 0.5), ("T", 1, 0.5), ("W", 1, 0.5),
+                   ("Th", 1, 0.5), ("MWF", 2, 0.5), ("TTh", 2, 0.5))
+
+
+def seed_patterns(num_courses, sections_per_course, num_professors, num_rooms, seed=0, professors_per_course=3):
+    """Fill the current app's database with a catalog over PATTERN_SLOTS, mixing MWF, MW,
+    TTh, evening and lab meetings, with slots stored by their start and end minutes."""
+    rng = random.Random(seed)
+    db.drop_all()
+    db.create_all()
+
+    for days, start, end in PATTERN_SLOTS:
+        db.session.add(TimeSlot(time=f"{format_clock(start)}-{format_clock(end)}", meeting_days=days,
+                                start_minute=start, end_minute=end))
+
+    professors = [Professor(name=f"Professor {i}", max_credit_hours=12) for i in range(num_professors)]
+    rooms = [Room(name=f"Room {i}", capacity=rng.choice([30, 40, 60])) for i in range(num_rooms)]
+    db.session.add_all(professors + rooms)
+    db.session.flush()
+
+    patterns = [(days, slots_needed) for days, slots_needed, _ in COURSE_PATTERNS]
+    weights = [weight for _, _, weight in COURSE_PATTERNS]
+    for i in range(num_courses):
+        days, slots_needed = rng.choices(patterns, weights)[0]
+        course = Course(name=f"Course {i}", credit_hours=3, meeting_days=days,
+                        max_students=rng.choice([20, 25, 30]), slots_needed=slots_needed)
+        course.professors = rng.sample(professors, min(professors_per_course, num_professors))
+        db.session.add(course)
+        db.session.flush()
+        for section_number in range(1, sections_per_course + 1):
+            db.session.add(Section(course_id=course.id, section_number=section_number))
+
+    db.session.commit()
+
+
+def _draw(rng, choices, count):
+    values, weights = zip(*choices)
+    return rng.choices(values, weights, k=count)
+
+
+def seed_synthetic(num_courses, sections_per_course, num_professors, num_rooms, qualification_density=0.05,
+                   professor_restriction_rate=0.1, room_restriction_rate=0.1, long_course_rate=0.1,
+                   room_capacities=ROOM_CAPACITIES, course_sizes=COURSE_SIZES, seed=0):
+    """Fill the current app's database with a randomly drawn catalog that looks like a real
+    term, and return the schedule it was built around.
+
+    Room capacities and course enrollment caps are drawn from room_capacities and
+    course_sizes, keeping every course within the largest room. long_course_rate of the
+    courses are four credit hour courses needing two consecutive slots.
+
+    A schedule is placed first, greedily in a random order, and everything else is drawn
+    around it, so the catalog always has at least that schedule: each course's qualified
+    professors are the ones placed on it plus random others up to qualification_density
+    of all professors, a professor's credit hour limit is at least their placed load, a
+    professor is restricted from each slot they are free in with probability
+    professor_restriction_rate, and that share of courses is limited to about a quarter
+    of the rooms they fit in, like labs. Raises ValueError when the rooms or professors
+    cannot hold every section.
+
+    The same arguments and seed always give the same catalog. Rows are bulk inserted, so
+    even 5000 sections take a second or two. The schedule is returned
+    as (section, course, professor, day, block, room) keys, like generate_schedule's.
+    """
+    rng = random.Random(seed)
+    db.drop_all()
+    db.create_all()
+
+    time_slots = [{"id": len(SLOT_TIMES) * d + i + 1, "time": slot_time, "meeting_days": day, "penalty": penalty}
+                  for d, day in enumerate(("MWF", "TTh"))
+                  for i, (slot_time, penalty) in enumerate(zip(SLOT_TIMES, SLOT_PENALTIES))]
+    slot_ids_by_day = {day: [ts["id"] for ts in time_slots if ts["meeting_days"] == day] for day in ("MWF", "TTh")}
+
+    capacities = _draw(rng, room_capacities, num_rooms)
+    rooms = [{"id": i + 1, "name": f"Room {i}", "capacity": capacity} for i, capacity in enumerate(capacities)]
+
+    courses = []
+    for i, size in enumerate(_draw(rng, course_sizes, num_courses)):
+        long_course = rng.random() < long_course_rate
+        courses.append({
+            "id": i + 1,
+            "name": f"Course {i}",
+            "credit_hours": 4 if long_course else 3,
+            "meeting_days": rng.choice(("MWF", "TTh")),
+            "slots_needed": 2 if long_course else 1,
+            "max_students": min(size, max(capacities)),
+        })
+    sections = [{"id": (course["id"] - 1) * sections_per_course + number,
+                 "course_id": course["id"], "section_number": number}
+                for course in courses for number in range(1, sections_per_course + 1)]
+    courses_by_id = {course["id"]: course for course in courses}
+
+    # Spread the credit hours evenly, with some slack, while placing the schedule.
+    demand = sum(course["credit_hours"] for course in courses) * sections_per_course
+    target_hours = 3 * math.ceil(1.2 * demand / max(num_professors, 1) / 3)
+    prof_ids = list(range(1, num_professors + 1))
+    # Rooms and professors taken in each time slot by the placed schedule.
+    busy_rooms = {ts["id"]: set() for ts in time_slots}
+    busy_profs = {ts["id"]: set() for ts in time_slots}
+    loads = dict.fromkeys(prof_ids, 0)
+    placed_profs = {course["id"]: [] for course in courses}
+    placed_rooms = {course["id"]: set() for course in courses}
+    schedule = []
+    # Biggest courses first, each in the smallest free room it fits, so small courses do
+    # not use up the big rooms.
+    rooms_by_size = sorted(rooms, key=lambda room: room["capacity"])
+    order = sorted(rng.sample(sections, len(sections)), key=lambda sec: -courses_by_id[sec["course_id"]]["max_students"])
+    for sec in order:
+        course = courses_by_id[sec["course_id"]]
+        slot_ids = slot_ids_by_day[course["meeting_days"]]
+        duration = course["slots_needed"]
+        blocks = [tuple(slot_ids[s: s + duration]) for s in range(len(slot_ids) - duration + 1)]
+        placement = None
+        for block in rng.sample(blocks, len(blocks)):
+            taken_rooms = set().union(*(busy_rooms[ts_id] for ts_id in block))
+            room_id = next((room["id"] for room in rooms_by_size if room["capacity"] >= course["max_students"]
+                            and room["id"] not in taken_rooms), None)
+            free_profs = set(prof_ids).difference(*(busy_profs[ts_id] for ts_id in block))
+            # Prefer professors already teaching the course, then the least loaded one.
+            teaching = [prof_id for prof_id in placed_profs[course["id"]] if prof_id in free_profs
+                        and loads[prof_id] + course["credit_hours"] <= target_hours]
+            if room_id is not None and free_profs:
+                placement = (block, room_id, teaching[0] if teaching else min(free_profs, key=loads.get))
+                break
+        if placement is None:
+            raise ValueError(f"{num_rooms} rooms and {num_professors} professors cannot hold {len(sections)} sections")
+        block, room_id, prof_id = placement
+        for ts_id in block:
+            busy_rooms[ts_id].add(room_id)
+            busy_profs[ts_id].add(prof_id)
+        loads[prof_id] += course["credit_hours"]
+        if prof_id not in placed_profs[course["id"]]:
+            placed_profs[course["id"]].append(prof_id)
+        placed_rooms[course["id"]].add(room_id)
+        schedule.append((sec["id"], course["id"], prof_id, course["meeting_days"], block, room_id))
+
+    professors = [{"id": prof_id, "name": f"Professor {prof_id - 1}",
+                   "max_credit_hours": max(loads[prof_id], target_hours) + rng.choice((0, 3))}
+                  for prof_id in prof_ids]
+
+    per_course = min(num_professors, max(2, round(qualification_density * num_professors)))
+    course_professors = []
+    for course in courses:
+        qualified = placed_profs[course["id"]]
+        others = [prof_id for prof_id in rng.sample(prof_ids, per_course) if prof_id not in qualified]
+        course_professors += [{"course_id": course["id"], "professor_id": prof_id}
+                              for prof_id in qualified + others[:max(0, per_course - len(qualified))]]
+
+    room_restrictions = []
+    for course in courses:
+        if rng.random() >= room_restriction_rate:
+            continue
+        fitting = [room["id"] for room in rooms if room["capacity"] >= course["max_students"]]
+        allowed = placed_rooms[course["id"]] | set(rng.sample(fitting, math.ceil(len(fitting) / 4)))
+        room_restrictions += [{"course_id": course["id"], "room_id": room_id} for room_id in sorted(allowed)]
+
+    time_restrictions = [{"professor_id": prof_id, "timeslot_id": ts["id"]}
+                         for prof_id in prof_ids for ts in time_slots
+                         if prof_id not in busy_profs[ts["id"]] and rng.random() < professor_restriction_rate]
+
+    for model, rows in ((TimeSlot, time_slots), (Room, rooms), (Professor, professors), (Course, courses),
+                        (Section, sections), (CourseProfessor, course_professors),
+                        (RoomRestriction, room_restrictions), (TimeRestrictions, time_restrictions)):
+        if rows:
+            db.session.execute(insert(model), rows)
+    db.session.commit()
+    return sorted(schedule)
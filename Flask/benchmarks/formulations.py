@@ -0,0 +1,40 @@
+"""Compare model size and run time of the joint and factored formulations on the same catalogs.
+
+Run from the Flask directory:
+    python -m benchmarks.formulations
+"""
+import time
+from models import db
+from scheduler import generate_schedule, FORMULATIONS
+from benchmarks.catalog import make_app, seed_catalog
+
+SECTIONS_PER_COURSE = 2
+COURSE_COUNTS = [6, 12, 24, 48]
+
+
+def main():
+    app = make_app()
+    print(f"{'sections':>8}  {'formulation':<10} {'variables':>9}  {'build s':>8}  {'total s':>8}  {'placed':>6}")
+    with app.app_context():
+        for num_courses in COURSE_COUNTS:
+            num_sections = num_courses * SECTIONS_PER_COURSE
+            seed_catalog(
+                num_courses,
+                SECTIONS_PER_COURSE,
+                num_professors=max(2, num_sections // 4),
+                num_rooms=max(2, num_sections // 6),
+            )
+            for formulation in FORMULATIONS:
+                started = time.perf_counter()
+                result = generate_schedule(db.session, formulation=formulation)
+                elapsed = time.perf_counter() - started
+                model_build = result["model_build"]
+                print(
+                    f"{num_sections:>8}  {formulation:<10} {model_build['num_variables']:>9}"
+                    f"  {model_build['timings']['total']:>8.3f}  {elapsed:>8.2f}"
+                    f"  {len(result.get('schedule', [])):>6}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Re-solving a large term after a one-course edit: a full solve versus an incremental one
+that locks every section the edit cannot affect.
+
+A full solve of a term this size does not finish within the time limit, so the
+previous schedule is built greedily and saved as the version to start from.
+
+Run from the Flask directory:
+    python -m benchmarks.incremental
+"""
+from models import db, Course, Room, Section, TimeSlot
+from scheduler import generate_schedule
+from schedule_store import save_schedule
+from benchmarks.catalog import make_app, seed_catalog
+
+NUM_COURSES = 250
+SECTIONS_PER_COURSE = 4
+SOLVER_CONFIG = {"max_time_in_seconds": 30, "num_search_workers": 8, "random_seed": 0}
+
+
+def greedy_schedule():
+    """Fill every room slot by slot, giving each section the first qualified professor free at that time."""
+    slots_by_day = {}
+    for ts in TimeSlot.query.order_by(TimeSlot.id):
+        slots_by_day.setdefault(ts.meeting_days, []).append(ts.id)
+    rooms = [room.id for room in Room.query.order_by(Room.id)]
+    busy = set()
+    load = {}
+    position = {day: 0 for day in slots_by_day}
+    assignments = []
+    for course in Course.query.order_by(Course.id):
+        slots = slots_by_day[course.meeting_days]
+        for sec in course.sections:
+            while True:
+                index = position[course.meeting_days]
+                position[course.meeting_days] += 1
+                slot_id, room_id = slots[index % len(slots)], rooms[index // len(slots)]
+                prof = next((p for p in course.professors if (p.id, slot_id) not in busy
+                             and load.get(p.id, 0) + course.credit_hours <= p.max_credit_hours), None)
+                if prof is not None:
+                    break
+            busy.add((prof.id, slot_id))
+            load[prof.id] = load.get(prof.id, 0) + course.credit_hours
+            assignments.append((sec.id, course.id, prof.id, course.meeting_days, (slot_id,), room_id))
+    return assignments
+
+
+def main():
+    app = make_app()
+    with app.app_context():
+        seed_catalog(NUM_COURSES, SECTIONS_PER_COURSE, num_professors=150, num_rooms=150)
+        save_schedule(db.session, greedy_schedule())
+
+        # The edit: one more section of the first course.
+        db.session.add(Section(course_id=1, section_number=SECTIONS_PER_COURSE + 1))
+        db.session.commit()
+
+        print(f"{'mode':<12} {'build s':>8}  {'solve s':>8}  {'locked':>6}  {'changed':>7}  {'status'}")
+        for label, options in (
+            ("full", {}),
+            ("incremental", {"changed": {"courses": [1]}}),
+        ):
+            result = generate_schedule(db.session, formulation="factored", solver_config=SOLVER_CONFIG, **options)
+            stats = result["solver_stats"]
+            locked = result.get("incremental", {}).get("locked_sections", "-")
+            changed = result.get("warm_start", {}).get("changed_sections", "-")
+            print(f"{label:<12} {result['model_build']['timings']['total']:>8.2f}  {stats['wall_time']:>8.2f}"
+                  f"  {locked:>6}  {changed:>7}  {stats['status']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""One long solve versus a short solve followed by large neighborhood search, on a term
+too large for CP-SAT to improve on its own.
+
+Both runs start from a greedy schedule (see benchmarks.incremental) given as a warm
+start, and get the same total time.
+
+Run from the Flask directory:
+    python -m benchmarks.lns
+"""
+from models import db
+from scheduler import generate_schedule
+from schedule_store import save_schedule
+from benchmarks.catalog import make_app, seed_catalog
+from benchmarks.incremental import greedy_schedule
+
+NUM_COURSES = 250
+SECTIONS_PER_COURSE = 4
+TOTAL_SECONDS = 120
+INITIAL_SECONDS = 20
+
+
+def main():
+    app = make_app()
+    with app.app_context():
+        seed_catalog(NUM_COURSES, SECTIONS_PER_COURSE, num_professors=150, num_rooms=150, professors_per_course=3)
+        save_schedule(db.session, greedy_schedule())
+
+        single = generate_schedule(db.session, formulation="factored", warm_start=True,
+                                   solver_config={"max_time_in_seconds": TOTAL_SECONDS, "random_seed": 0})
+        print(f"single solve: {single['solver_stats']}")
+
+        lns = generate_schedule(db.session, formulation="factored", warm_start=True,
+                                solver_config={"max_time_in_seconds": INITIAL_SECONDS, "random_seed": 0},
+                                lns_budget=TOTAL_SECONDS - INITIAL_SECONDS)
+        print(f"initial solve: {lns['solver_stats']}")
+        print(f"{'elapsed s':>9}  {'objective':>9}  neighborhood")
+        for step in lns["lns"]["trajectory"]:
+            print(f"{step['elapsed'] + INITIAL_SECONDS:>9.2f}  {step['objective_value']:>9}  {step['neighborhood'] or '-'}")
+        print(f"{lns['lns']['iterations']} neighborhoods, {lns['lns']['moves']} moves kept, "
+              f"{lns['lns']['improvements']} improvements")
+
+
+if __name__ == "__main__":
+    main()
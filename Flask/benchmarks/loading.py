@@ -0,0 +1,68 @@
+"""Loading the solver inputs as ORM objects versus the column-only snapshot of
+schedule_snapshot, at 10000 sections and 300 professors with time restrictions.
+
+Each loader starts from an empty session, and the SQL statements it sends are counted.
+
+Run from the Flask directory:
+    python -m benchmarks.loading
+"""
+import random
+import time
+from sqlalchemy import event
+from models import db, Course, Professor, CourseProfessor, Room, RoomRestriction, TimeSlot, Section
+from schedule_snapshot import load_snapshot
+from benchmarks.catalog import make_app, seed_catalog
+
+NUM_COURSES = 2500
+SECTIONS_PER_COURSE = 4
+NUM_ROOMS = 200
+NUM_PROFESSORS = 300
+RESTRICTED_SLOTS_PER_PROFESSOR = 2
+
+
+def orm_inputs(db_session):
+    """Load the inputs the way generate_schedule used to: every table as ORM objects, and
+    each professor's time restrictions through the relationship, one query per professor."""
+    courses = Course.query.all()
+    professors = Professor.query.all()
+    course_to_professors = {}
+    for cp in CourseProfessor.query.all():
+        course_to_professors.setdefault(cp.course_id, []).append(cp.professor_id)
+    rooms = Room.query.all()
+    room_restrictions_map = {}
+    for rr in RoomRestriction.query.all():
+        room_restrictions_map.setdefault(rr.course_id, []).append(rr.room_id)
+    time_slots_by_day = {}
+    for ts in TimeSlot.query.all():
+        time_slots_by_day.setdefault(ts.meeting_days, []).append(ts)
+    sections_by_course = {}
+    for sec in Section.query.all():
+        sections_by_course.setdefault(sec.course_id, []).append(sec)
+    restricted_slots_by_prof = {prof.id: [ts.id for ts in prof.time_restrictions] for prof in professors}
+    return courses, rooms, course_to_professors, room_restrictions_map, time_slots_by_day, sections_by_course, \
+        restricted_slots_by_prof
+
+
+def main():
+    app = make_app()
+    with app.app_context():
+        seed_catalog(NUM_COURSES, SECTIONS_PER_COURSE, num_professors=NUM_PROFESSORS, num_rooms=NUM_ROOMS,
+                     professors_per_course=3)
+        rng = random.Random(0)
+        time_slots = TimeSlot.query.all()
+        for professor in Professor.query.all():
+            professor.time_restrictions = rng.sample(time_slots, RESTRICTED_SLOTS_PER_PROFESSOR)
+        db.session.commit()
+
+        statements = []
+        event.listen(db.engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+        for label, load in (("orm", orm_inputs), ("snapshot", load_snapshot)):
+            db.session.remove()
+            statements.clear()
+            started = time.perf_counter()
+            load(db.session)
+            print(f"{label:>8}: {time.perf_counter() - started:.3f}s, {len(statements)} queries")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Build time and peak memory of each formulation, with and without variable names, at
+1200 sections, 100 professors and 40 rooms.
+
+Every build runs in a fresh process, so the peak resident set size it reports belongs
+to that build alone (ru_maxrss never goes down). The model is built, not solved.
+
+Run from the Flask directory:
+    python -m benchmarks.memory
+"""
+import multiprocessing
+import resource
+import time
+from models import db
+from scheduler import _build_model
+from schedule_snapshot import load_snapshot
+from benchmarks.catalog import make_app, seed_catalog
+
+NUM_COURSES = 300
+SECTIONS_PER_COURSE = 4
+NUM_PROFESSORS = 100
+NUM_ROOMS = 40
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024
+
+
+def build(formulation, variable_names, results):
+    app = make_app()
+    with app.app_context():
+        seed_catalog(NUM_COURSES, SECTIONS_PER_COURSE, num_professors=NUM_PROFESSORS, num_rooms=NUM_ROOMS,
+                     professors_per_course=3)
+        inputs = load_snapshot(db.session)
+        loaded_rss = peak_rss_mb()
+        started = time.perf_counter()
+        _, built = _build_model(inputs, "no_overlap", formulation, False, {}, 0, {}, {},
+                                variable_names=variable_names)
+        results.put((built.num_variables, time.perf_counter() - started, loaded_rss, peak_rss_mb()))
+
+
+def main():
+    context = multiprocessing.get_context("spawn")
+    for formulation in ("joint", "factored"):
+        for variable_names in (True, False):
+            results = context.Queue()
+            process = context.Process(target=build, args=(formulation, variable_names, results))
+            process.start()
+            num_variables, seconds, loaded_rss, peak_rss = results.get()
+            process.join()
+            print(f"{formulation:>8}, names {'on' if variable_names else 'off':>3}: {num_variables} variables "
+                  f"built in {seconds:.1f}s, peak RSS {peak_rss} MB ({loaded_rss} MB before the build)")
+
+
+if __name__ == "__main__":
+    main()
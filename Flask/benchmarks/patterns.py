@@ -0,0 +1,82 @@
+"""Solve catalogs that mix MWF, MW, TTh, evening and lab meetings with every formulation,
+and check that no room or professor is booked twice at the same clock time.
+
+MW and MWF slots overlap without sharing a slot id, so a schedule only passes the check
+if overlaps are found through the time axis of schedule_time.
+
+It then counts how often two_stage finds no room matching for its times, which happens
+when a class of several slots is matched at an earlier start and blocks a later one,
+and falls back to the joint model, over MATCHING_SEEDS catalogs of each size.
+
+Run from the Flask directory:
+    python -m benchmarks.patterns
+"""
+import time
+from itertools import combinations
+from models import db
+from scheduler import generate_schedule, FORMULATIONS
+from schedule_snapshot import load_snapshot
+from benchmarks.catalog import make_app, seed_patterns
+
+SECTIONS_PER_COURSE = 2
+COURSE_COUNTS = [10, 20, 40]
+SOLVER_CONFIG = {"max_time_in_seconds": 30, "random_seed": 0}
+MATCHING_SEEDS = range(10)
+
+
+def clashes(inputs, schedule):
+    """Count the pairs of classes that share a room or professor at overlapping clock times."""
+    slots = {(ts.meeting_days, ts.time): ts for ts in inputs["time_slots"]}
+    meetings = []
+    for entry in schedule:
+        block = [slots[(entry["days"], slot_time)] for slot_time in entry["time_slots"]]
+        meetings.append((entry, block[0].days, min(ts.start_minute for ts in block),
+                         max(ts.end_minute for ts in block)))
+    count = 0
+    for (first, first_days, first_start, first_end), (second, second_days, second_start, second_end) in \
+            combinations(meetings, 2):
+        if first_days & second_days and first_start < second_end and second_start < first_end:
+            count += (first["room"] == second["room"]) + (first["professor"] == second["professor"])
+    return count
+
+
+def main():
+    app = make_app()
+    print(f"{'sections':>8}  {'formulation':<10} {'atoms':>5} {'variables':>9}  {'build s':>8}  {'total s':>8}"
+          f"  {'status':<10} {'placed':>6}  {'clashes':>7}")
+    with app.app_context():
+        for num_courses in COURSE_COUNTS:
+            num_sections = num_courses * SECTIONS_PER_COURSE
+            seed_patterns(num_courses, SECTIONS_PER_COURSE, num_professors=max(3, num_sections // 3),
+                          num_rooms=max(3, num_sections // 5))
+            inputs = load_snapshot(db.session)
+            for formulation in FORMULATIONS:
+                started = time.perf_counter()
+                result = generate_schedule(db.session, formulation=formulation, solver_config=SOLVER_CONFIG)
+                elapsed = time.perf_counter() - started
+                model_build = result.get("model_build", {})
+                schedule = result.get("schedule", [])
+                status = result.get("solver_stats", {}).get("status", "DIAGNOSED" if result.get("diagnostics") else None)
+                print(
+                    f"{num_sections:>8}  {formulation:<10} {inputs['time_axis'].num_atoms:>5}"
+                    f" {model_build.get('num_variables', 0):>9}  {model_build.get('timings', {}).get('total', 0):>8.3f}"
+                    f"  {elapsed:>8.2f}  {status:<10} {len(schedule):>6}  {clashes(inputs, schedule):>7}"
+                )
+
+        print()
+        print(f"{'sections':>8}  {'rooms':>5}  {'catalogs':>8}  {'matched':>7}  {'fallbacks':>9}  {'no schedule':>11}")
+        for num_courses in COURSE_COUNTS:
+            num_sections = num_courses * SECTIONS_PER_COURSE
+            # The usual number of rooms, and few enough that most of them are busy at peak times.
+            for num_rooms in (max(3, num_sections // 5), max(2, num_sections // 10)):
+                outcomes = []
+                for seed in MATCHING_SEEDS:
+                    seed_patterns(num_courses, SECTIONS_PER_COURSE, num_professors=max(3, num_sections // 3),
+                                  num_rooms=num_rooms, seed=seed)
+                    result = generate_schedule(db.session, formulation="two_stage", solver_config=SOLVER_CONFIG)
+                    outcomes.append(result.get("model_build", {}).get("room_matching", {}).get("status"))
+                print(f"{num_sections:>8}  {num_rooms:>5}  {len(outcomes):>8}  {outcomes.count('MATCHED'):>7}"
+                      f"  {outcomes.count('NO_MATCHING'):>9}  {outcomes.count(None):>11}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Compare how many sections per term each room-conflict formulation can place, and how
+fast the joint formulation finds a schedule with each ROOM_OCCUPANCIES encoding.
+
+Run from the Flask directory:
+    python -m benchmarks.room_occupancy
+"""
+import time
+from models import db
+from scheduler import ROOM_OCCUPANCIES, _build_model, _solve, generate_schedule
+from schedule_snapshot import load_snapshot
+from benchmarks.catalog import make_app, seed_catalog, seed_synthetic
+
+SECTIONS_PER_COURSE = 2
+COURSE_COUNTS = [3, 6, 12, 24, 48]
+# 60-section synthetic catalogs, solved with the settings of a small server.
+SYNTHETIC_SEEDS = [1, 2, 5, 6]
+SOLVER_CONFIG = {"max_time_in_seconds": 10, "num_search_workers": 4, "random_seed": 0}
+
+
+def main():
+    app = make_app()
+    print(f"{'sections':>8}  {'formulation':<12} {'placed':>6}  {'seconds':>8}")
+    with app.app_context():
+        for num_courses in COURSE_COUNTS:
+            num_sections = num_courses * SECTIONS_PER_COURSE
+            seed_catalog(
+                num_courses,
+                SECTIONS_PER_COURSE,
+                num_professors=max(2, num_sections // 4),
+                num_rooms=max(2, num_sections // 6),
+            )
+            for room_constraint in ("global_slot", "no_overlap"):
+                started = time.perf_counter()
+                result = generate_schedule(db.session, room_constraint=room_constraint)
+                elapsed = time.perf_counter() - started
+                placed = len(result.get("schedule", []))
+                print(f"{num_sections:>8}  {room_constraint:<12} {placed:>6}  {elapsed:>8.2f}")
+
+    print()
+    print(f"{'seed':>4}  {'occupancy':<11} {'status':<10} {'objective':>9}  {'first s':>7}  {'total s':>7}")
+    for seed in SYNTHETIC_SEEDS:
+        app = make_app()
+        with app.app_context():
+            seed_synthetic(30, 2, num_professors=12, num_rooms=8, seed=seed)
+            inputs = load_snapshot(db.session)
+            for room_occupancy in ROOM_OCCUPANCIES:
+                started = time.perf_counter()
+                model, built = _build_model(inputs, "no_overlap", "joint", False, {}, 0, {}, {},
+                                            room_occupancy=room_occupancy)
+                _, _, stats = _solve(model, built, inputs, SOLVER_CONFIG)
+                elapsed = time.perf_counter() - started
+                first = stats["first_solution_time"]
+                print(f"{seed:>4}  {room_occupancy:<11} {stats['status']:<10} {stats.get('objective_value', '-'):>9}"
+                      f"  {'-' if first is None else f'{first:.2f}':>7}  {elapsed:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""Benchmark generate_schedule on synthetic catalogs of increasing size and record the
+results in a JSON file, so runs can be compared over time.
+
+Every (tier, formulation) run seeds its own catalog with seed_synthetic in a fresh
+process, so its peak resident set size is its own. Each run records the model build
+and solve times, the variable and constraint counts, the peak memory, the solver
+status and the objective value, next to the objective of the schedule the catalog was
+built around as a reference. The runs are appended to the output file together
+with the commit, library versions and core count they ran with.
+
+Run from the Flask directory:
+    python -m benchmarks.suite
+    python -m benchmarks.suite --tiers small,medium --formulations factored --output results.json
+"""
+import argparse
+import datetime
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import time
+import ortools
+from models import db
+from scheduler import generate_schedule, parse_objective_weights, _objective_value, FORMULATIONS
+from schedule_snapshot import load_snapshot
+from benchmarks.catalog import make_app, seed_synthetic
+
+# name: (courses, sections per course, professors, rooms, qualification density,
+# formulations run by default). Every tier has about 3 to 7 qualified professors per
+# course. The joint formulation grows with professors x blocks x rooms per section, so
+# it is left out of the larger tiers.
+TIERS = {
+    "small": (20, 3, 18, 10, 0.15, ("joint", "factored", "two_stage")),
+    "medium": (100, 3, 90, 50, 0.05, ("joint", "factored", "two_stage")),
+    "large": (400, 3, 350, 200, 0.015, ("factored", "two_stage")),
+    "xlarge": (1250, 4, 1400, 850, 0.005, ("factored", "two_stage")),
+}
+DEFAULT_TIERS = ("small", "medium", "large")
+MAX_TIME_IN_SECONDS = 60
+SEED = 0
+
+
+def run(tier, formulation, max_time_in_seconds, seed, results):
+    try:
+        results.put(measure(tier, formulation, max_time_in_seconds, seed))
+    except Exception as e:
+        results.put({"tier": tier, "formulation": formulation, "error": repr(e)})
+
+
+def measure(tier, formulation, max_time_in_seconds, seed):
+    num_courses, sections_per_course, num_professors, num_rooms, qualification_density, _ = TIERS[tier]
+    app = make_app()
+    with app.app_context():
+        planted = seed_synthetic(num_courses, sections_per_course, num_professors, num_rooms,
+                                 qualification_density=qualification_density, seed=seed)
+        reference_objective = _objective_value(load_snapshot(db.session), planted, {}, 0,
+                                               parse_objective_weights(None))
+        started = time.perf_counter()
+        result = generate_schedule(db.session, formulation=formulation,
+                                   solver_config={"max_time_in_seconds": max_time_in_seconds, "random_seed": seed})
+        elapsed = time.perf_counter() - started
+    model_build = result.get("model_build", {})
+    solver_stats = result.get("solver_stats", {})
+    return {
+        "tier": tier,
+        "formulation": formulation,
+        "courses": num_courses,
+        "sections": num_courses * sections_per_course,
+        "professors": num_professors,
+        "rooms": num_rooms,
+        "status": solver_stats.get("status", "DIAGNOSED" if result.get("diagnostics") else None),
+        "placed": len(result.get("schedule", [])),
+        "objective_value": solver_stats.get("objective_value"),
+        "reference_objective": reference_objective,
+        "num_variables": model_build.get("num_variables"),
+        "num_constraints": model_build.get("num_constraints"),
+        "build_seconds": model_build.get("timings", {}).get("total"),
+        "solve_seconds": solver_stats.get("wall_time"),
+        "first_solution_seconds": solver_stats.get("first_solution_time"),
+        # Whether the two_stage formulation matched rooms or fell back to the joint model.
+        "room_matching": model_build.get("room_matching"),
+        "total_seconds": round(elapsed, 4),
+        # ru_maxrss is in kilobytes on Linux.
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024,
+    }
+
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "ortools": ortools.__version__,
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tiers", default=",".join(DEFAULT_TIERS),
+                        help=f"comma separated tiers out of {', '.join(TIERS)}")
+    parser.add_argument("--formulations", default="",
+                        help="comma separated formulations to run on every tier, instead of each tier's own")
+    parser.add_argument("--max-time", type=float, default=MAX_TIME_IN_SECONDS, help="solver time limit per run")
+    parser.add_argument("--seed", type=int, default=SEED, help="catalog and solver seed")
+    parser.add_argument("--output", default="benchmark_results.json",
+                        help="JSON file the run is appended to")
+    args = parser.parse_args()
+
+    tiers = [tier for tier in args.tiers.split(",") if tier]
+    formulations = [formulation for formulation in args.formulations.split(",") if formulation]
+    unknown = [tier for tier in tiers if tier not in TIERS] + [f for f in formulations if f not in FORMULATIONS]
+    if unknown:
+        parser.error(f"unknown tiers or formulations {unknown}")
+
+    context = multiprocessing.get_context("spawn")
+    runs = []
+    for tier in tiers:
+        for formulation in formulations or TIERS[tier][5]:
+            results = context.Queue()
+            process = context.Process(target=run, args=(tier, formulation, args.max_time, args.seed, results))
+            process.start()
+            outcome = results.get()
+            process.join()
+            runs.append(outcome)
+            if "error" in outcome:
+                print(f"{tier:>6} {formulation:<8} failed: {outcome['error']}")
+                continue
+            print(f"{tier:>6} {formulation:<8} {outcome['sections']:>5} sections: {outcome['status']}, "
+                  f"objective {outcome['objective_value']} (reference {outcome['reference_objective']}), "
+                  f"{outcome['num_variables']} variables, "
+                  f"{outcome['num_constraints']} constraints, build {outcome['build_seconds']}s, "
+                  f"solve {outcome['solve_seconds']}s, peak RSS {outcome['peak_rss_mb']} MB")
+
+    history = []
+    if os.path.exists(args.output):
+        with open(args.output) as f:
+            history = json.load(f)
+    history.append({
+        "started_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "max_time_in_seconds": args.max_time,
+        "seed": args.seed,
+        **environment(),
+        "runs": runs,
+    })
+    with open(args.output, "w") as f:
+        json.dump(history, f, indent=1)
+    print(f"Appended {len(runs)} runs to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Measure time-to-optimal with and without symmetry breaking between sections of the same course.
+
+Run from the Flask directory:
+    python -m benchmarks.symmetry
+"""
+import math
+import time
+from models import db
+from scheduler import generate_schedule
+from benchmarks.catalog import make_app, seed_catalog
+
+NUM_COURSES = 4
+SECTIONS_PER_COURSE = [5, 10, 15, 20]
+FORMULATION = "factored"
+
+
+def main():
+    app = make_app()
+    print(f"{'sections/course':>15}  {'symmetry':<8} {'seconds':>8}  {'placed':>6}")
+    with app.app_context():
+        for sections_per_course in SECTIONS_PER_COURSE:
+            # Each course meets on one day with six slots, so it needs enough
+            # professors and rooms to run every section.
+            professors_per_course = math.ceil(sections_per_course / 4)
+            seed_catalog(
+                NUM_COURSES,
+                sections_per_course,
+                num_professors=NUM_COURSES * professors_per_course,
+                num_rooms=math.ceil(NUM_COURSES * sections_per_course / 12),
+                professors_per_course=professors_per_course,
+            )
+            for symmetry_breaking in (False, True):
+                started = time.perf_counter()
+                result = generate_schedule(db.session, formulation=FORMULATION, symmetry_breaking=symmetry_breaking)
+                elapsed = time.perf_counter() - started
+                print(f"{sections_per_course:>15}  {str(symmetry_breaking):<8} {elapsed:>8.2f}"
+                      f"  {len(result.get('schedule', [])):>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Time-to-first-feasible after a small edit, solving from scratch versus warm starting from the previous schedule.
+
+Run from the Flask directory:
+    python -m benchmarks.warm_start
+"""
+from models import db, Professor, TimeSlot
+from scheduler import generate_schedule
+from benchmarks.catalog import make_app, seed_catalog
+
+NUM_COURSES = 30
+SECTIONS_PER_COURSE = 2
+SOLVER_CONFIG = {"max_time_in_seconds": 20, "num_search_workers": 8, "random_seed": 0}
+
+
+def main():
+    app = make_app()
+    with app.app_context():
+        seed_catalog(NUM_COURSES, SECTIONS_PER_COURSE, num_professors=16, num_rooms=10)
+        baseline = generate_schedule(db.session, solver_config=SOLVER_CONFIG, persist=True)
+        print(f"baseline: {baseline['solver_stats']}")
+
+        # The edit: one professor can no longer teach the first slot of the week.
+        professor = db.session.get(Professor, 1)
+        professor.time_restrictions.append(db.session.get(TimeSlot, 1))
+        db.session.commit()
+
+        print(f"{'mode':<22} {'first feasible s':>16}  {'total s':>8}  {'objective':>9}  {'changed':>7}")
+        for label, options in (
+            ("cold", {}),
+            ("warm start", {"warm_start": True}),
+            ("warm start + disrupt", {"warm_start": True, "disruption_weight": 1}),
+        ):
+            result = generate_schedule(db.session, solver_config=SOLVER_CONFIG, **options)
+            stats = result["solver_stats"]
+            changed = result.get("warm_start", {}).get("changed_sections", "-")
+            print(f"{label:<22} {str(stats['first_solution_time']):>16}  {stats['wall_time']:>8.2f}"
+                  f"  {str(stats.get('objective_value')):>9}  {changed:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,3 +9,41 @@ class Config:
         os.getenv("MYSQL_PUBLIC_URL")
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # CP-SAT defaults for /schedules/generate; each can be overridden per request
+    # through a query string parameter of the same name without the SOLVER_ prefix.
+    # 0 workers lets CP-SAT use every available core.
+    SOLVER_NUM_SEARCH_WORKERS = int(os.getenv("SOLVER_NUM_SEARCH_WORKERS", "0"))
+    SOLVER_MAX_TIME_IN_SECONDS = float(os.getenv("SOLVER_MAX_TIME_IN_SECONDS", "60"))
+    SOLVER_RANDOM_SEED = int(os.getenv("SOLVER_RANDOM_SEED", "0"))
+    SOLVER_RELATIVE_GAP_LIMIT = float(os.getenv("SOLVER_RELATIVE_GAP_LIMIT", "0"))
+    SOLVER_LOG_SEARCH_PROGRESS = os.getenv("SOLVER_LOG_SEARCH_PROGRESS", "false").lower() in ("1", "true", "yes")
+
+    # Background schedule generation (/schedules/jobs): how many solves may run at
+    # once, and the SQLite file job records are kept in so every web worker sees them
+    # (schedule_jobs.db in the instance folder by default). "memory" keeps them in the
+    # web worker instead, which only works with a single worker.
+    SCHEDULE_JOB_WORKERS = int(os.getenv("SCHEDULE_JOB_WORKERS", "2"))
+    SCHEDULE_JOB_STORE = os.getenv("SCHEDULE_JOB_STORE", "")
+
+    # Number of generated schedules kept in memory, keyed by a hash of the solver inputs.
+    SCHEDULE_CACHE_SIZE = int(os.getenv("SCHEDULE_CACHE_SIZE", "16"))
+
+    # Weights of the objective terms (see OBJECTIVE_WEIGHTS in scheduler.py); each can be
+    # overridden per request with a weight_<term> query string parameter.
+    OBJECTIVE_WEIGHT_LOAD_DIFFERENCE = int(os.getenv("OBJECTIVE_WEIGHT_LOAD_DIFFERENCE", "1"))
+    OBJECTIVE_WEIGHT_TIME_SLOT = int(os.getenv("OBJECTIVE_WEIGHT_TIME_SLOT", "0"))
+    OBJECTIVE_WEIGHT_BACK_TO_BACK = int(os.getenv("OBJECTIVE_WEIGHT_BACK_TO_BACK", "0"))
+    OBJECTIVE_WEIGHT_ROOM_FIT = int(os.getenv("OBJECTIVE_WEIGHT_ROOM_FIT", "0"))
+    # Longest break, in minutes, between two classes of a professor that the back_to_back
+    # term still counts; overridden per request with back_to_back_gap. Left empty, classes
+    # in consecutive slots of the same meeting days count, however long the break between.
+    OBJECTIVE_BACK_TO_BACK_GAP = os.getenv("OBJECTIVE_BACK_TO_BACK_GAP", "")
+
+    # Directory that /schedules/generate?profile=true writes cProfile dumps to; profiling
+    # is refused while it is unset.
+    SCHEDULE_PROFILE_DIR = os.getenv("SCHEDULE_PROFILE_DIR", "")
+
+    # Name the model's variables after their assignment. Turning it off saves memory and
+    # build time on large terms, at the cost of readable solver logs and model dumps.
+    MODEL_VARIABLE_NAMES = os.getenv("MODEL_VARIABLE_NAMES", "true").lower() in ("1", "true", "yes")
@@ -1,4 +1,5 @@
 # models.py
+from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
 from werkzeug.security import generate_password_hash
 
@@ -9,7 +10,8 @@ class Course(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), unique=True, nullable=False)
     credit_hours = db.Column(db.Integer, nullable=False)
-    meeting_days = db.Column(db.Enum('MWF', 'TTh'), nullable=False)
+    # Meeting pattern such as 'MWF', 'TTh' or 'MW' (see schedule_time.day_mask).
+    meeting_days = db.Column(db.String(14), nullable=False)
     sections = db.relationship('Section', backref='course', cascade="all, delete", lazy=True)
     slots_needed = db.Column(db.Integer, default=1, nullable=False) 
     max_students = db.Column(db.Integer, nullable=False)
@@ -69,13 +71,22 @@ class TimeSlot(db.Model):
     __tablename__ = 'Time_Slots'
     id = db.Column(db.Integer, primary_key=True)
     time = db.Column(db.String(20), nullable=False)
-    meeting_days = db.Column(db.Enum('MWF', 'TTh'), nullable=False)
+    meeting_days = db.Column(db.String(14), nullable=False)
+    # Minutes from midnight the slot starts and ends at. When unset they are read from
+    # time, e.g. '8:00AM' or '6:00PM-8:45PM' (see schedule_time.slot_minutes).
+    start_minute = db.Column(db.Integer, nullable=True)
+    end_minute = db.Column(db.Integer, nullable=True)
+    # Cost of holding a class in this slot, e.g. higher for early mornings and late afternoons.
+    penalty = db.Column(db.Integer, default=0, nullable=False)
 
     def to_dict(self):
         return {
             'id': self.id,
             'time': self.time,
             'meeting_days': self.meeting_days,
+            'start_minute': self.start_minute,
+            'end_minute': self.end_minute,
+            'penalty': self.penalty,
         }
 
 class Section(db.Model):
@@ -84,9 +95,23 @@ class Section(db.Model):
     course_id = db.Column(db.Integer, db.ForeignKey('Courses.id', ondelete='CASCADE'), nullable=False)
     section_number = db.Column(db.Integer, nullable=False)
 
+class ScheduleVersion(db.Model):
+    __tablename__ = 'Schedule_Versions'
+    id = db.Column(db.Integer, primary_key=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    objective_value = db.Column(db.Float, nullable=True)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'created_at': self.created_at.isoformat(),
+            'objective_value': self.objective_value,
+        }
+
 class ScheduleModel(db.Model):
     __tablename__ = 'Schedule'
     schedule_id = db.Column(db.Integer, primary_key=True)
+    version_id = db.Column(db.Integer, db.ForeignKey('Schedule_Versions.id', ondelete='CASCADE'), nullable=False, index=True)
     section_id = db.Column(db.Integer, db.ForeignKey('Sections.id', ondelete='CASCADE'), nullable=False)
     professor_id = db.Column(db.Integer, db.ForeignKey('Professors.id', ondelete='CASCADE'), nullable=False)
     room_id = db.Column(db.Integer, db.ForeignKey('Rooms.id', ondelete='CASCADE'), nullable=False)
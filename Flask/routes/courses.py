@@ -1,7 +1,10 @@
 from flask import Blueprint, jsonify, request
 from models import Course, Professor, Section, Room, db
+from schedule_cache import invalidate_after_writes
+from schedule_time import normalize_days
 
 courses_blueprint = Blueprint('courses', __name__)
+invalidate_after_writes(courses_blueprint)
 
 @courses_blueprint.route('/courses', methods=['GET'])
 def get_courses():
@@ -92,10 +95,14 @@ def add_course():
     data = request.json
     if not data.get('max_students'):
         return jsonify({'error': 'Missing required fields'}), 400
+    try:
+        meeting_days = normalize_days(data.get('meeting_Days'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     new_course = Course(
         name=data.get('name'),
         credit_hours=data.get('credit_hours'),
-        meeting_days=data.get('meeting_Days'),
+        meeting_days=meeting_days,
         max_students=data.get('max_students'),
         slots_needed=data.get('slots_needed', 1),
     )
@@ -157,9 +164,13 @@ def update_course_by_id(course_id):
     if not course:
         return jsonify({'error': 'Course not found'}), 404
     data = request.json
+    if 'meeting_days' in data:
+        try:
+            course.meeting_days = normalize_days(data['meeting_days'])
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
     course.name = data.get('name', course.name)
     course.credit_hours = data.get('credit_hours', course.credit_hours)
-    course.meeting_days = data.get('meeting_days', course.meeting_days)
     course.max_students = data.get('max_students', course.max_students)
     course.slots_needed = data.get('slots_needed', course.slots_needed)
 
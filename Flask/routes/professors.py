@@ -1,8 +1,10 @@
 
 from flask import Blueprint, jsonify, request
 from models import Professor, Course, TimeSlot, db
+from schedule_cache import invalidate_after_writes
 
 professors_blueprint = Blueprint('professors', __name__)
+invalidate_after_writes(professors_blueprint)
 
 @professors_blueprint.route('/professors', methods=['GET'])
 def get_professors():
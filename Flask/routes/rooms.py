@@ -1,7 +1,9 @@
 from flask import Blueprint, jsonify, request
 from models import Room, db
+from schedule_cache import invalidate_after_writes
 
 rooms_blueprint = Blueprint('rooms', __name__)
+invalidate_after_writes(rooms_blueprint)
 
 @rooms_blueprint.route('/rooms', methods=['GET'])
 def get_rooms():
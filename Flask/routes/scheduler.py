@@ -1,12 +1,448 @@
-from flask import Blueprint, jsonify
+import cProfile
+import json
+import os
+import pstats
+import queue
+import threading
+import time
+import uuid
+from flask import Blueprint, Response, current_app, jsonify, request
 from models import db
-from scheduler import generate_schedule
+from scheduler import (generate_schedule, layout_schedule, parse_back_to_back_gap, parse_objective_weights,
+                       parse_solver_config, BACK_TO_BACK_GAP, DEFAULT_STAGES, OBJECTIVE_WEIGHTS, SCHEDULE_LAYOUTS,
+                       SOLVER_PARAMETERS)
+from schedule_jobs import MemoryJobStore, ScheduleJobs, SQLiteJobStore
+from schedule_metrics import metrics_registry
+from schedule_store import latest_version_id, load_schedule
 
 scheduler_blueprint = Blueprint('scheduler', __name__)
 
+_jobs_lock = threading.Lock()
+# cProfile cannot profile two requests at once, so profiled requests take turns.
+_profile_lock = threading.Lock()
+# Number of functions listed in a profiled response, by cumulative time.
+PROFILE_TOP_FUNCTIONS = 20
+
+
+def _solver_config():
+    """
+    Solver settings for this request: the SOLVER_* defaults from Config,
+    overridden by query string parameters of the same name, e.g.
+    /schedules/generate?max_time_in_seconds=30&num_search_workers=8
+    """
+    solver_config = {name: current_app.config[f"SOLVER_{name.upper()}"] for name in SOLVER_PARAMETERS}
+    solver_config.update({name: request.args[name] for name in SOLVER_PARAMETERS if name in request.args})
+    return parse_solver_config(solver_config)
+
+
+def _objective_weights():
+    """
+    Objective weights for this request: the OBJECTIVE_WEIGHT_* defaults from Config,
+    overridden by query string parameters prefixed with weight_, e.g.
+    /schedules/generate?weight_time_slot=2&weight_back_to_back=1
+    """
+    weights = {name: current_app.config[f"OBJECTIVE_WEIGHT_{name.upper()}"] for name in OBJECTIVE_WEIGHTS}
+    weights.update({name: request.args[f'weight_{name}'] for name in OBJECTIVE_WEIGHTS
+                    if f'weight_{name}' in request.args})
+    return parse_objective_weights(weights)
+
+
+def _model_options():
+    """
+    Model options from the query string:
+    warm_start=latest or a schedule version id to start from a saved schedule,
+    disruption_weight=<int> to penalize every section that moves away from it,
+    explain=true to name the conflicting constraints when no schedule exists,
+    decompose=true to solve groups of courses that share no professors separately,
+    lns_budget=<seconds> to keep improving the schedule with large neighborhood search,
+    staged=true to balance professor loads before the soft preferences (DEFAULT_STAGES),
+    with stage_seconds=<seconds>,<seconds> as each stage's time limit and
+    stage_tolerance=<int> as how much later stages may worsen an earlier one,
+    back_to_back_gap=<minutes> as the longest break between classes counted as back to back
+    (OBJECTIVE_BACK_TO_BACK_GAP by default, and consecutive slots when that is empty),
+    and the objective weights (see _objective_weights).
+    Whether the model's variables are named comes from MODEL_VARIABLE_NAMES.
+    """
+    options = {'objective_weights': _objective_weights(),
+               'variable_names': current_app.config.get('MODEL_VARIABLE_NAMES', True),
+               'back_to_back_gap': parse_back_to_back_gap(request.args.get(
+                   'back_to_back_gap', current_app.config.get('OBJECTIVE_BACK_TO_BACK_GAP', BACK_TO_BACK_GAP)))}
+    warm_start = request.args.get('warm_start')
+    if warm_start:
+        if warm_start.lower() == 'latest':
+            options['warm_start'] = True
+        elif warm_start.isdigit():
+            options['warm_start'] = int(warm_start)
+        else:
+            raise ValueError("warm_start must be 'latest' or a schedule version id")
+    if 'disruption_weight' in request.args:
+        try:
+            options['disruption_weight'] = int(request.args['disruption_weight'])
+        except ValueError:
+            raise ValueError('disruption_weight must be an integer')
+    if request.args.get('explain', '').lower() in ('1', 'true', 'yes'):
+        options['explain'] = True
+    if request.args.get('decompose', '').lower() in ('1', 'true', 'yes'):
+        options['decompose'] = True
+    if 'lns_budget' in request.args:
+        try:
+            options['lns_budget'] = float(request.args['lns_budget'])
+        except ValueError:
+            raise ValueError('lns_budget must be a number of seconds')
+    if request.args.get('staged', '').lower() in ('1', 'true', 'yes'):
+        stages = [{'terms': list(terms)} for terms in DEFAULT_STAGES]
+        try:
+            stage_seconds = [float(seconds) for seconds in request.args.get('stage_seconds', '').split(',') if seconds]
+            stage_tolerance = int(request.args.get('stage_tolerance', 0))
+        except ValueError:
+            raise ValueError('stage_seconds must be comma separated seconds and stage_tolerance an integer')
+        for stage, seconds in zip(stages, stage_seconds):
+            stage['max_time_in_seconds'] = seconds
+        for stage in stages:
+            stage['tolerance'] = stage_tolerance
+        options['stages'] = stages
+    return options
+
+
+def _save():
+    """
+    Whether to save the schedule as a new version, from save=true in the query string.
+    Saved versions are what /schedules/latest, warm_start and /schedules/resolve start from;
+    a request that saves always solves, since a cached result would not be a new version.
+    """
+    return request.args.get('save', '').lower() in ('1', 'true', 'yes')
+
+
+def _layout():
+    """
+    How the schedule is laid out in the response, from layout= in the query string:
+    list (the default), compact, by_professor, by_room or by_day (see layout_schedule).
+    """
+    layout = request.args.get('layout', 'list')
+    if layout not in SCHEDULE_LAYOUTS:
+        raise ValueError(f"layout must be one of {', '.join(SCHEDULE_LAYOUTS)}")
+    return layout
+
+
+def _laid_out(result, layout):
+    """Copy of result with its schedule, if it has one, in the given layout."""
+    if 'schedule' not in result:
+        return result
+    return {**result, 'schedule': layout_schedule(result['schedule'], layout)}
+
+
+def _profile_dir():
+    """
+    Directory to write a cProfile dump of this request to, when it asks for one with
+    profile=true, or None. Profiling is only allowed when SCHEDULE_PROFILE_DIR is set.
+    """
+    if request.args.get('profile', '').lower() not in ('1', 'true', 'yes'):
+        return None
+    profile_dir = current_app.config.get('SCHEDULE_PROFILE_DIR')
+    if not profile_dir:
+        raise ValueError('profile requires the SCHEDULE_PROFILE_DIR setting')
+    return profile_dir
+
+
+def _generate(profile_dir, **kwargs):
+    """
+    Run generate_schedule with the request's session. With a profile_dir, run it under
+    cProfile, dump the stats there and list the slowest functions under
+    metrics.profile, e.g.
+    {"path": ".../generate-20250101-120000-1a2b3c4d.prof", "top": [{"function": ..., "calls": 3,
+     "cumulative_seconds": 1.2, "own_seconds": 0.1}, ...]}
+    The dump can be explored with python -m pstats or snakeviz.
+    """
+    if profile_dir is None:
+        return generate_schedule(db.session, **kwargs)
+    with _profile_lock:
+        profiler = cProfile.Profile()
+        result = profiler.runcall(generate_schedule, db.session, **kwargs)
+    os.makedirs(profile_dir, exist_ok=True)
+    path = os.path.join(profile_dir, f"generate-{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}.prof")
+    profiler.dump_stats(path)
+    stats = pstats.Stats(profiler).stats
+    top = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:PROFILE_TOP_FUNCTIONS]
+    result['metrics']['profile'] = {
+        'path': path,
+        'top': [
+            {
+                'function': pstats.func_std_string(function),
+                'calls': calls,
+                'cumulative_seconds': round(cumulative, 4),
+                'own_seconds': round(own, 4),
+            }
+            for function, (_, calls, own, cumulative, _) in top
+        ],
+    }
+    return result
+
+
+def _schedule_jobs():
+    """The app's background job runner, created from Config on first use."""
+    with _jobs_lock:
+        jobs = current_app.extensions.get("schedule_jobs")
+        if jobs is None:
+            store_path = current_app.config.get("SCHEDULE_JOB_STORE")
+            if store_path == "memory":
+                store = MemoryJobStore()
+            else:
+                if not store_path:
+                    os.makedirs(current_app.instance_path, exist_ok=True)
+                    store_path = os.path.join(current_app.instance_path, "schedule_jobs.db")
+                store = SQLiteJobStore(store_path)
+            jobs = ScheduleJobs(
+                current_app.config["SQLALCHEMY_DATABASE_URI"],
+                max_workers=current_app.config.get("SCHEDULE_JOB_WORKERS", 2),
+                store=store,
+            )
+            current_app.extensions["schedule_jobs"] = jobs
+        return jobs
+
+
+def _job_status(job):
+    return {
+        'job_id': job['job_id'],
+        'status': job['status'],
+        'error': job['error'],
+        'submitted_at': job['submitted_at'],
+        'started_at': job['started_at'],
+        'finished_at': job['finished_at'],
+    }
+
+
 @scheduler_blueprint.route('/schedules/generate', methods=['GET'])
 def generate_schedule_route():
-    result = generate_schedule(db.session)
+    """
+    Generates a schedule and returns it, saving it as a new version with save=true (see _save).
+    Query parameters: the solver settings (see _solver_config), the model options (see _model_options),
+    layout= for the schedule's layout (see _layout) and profile=true to profile the request (see _generate).
+    The response's "metrics" break the request down into timed phases, model size and solver statistics.
+    """
+    try:
+        solver_config = _solver_config()
+        options = _model_options()
+        layout = _layout()
+        profile_dir = _profile_dir()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    result = _generate(profile_dir, solver_config=solver_config, persist=_save(), use_cache=True, **options)
+    if result.get("status") != "Schedule generated successfully.":
+        return jsonify(result), 400
+    return jsonify(_laid_out(result, layout))
+
+
+@scheduler_blueprint.route('/schedules/resolve', methods=['POST'])
+def resolve_schedule_route():
+    """
+    Re-solves only the part of a saved schedule that an edit can affect,
+    keeping every other section where it was. With save=true the result is saved as a new version.
+    Query parameters: the same as /schedules/generate; the schedule to start from is
+    warm_start (the latest version by default).
+    Input JSON (any of the keys):
+    {
+        "courses": [3],
+        "professors": [7],
+        "rooms": [],
+        "time_slots": []
+    }
+    Output JSON: the same as /schedules/generate, plus
+    {
+        "incremental": {"locked_sections": 940, "reoptimized_sections": 60, "attempts": 1}
+    }
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Expected a JSON object of changed ids'}), 400
+    try:
+        solver_config = _solver_config()
+        options = _model_options()
+        layout = _layout()
+        result = _generate(_profile_dir(), solver_config=solver_config, persist=_save(), use_cache=True,
+                           changed=data, **options)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     if result.get("status") != "Schedule generated successfully.":
         return jsonify(result), 400
-    return jsonify(result)
+    return jsonify(_laid_out(result, layout))
+
+
+@scheduler_blueprint.route('/schedules/<int:version>', methods=['GET'])
+def get_schedule_version(version):
+    """
+    Returns a previously generated schedule without running the solver.
+    Output JSON:
+    {
+        "status": "Schedule loaded successfully.",
+        "version": {"id": 3, "created_at": "2025-02-13T10:00:00", "objective_value": 0.0},
+        "schedule": [
+            {
+                "course_name": "Math 101",
+                "section_id": 1,
+                "professor": "Dr. Smith",
+                "start_time": "8:00AM",
+                "time_slots": ["8:00AM"],
+                "room": "Room A",
+                "days": "MWF"
+            },
+        ]
+    }
+    The schedule can be laid out differently with layout= (see _layout).
+    """
+    try:
+        layout = _layout()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    result = load_schedule(version)
+    if not result:
+        return jsonify({'error': 'Schedule not found'}), 404
+    return jsonify(_laid_out(result, layout))
+
+
+@scheduler_blueprint.route('/schedules/latest', methods=['GET'])
+def get_latest_schedule():
+    """
+    Returns the most recently generated schedule, in the same format as /schedules/<version>.
+    """
+    try:
+        layout = _layout()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    version = latest_version_id()
+    if version is None:
+        return jsonify({'error': 'Schedule not found'}), 404
+    return jsonify(_laid_out(load_schedule(version), layout))
+
+
+@scheduler_blueprint.route('/schedules/generate/stream', methods=['GET'])
+def stream_schedule_route():
+    """
+    Generates a schedule and streams it as Server-Sent Events.
+    Accepts the same query parameters as /schedules/generate.
+    Events:
+        solution: {"objective_value": 2.0, "elapsed": 1.3, "schedule": [...]}
+                  sent for every improving schedule found during the search
+        result:   the same JSON /schedules/generate would return, sent last
+                  (including the saved "version" with save=true)
+        error:    {"error": "..."} if the solve failed
+    Closing the connection stops the search at its next improving solution.
+    """
+    try:
+        solver_config = _solver_config()
+        options = _model_options()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    persist = _save()
+
+    app = current_app._get_current_object()
+    events = queue.Queue()
+    stop = threading.Event()
+
+    def on_solution(solution):
+        events.put(('solution', solution))
+        return stop.is_set()
+
+    def solve():
+        with app.app_context():
+            try:
+                result = generate_schedule(db.session, solver_config=solver_config, on_solution=on_solution,
+                                           persist=persist, use_cache=True, **options)
+                events.put(('result', result))
+            except Exception as e:
+                events.put(('error', {'error': str(e)}))
+
+    threading.Thread(target=solve, daemon=True).start()
+
+    def stream():
+        try:
+            while True:
+                try:
+                    event, payload = events.get(timeout=15)
+                except queue.Empty:
+                    # Comment line that keeps proxies from closing an idle stream.
+                    yield ': keep-alive\n\n'
+                    continue
+                yield f'event: {event}\ndata: {json.dumps(payload)}\n\n'
+                if event != 'solution':
+                    break
+        finally:
+            stop.set()
+
+    return Response(stream(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+@scheduler_blueprint.route('/schedules/jobs', methods=['POST'])
+def submit_schedule_job():
+    """
+    Queues a schedule generation in the background.
+    Accepts the same query parameters as /schedules/generate, including save=true.
+    Output JSON:
+    {
+        "job_id": "3f2c...",
+        "status": "queued"
+    }
+    """
+    try:
+        solver_config = _solver_config()
+        options = _model_options()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    jobs = _schedule_jobs()
+    job_id = jobs.submit({'solver_config': solver_config, 'persist': _save(), **options})
+    return jsonify(_job_status(jobs.get(job_id))), 202
+
+
+@scheduler_blueprint.route('/schedules/jobs/<job_id>', methods=['GET'])
+def get_schedule_job(job_id):
+    """
+    Returns the status of a job: queued, running, finished, failed or cancelled.
+    """
+    job = _schedule_jobs().get(job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(_job_status(job))
+
+
+@scheduler_blueprint.route('/schedules/jobs/<job_id>/result', methods=['GET'])
+def get_schedule_job_result(job_id):
+    """
+    Returns the generate_schedule result of a finished job, with its schedule laid out by layout= (see _layout).
+    Responds 202 with the job status while the job is still queued or running.
+    """
+    try:
+        layout = _layout()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    job = _schedule_jobs().get(job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    if job['status'] in ('queued', 'running'):
+        return jsonify(_job_status(job)), 202
+    if job['status'] != 'finished':
+        return jsonify(_job_status(job)), 409
+    result = job['result']
+    if result.get("status") != "Schedule generated successfully.":
+        return jsonify(result), 400
+    return jsonify(_laid_out(result, layout))
+
+
+@scheduler_blueprint.route('/schedules/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_schedule_job(job_id):
+    """
+    Cancels a queued or running job. Finished jobs are returned unchanged.
+    """
+    job = _schedule_jobs().cancel(job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(_job_status(job))
+
+
+@scheduler_blueprint.route('/metrics', methods=['GET'])
+def metrics_route():
+    """
+    Totals over every schedule generated by this process, in the Prometheus text format:
+    requests by outcome, time per phase, solver branches and conflicts, and the size of
+    the last model built.
+    """
+    return Response(metrics_registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -1,7 +1,10 @@
 from flask import Blueprint, jsonify, request
 from models import TimeSlot, db
+from schedule_cache import invalidate_after_writes
+from schedule_time import format_clock, normalize_days, parse_clock, slot_minutes
 
 time_slots_blueprint = Blueprint('time_slots', __name__)
+invalidate_after_writes(time_slots_blueprint)
 
 @time_slots_blueprint.route('/time_slots', methods=['GET'])
 def get_time_slots():
@@ -11,31 +14,79 @@ def get_time_slots():
     {
         "id": 1,
         "time": 2:30,
-        "meeting_days": MWF
+        "meeting_days": MWF,
+        "start_minute": 870 (or null when only time is known),
+        "end_minute": 920,
+        "penalty": 0
     }
     """
     ts = TimeSlot.query.all()
     data = [{
         'id': slot.id,
         'time': slot.time,
-        'meeting_days': slot.meeting_days
+        'meeting_days': slot.meeting_days,
+        'start_minute': slot.start_minute,
+        'end_minute': slot.end_minute,
+        'penalty': slot.penalty
     } for slot in ts]
     return jsonify(data)
 
+def _minute_field(data, minute_key, clock_key):
+    """Read a bound of a new slot, given as a clock time under clock_key or as minutes from
+    midnight under minute_key. Raises ValueError if it is neither."""
+    if data.get(clock_key) is not None:
+        minute = parse_clock(data[clock_key])
+        if minute is None:
+            raise ValueError(f'{clock_key} must be a clock time such as 8:00AM or 14:30')
+        return minute
+    minute = data.get(minute_key)
+    if minute is not None and (not isinstance(minute, int) or not 0 <= minute <= 24 * 60):
+        raise ValueError(f'{minute_key} must be minutes from midnight')
+    return minute
+
+def _penalty_field(data):
+    """Read the penalty of a new slot, 0 when left out. Raises ValueError unless it is a non-negative integer."""
+    penalty = data.get('penalty', 0)
+    if not isinstance(penalty, int) or isinstance(penalty, bool) or penalty < 0:
+        raise ValueError('penalty must be a non-negative integer')
+    return penalty
+
 @time_slots_blueprint.route('/time_slots', methods=['POST'])
 def add_time_slot():
     """
         Adds a new Time Slot
         Expected Json
         {
-            "time": Mr Smith,
-            "meeting_days": MWF
+            "time": 8:00AM (or a range such as 6:00PM-8:45PM),
+            "meeting_days": MWF (any day letters, e.g. MW, TTh or TR, Th, Sa),
+            "start_time": 6:00PM and "end_time": 8:45PM (optional, or start_minute and end_minute),
+            "penalty": 0 (optional, the cost of scheduling a class in this slot)
         }
+        Without a start and end they are read from time, a single start lasting 50 minutes.
     """
     data = request.json
+    try:
+        meeting_days = normalize_days(data.get('meeting_days'))
+        start_minute = _minute_field(data, 'start_minute', 'start_time')
+        end_minute = _minute_field(data, 'end_minute', 'end_time')
+        penalty = _penalty_field(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    time = data.get('time')
+    if start_minute is None and end_minute is not None:
+        # An end alone keeps the start written in time.
+        start_minute = (slot_minutes(time) or (None,))[0]
+    if not time and start_minute is not None:
+        time = format_clock(start_minute) + (f'-{format_clock(end_minute)}' if end_minute is not None else '')
+    if slot_minutes(time, start_minute, end_minute) is None:
+        return jsonify({'error': 'Give the slot a time such as 8:00AM or 6:00PM-8:45PM, '
+                                 'or a start before its end'}), 400
     new_slot = TimeSlot(
-        time=data.get('time'),
-        meeting_days=data.get('meeting_days')
+        time=time,
+        meeting_days=meeting_days,
+        start_minute=start_minute,
+        end_minute=end_minute,
+        penalty=penalty
     )
     db.session.add(new_slot)
     db.session.commit()
@@ -50,4 +101,6 @@ def delete_time_slot_by_id(time_slot_id):
     slot = TimeSlot.query.get(time_slot_id)
     if not slot:
         return jsonify({'error': 'Time slot not found'}), 404
-    db.session.delete
+    db.session.delete(slot)
+    db.session.commit()
+    return jsonify({'message': 'Time slot deleted successfully'})
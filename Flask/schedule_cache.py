@@ -0,0 +1,59 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from flask import request
+from config import Config
+
+
+def fingerprint(*parts):
+    """Return a stable SHA-256 hex digest of JSON-serializable parts."""
+    payload = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ScheduleCache:
+    """Thread-safe LRU map from an input fingerprint to a generate_schedule result."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key, value):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# Shared by every request in this process. Entries are keyed by the content of the
+# solver inputs, so a stale entry can never be returned; clearing on writes only
+# releases memory held by schedules for data that no longer exists.
+schedule_cache = ScheduleCache(Config.SCHEDULE_CACHE_SIZE)
+
+
+def invalidate_after_writes(blueprint):
+    """Clear the schedule cache after every successful write handled by the blueprint."""
+    @blueprint.after_request
+    def invalidate_schedule_cache(response):
+        if request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+            schedule_cache.clear()
+        return response
@@ -0,0 +1,78 @@
+from schedule_presolve import eligible_rooms
+
+
+def course_components(inputs, share_rooms=True):
+    """Group the ids of courses with sections into components that share no professors (nor, with share_rooms,
+    eligible rooms), largest first."""
+    course_ids = [course.id for course in inputs["courses"] if inputs["sections_by_course"].get(course.id)]
+    parent = {course_id: course_id for course_id in course_ids}
+
+    def find(course_id):
+        while parent[course_id] != course_id:
+            parent[course_id] = parent[parent[course_id]]
+            course_id = parent[course_id]
+        return course_id
+
+    first_course_by_resource = {}
+    for course in inputs["courses"]:
+        if course.id not in parent:
+            continue
+        resources = [("professor", prof_id) for prof_id in inputs["course_to_professors"].get(course.id, [])]
+        if share_rooms:
+            resources += [("room", room.id)
+                          for room in eligible_rooms(course, inputs["rooms"], inputs["room_restrictions_map"])]
+        for resource in resources:
+            other = first_course_by_resource.setdefault(resource, course.id)
+            parent[find(course.id)] = find(other)
+
+    components = {}
+    for course_id in course_ids:
+        components.setdefault(find(course_id), []).append(course_id)
+    return sorted(components.values(), key=len, reverse=True)
+
+
+def subproblem_inputs(inputs, course_ids, occupied_room_atoms=()):
+    """Restrict the inputs to the given courses and the professors and rooms they can use.
+
+    occupied_room_atoms lists (room id, atom) pairs of the time axis already taken by
+    sections scheduled outside the subproblem.
+    """
+    course_ids = set(course_ids)
+    courses = [course for course in inputs["courses"] if course.id in course_ids]
+    prof_ids = {prof_id for course_id in course_ids for prof_id in inputs["course_to_professors"].get(course_id, [])}
+    room_ids = {room.id for course in courses
+                for room in eligible_rooms(course, inputs["rooms"], inputs["room_restrictions_map"])}
+
+    # The rows are plain tuples already (see schedule_snapshot), so they can be sent to
+    # another process as they are.
+    professors = [p for p in inputs["professors"] if p.id in prof_ids]
+    rooms = [r for r in inputs["rooms"] if r.id in room_ids]
+    sections_by_course = {course_id: list(secs) for course_id, secs in inputs["sections_by_course"].items()
+                          if course_id in course_ids}
+    sections = [sec for secs in sections_by_course.values() for sec in secs]
+
+    return {
+        "courses": courses,
+        "professors": professors,
+        "rooms": rooms,
+        "time_slots": list(inputs["time_slots"]),
+        "sections": sections,
+        "courses_dict": {c.id: c for c in courses},
+        "professors_dict": {p.id: p for p in professors},
+        "rooms_dict": {r.id: r for r in rooms},
+        "section_ids": {sec.id for sec in sections},
+        "time_str_by_id": dict(inputs["time_str_by_id"]),
+        "course_to_professors": {course_id: list(prof_ids)
+                                 for course_id, prof_ids in inputs["course_to_professors"].items()
+                                 if course_id in course_ids},
+        "room_restrictions_map": {course_id: list(room_ids)
+                                  for course_id, room_ids in inputs["room_restrictions_map"].items()
+                                  if course_id in course_ids},
+        "time_slots_by_day": {day: list(ts_list) for day, ts_list in inputs["time_slots_by_day"].items()},
+        "time_axis": inputs["time_axis"],
+        "sections_by_course": sections_by_course,
+        "restricted_slots_by_prof": {prof_id: list(slot_ids)
+                                     for prof_id, slot_ids in inputs["restricted_slots_by_prof"].items()
+                                     if prof_id in prof_ids},
+        "occupied_room_atoms": [(room_id, atom) for room_id, atom in occupied_room_atoms if room_id in room_ids],
+    }
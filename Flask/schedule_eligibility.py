@@ -0,0 +1,125 @@
+import numpy as np
+
+
+def group_rows(keys):
+    """Group row indexes by their int key; yields (key, rows) pairs in key order."""
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    bounds = np.flatnonzero(np.diff(sorted_keys)) + 1
+    firsts = np.concatenate(([0], bounds)) if len(keys) else bounds
+    return zip(sorted_keys[firsts].tolist(), np.split(order, bounds) if len(keys) else [])
+
+
+class Eligibility:
+    """Boolean NumPy matrices of the rooms, professors and start blocks each course can use."""
+
+    def __init__(self, inputs):
+        self.courses = inputs["courses"]
+        self.rooms = inputs["rooms"]
+        self.time_slots_by_day = inputs["time_slots_by_day"]
+        self.prof_ids = np.array([prof.id for prof in inputs["professors"]], dtype=np.int64)
+        self.room_ids = np.array([room.id for room in self.rooms], dtype=np.int64)
+        self.slot_index = {ts.id: index for index, ts in enumerate(inputs["time_slots"])}
+        self.overlap = inputs["time_axis"].overlap
+        prof_index = {prof.id: index for index, prof in enumerate(inputs["professors"])}
+        room_index = {room.id: index for index, room in enumerate(self.rooms)}
+
+        # Rows and columns follow the order of the inputs' courses, professors, rooms and time slots.
+        # course_room[c, r]: room r holds course c's students and its room restrictions allow it;
+        # course_prof[c, p]: professor p is qualified to teach course c.
+        capacity = np.array([room.capacity for room in self.rooms], dtype=np.int64)
+        max_students = np.array([course.max_students for course in self.courses], dtype=np.int64)
+        self.course_room = max_students[:, None] <= capacity[None, :]
+        self.course_prof = np.zeros((len(self.courses), len(self.prof_ids)), dtype=bool)
+        for c, course in enumerate(self.courses):
+            if course.id in inputs["room_restrictions_map"]:
+                allowed = np.zeros(len(self.rooms), dtype=bool)
+                allowed[[room_index[room_id] for room_id in inputs["room_restrictions_map"][course.id]
+                         if room_id in room_index]] = True
+                self.course_room[c] &= allowed
+            self.course_prof[c, [prof_index[prof_id] for prof_id in inputs["course_to_professors"].get(course.id, [])
+                                 if prof_id in prof_index]] = True
+
+        # prof_slot[p, t]: professor p is not restricted from time slot t
+        self.prof_slot = np.ones((len(self.prof_ids), len(self.slot_index)), dtype=bool)
+        for prof_id, slot_ids in inputs["restricted_slots_by_prof"].items():
+            if prof_id in prof_index:
+                self.prof_slot[prof_index[prof_id], [self.slot_index[ts_id] for ts_id in slot_ids
+                                                     if ts_id in self.slot_index]] = False
+
+        self._prof_start = {}
+        self._candidate_index = None
+        # course_start[c, s]: some qualified professor is free for the block of course c starting at index s
+        max_starts = max((len(ts_list) for ts_list in self.time_slots_by_day.values()), default=0)
+        self.course_start = np.zeros((len(self.courses), max_starts), dtype=bool)
+        # Courses with the same meeting days and length share their blocks, so each group
+        # is one matrix product.
+        self._groups = {}
+        for c, course in enumerate(self.courses):
+            self._groups.setdefault((course.meeting_days, course.slots_needed), []).append(c)
+        for (day, duration), positions in self._groups.items():
+            prof_start = self.prof_start(day, duration)
+            self.course_start[positions, :prof_start.shape[1]] = self.course_prof[positions] @ prof_start
+
+    def start_blocks(self, day, duration):
+        """Boolean [start index, time slot] matrix of the slots each block of duration slots covers."""
+        ts_list = self.time_slots_by_day.get(day, [])
+        blocks = np.zeros((max(len(ts_list) - duration + 1, 0), len(self.slot_index)), dtype=bool)
+        for s in range(blocks.shape[0]):
+            blocks[s, [self.slot_index[ts.id] for ts in ts_list[s: s + duration]]] = True
+        return blocks
+
+    def prof_start(self, day, duration):
+        """Boolean [professor, start index] matrix: the block overlaps no slot the professor is restricted from."""
+        key = (day, duration)
+        if key not in self._prof_start:
+            touched = self.start_blocks(day, duration) @ self.overlap
+            self._prof_start[key] = ~((~self.prof_slot) @ touched.T)
+        return self._prof_start[key]
+
+    def course_rooms(self, position):
+        """The rooms course_room allows for the course at the given position."""
+        return [self.rooms[r] for r in np.flatnonzero(self.course_room[position]).tolist()]
+
+    def course_profs(self, position):
+        """The ids of the professors qualified for the course at the given position."""
+        return self.prof_ids[self.course_prof[position]].tolist()
+
+    def course_starts(self, position):
+        """The start indexes course_start allows for the course at the given position."""
+        return np.flatnonzero(self.course_start[position]).tolist()
+
+    def candidate_index(self):
+        """Index arrays (course, professor, start index, room) of every joint candidate, built in one batched
+        pass per group of courses with the same meeting days and length. A course's rows are contiguous."""
+        if self._candidate_index is None:
+            room_courses, room_positions = np.nonzero(self.course_room)
+            room_counts = np.bincount(room_courses, minlength=len(self.courses))
+            room_offsets = np.cumsum(room_counts) - room_counts
+            parts = [np.zeros((4, 0), dtype=np.int32)]
+            for (day, duration), positions in self._groups.items():
+                positions = np.array(positions)
+                allowed = self.course_prof[positions][:, :, None] & self.prof_start(day, duration)[None, :, :]
+                group_courses, profs, starts = np.nonzero(allowed)
+                courses = positions[group_courses]
+                # Repeat each (course, professor, start) once per allowed room of the course.
+                counts = room_counts[courses]
+                repeated = np.repeat(np.arange(len(courses)), counts)
+                within = np.arange(len(repeated)) - np.repeat(np.cumsum(counts) - counts, counts)
+                rooms = room_positions[room_offsets[courses][repeated] + within]
+                parts.append(np.array([courses[repeated], profs[repeated], starts[repeated], rooms], dtype=np.int32))
+            self._candidate_index = tuple(np.concatenate(parts, axis=1))
+            courses = self._candidate_index[0]
+            self._candidate_counts = np.bincount(courses, minlength=len(self.courses))
+            self._candidate_firsts = np.zeros(len(self.courses), dtype=np.int64)
+            firsts = np.flatnonzero(np.diff(courses, prepend=-1))
+            self._candidate_firsts[courses[firsts]] = firsts
+        return self._candidate_index
+
+    def joint_candidates(self, position):
+        """Arrays of the professor ids, start indexes and room ids of every candidate
+        candidate_index allows for the course at the given position."""
+        _, profs, starts, rooms = self.candidate_index()
+        first = self._candidate_firsts[position]
+        last = first + self._candidate_counts[position]
+        return self.prof_ids[profs[first:last]], starts[first:last], self.room_ids[rooms[first:last]]
@@ -0,0 +1,170 @@
+import time
+import numpy as np
+from ortools.sat.python import cp_model
+from schedule_eligibility import Eligibility, group_rows
+
+# How many times the conflict is re-solved with only its own assumptions, which
+# usually shrinks it further.
+MAX_SHRINK_ROUNDS = 5
+
+
+class _ExplainModel:
+    """The joint formulation with every constraint family behind an assumption literal, so the solver can
+    name a subset that is already infeasible."""
+
+    def __init__(self, inputs, room_constraint):
+        self.model = model = cp_model.CpModel()
+        self.descriptions = {}
+        self.assumptions = []
+        time_axis = inputs["time_axis"]
+        num_atoms = time_axis.num_atoms
+        # Time restrictions are assumptions here, so the candidates keep the blocks
+        # professors are restricted from.
+        eligibility = Eligibility(dict(inputs, restricted_slots_by_prof={}))
+        course_pos, prof_pos, starts, room_pos = eligibility.candidate_index()
+
+        # Every block the courses can use, numbered from block_offset[(days, duration)]:
+        # the atoms it holds, padded with -1, and the slots it meets at the time of.
+        block_offset = {}
+        block_atoms = []
+        block_touched = [np.zeros((0, len(eligibility.slot_index)), dtype=bool)]
+        for course in inputs["courses"]:
+            key = (course.meeting_days, course.slots_needed)
+            if key in block_offset:
+                continue
+            block_offset[key] = len(block_atoms)
+            ts_list = inputs["time_slots_by_day"].get(course.meeting_days, [])
+            block_atoms.extend(time_axis.block_atoms([ts.id for ts in ts_list[s: s + course.slots_needed]])
+                               for s in range(len(ts_list) - course.slots_needed + 1))
+            block_touched.append(eligibility.start_blocks(*key) @ eligibility.overlap)
+        block_touched = np.concatenate(block_touched)
+        atoms_by_block = np.full((len(block_atoms), max(map(len, block_atoms), default=0)), -1, dtype=np.int64)
+        for block, atoms in enumerate(block_atoms):
+            atoms_by_block[block, :len(atoms)] = atoms
+        course_block = np.array([block_offset[(course.meeting_days, course.slots_needed)]
+                                 for course in inputs["courses"]], dtype=np.int64)
+        credit_hours = np.array([course.credit_hours for course in inputs["courses"]], dtype=np.int64)
+
+        # One variable per section and candidate of its course; var_rows[i] is the
+        # candidate of variable i.
+        rows_by_course = dict(group_rows(course_pos.astype(np.int64)))
+        vars_by_section = {}
+        var_rows = [np.zeros(0, dtype=np.int64)]
+        num_vars = 0
+        for position, course in enumerate(inputs["courses"]):
+            rows = rows_by_course.get(position, np.zeros(0, dtype=np.int64))
+            for sec in inputs["sections_by_course"].get(course.id, []):
+                vars_by_section[sec.id] = range(num_vars, num_vars + len(rows))
+                var_rows.append(rows)
+                num_vars += len(rows)
+        var_rows = np.concatenate(var_rows)
+        literals = [model.NewBoolVar("") for _ in range(num_vars)]
+        var_prof = prof_pos[var_rows].astype(np.int64)
+        var_block = course_block[course_pos[var_rows]] + starts[var_rows]
+        # (variable, atom) pairs of every atom each variable's block holds
+        held = atoms_by_block[var_block]
+        held_vars, held_columns = np.nonzero(held >= 0)
+        held_atoms = held[held_vars, held_columns]
+
+        courses_dict = inputs["courses_dict"]
+        professors_dict = inputs["professors_dict"]
+        slot_names = {ts.id: f"{ts.meeting_days} {ts.time}" for ts in inputs["time_slots"]}
+
+        for sec in inputs["sections"]:
+            literal = self._assumption({
+                "kind": "section",
+                "section_id": sec.id,
+                "course": courses_dict[sec.course_id].name,
+                "section_number": sec.section_number,
+            })
+            section_literals = [literals[var] for var in vars_by_section.get(sec.id, ())]
+            model.Add(cp_model.LinearExpr.Sum(section_literals) == 1).OnlyEnforceIf(literal)
+
+        vars_by_prof = dict(group_rows(var_prof))
+        availability_literals = []
+        for position, prof in enumerate(inputs["professors"]):
+            availability_literals.append(self._assumption({"kind": "professor_availability", "professor": prof.name}))
+            literal = self._assumption({
+                "kind": "professor_credit_hours",
+                "professor": prof.name,
+                "max_credit_hours": prof.max_credit_hours,
+            })
+            prof_vars = vars_by_prof.get(position, np.zeros(0, dtype=np.int64))
+            load = cp_model.LinearExpr.WeightedSum([literals[var] for var in prof_vars.tolist()],
+                                                   credit_hours[course_pos[var_rows[prof_vars]]].tolist())
+            model.Add(load <= prof.max_credit_hours).OnlyEnforceIf(literal)
+        for key, group in group_rows(var_prof[held_vars] * num_atoms + held_atoms):
+            if len(group) > 1:
+                model.Add(cp_model.LinearExpr.Sum([literals[var] for var in held_vars[group].tolist()]) <= 1) \
+                    .OnlyEnforceIf(availability_literals[key // num_atoms])
+
+        prof_index = {prof_id: position for position, prof_id in enumerate(eligibility.prof_ids.tolist())}
+        for prof_id, restricted_slot_ids in inputs["restricted_slots_by_prof"].items():
+            prof_vars = vars_by_prof.get(prof_index.get(prof_id), np.zeros(0, dtype=np.int64))
+            for ts_id in restricted_slot_ids:
+                if ts_id not in eligibility.slot_index:
+                    continue
+                touching = prof_vars[block_touched[var_block[prof_vars], eligibility.slot_index[ts_id]]]
+                if not len(touching):
+                    continue
+                literal = self._assumption({
+                    "kind": "time_restriction",
+                    "professor": professors_dict[prof_id].name,
+                    "time_slot": slot_names.get(ts_id),
+                })
+                model.Add(cp_model.LinearExpr.Sum([literals[var] for var in touching.tolist()]) == 0) \
+                    .OnlyEnforceIf(literal)
+
+        if room_constraint == "no_overlap":
+            room_literals = [self._assumption({"kind": "room", "room": room.name}) for room in inputs["rooms"]]
+            room_keys = room_pos[var_rows][held_vars].astype(np.int64) * num_atoms + held_atoms
+        else:
+            room_keys = held_atoms
+        for key, group in group_rows(room_keys):
+            if len(group) < 2:
+                continue
+            if room_constraint == "no_overlap":
+                literal = room_literals[key // num_atoms]
+            else:
+                literal = self._assumption({"kind": "time_slot", "time_slot": time_axis.describe(key)})
+            model.Add(cp_model.LinearExpr.Sum([literals[var] for var in held_vars[group].tolist()]) <= 1) \
+                .OnlyEnforceIf(literal)
+
+    def _assumption(self, description):
+        literal = self.model.NewBoolVar("")
+        self.descriptions[literal.Index()] = description
+        self.assumptions.append(literal)
+        return literal
+
+    def conflict(self, max_time_in_seconds=None):
+        """Return the descriptions of a small set of constraint families that cannot all hold,
+        or None if the solver could not prove the model infeasible. max_time_in_seconds
+        is shared by all shrink rounds."""
+        literals = {literal.Index(): literal for literal in self.assumptions}
+        core = list(literals)
+        # One budget for every round; the first always runs, later ones only while time is left.
+        deadline = time.monotonic() + max_time_in_seconds if max_time_in_seconds else None
+        for shrink_round in range(MAX_SHRINK_ROUNDS):
+            remaining = deadline - time.monotonic() if deadline is not None else None
+            if shrink_round and remaining is not None and remaining <= 0:
+                break
+            self.model.ClearAssumptions()
+            self.model.AddAssumptions([literals[index] for index in core])
+            solver = cp_model.CpSolver()
+            # Cores are only reported by the sequential search.
+            solver.parameters.num_search_workers = 1
+            if remaining is not None:
+                solver.parameters.max_time_in_seconds = max(remaining, 0.01)
+            if solver.Solve(self.model) != cp_model.INFEASIBLE:
+                return None if len(core) == len(literals) else [self.descriptions[index] for index in core]
+            smaller = solver.SufficientAssumptionsForInfeasibility()
+            if len(smaller) >= len(core):
+                break
+            core = smaller
+        return [self.descriptions[index] for index in core]
+
+
+def explain_infeasibility(inputs, room_constraint="no_overlap", max_time_in_seconds=None):
+    """Find a small set of sections, professors, rooms and time restrictions whose constraints
+    already leave no feasible schedule. Returns None if none could be found in time."""
+    return _ExplainModel(inputs, room_constraint).conflict(max_time_in_seconds)
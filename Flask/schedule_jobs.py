@@ -0,0 +1,275 @@
+import json
+import multiprocessing
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from flask import Flask
+from models import db
+from scheduler import generate_schedule
+
+# Job lifecycle: queued -> running -> finished | failed, or cancelled from queued/running.
+FINISHED_STATUSES = ("finished", "failed", "cancelled")
+# How often the process that owns unfinished jobs renews their heartbeat_at, and how old
+# it may get before the job counts as abandoned by a process that died.
+HEARTBEAT_SECONDS = 5
+STALE_AFTER_SECONDS = 30
+ABANDONED_ERROR = "The process running this job stopped before it finished"
+
+
+class MemoryJobStore:
+    """Keeps job records in this process. Enough for a single web worker."""
+
+    def __init__(self):
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def create(self, job_id, options):
+        with self._lock:
+            self._jobs[job_id] = {
+                "job_id": job_id,
+                "status": "queued",
+                "options": options,
+                "result": None,
+                "error": None,
+                "submitted_at": time.time(),
+                "started_at": None,
+                "finished_at": None,
+                "heartbeat_at": time.time(),
+            }
+
+    def update(self, job_id, **fields):
+        with self._lock:
+            self._jobs[job_id].update(fields)
+
+    def update_if(self, job_id, expected, **fields):
+        """Update the job only if its status is still expected; return whether it was."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job["status"] != expected:
+                return False
+            job.update(fields)
+            return True
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def touch(self, job_ids, now):
+        with self._lock:
+            for job_id in job_ids:
+                if job_id in self._jobs:
+                    self._jobs[job_id]["heartbeat_at"] = now
+
+    def expire(self, before, now):
+        """Mark unfinished jobs whose heartbeat is older than before as failed."""
+        with self._lock:
+            for job in self._jobs.values():
+                if job["status"] not in FINISHED_STATUSES and job["heartbeat_at"] < before:
+                    job.update(status="failed", error=ABANDONED_ERROR, finished_at=now)
+
+
+class SQLiteJobStore:
+    """Keeps job records in a SQLite file so every web worker process sees the same jobs."""
+
+    def __init__(self, path):
+        self.path = path
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS schedule_jobs ("
+                " job_id TEXT PRIMARY KEY, status TEXT NOT NULL, options TEXT, result TEXT, error TEXT,"
+                " submitted_at REAL, started_at REAL, finished_at REAL, heartbeat_at REAL)"
+            )
+            # Files created before heartbeats were recorded.
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(schedule_jobs)")]
+            if "heartbeat_at" not in columns:
+                conn.execute("ALTER TABLE schedule_jobs ADD COLUMN heartbeat_at REAL NOT NULL DEFAULT 0")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def create(self, job_id, options):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO schedule_jobs (job_id, status, options, submitted_at, heartbeat_at)"
+                " VALUES (?, 'queued', ?, ?, ?)",
+                (job_id, json.dumps(options), time.time(), time.time()),
+            )
+
+    def update(self, job_id, **fields):
+        if "result" in fields:
+            fields["result"] = json.dumps(fields["result"])
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+        with self._connect() as conn:
+            conn.execute(f"UPDATE schedule_jobs SET {assignments} WHERE job_id = ?", (*fields.values(), job_id))
+
+    def update_if(self, job_id, expected, **fields):
+        """Update the job only if its status is still expected; return whether it was."""
+        if "result" in fields:
+            fields["result"] = json.dumps(fields["result"])
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+        with self._connect() as conn:
+            cursor = conn.execute(f"UPDATE schedule_jobs SET {assignments} WHERE job_id = ? AND status = ?",
+                                  (*fields.values(), job_id, expected))
+        return cursor.rowcount == 1
+
+    def get(self, job_id):
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            row = conn.execute("SELECT * FROM schedule_jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["options"] = json.loads(job["options"]) if job["options"] else {}
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def touch(self, job_ids, now):
+        with self._connect() as conn:
+            conn.executemany("UPDATE schedule_jobs SET heartbeat_at = ? WHERE job_id = ?",
+                             [(now, job_id) for job_id in job_ids])
+
+    def expire(self, before, now):
+        """Mark unfinished jobs whose heartbeat is older than before as failed."""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE schedule_jobs SET status = 'failed', error = ?, finished_at = ?"
+                " WHERE status IN ('queued', 'running') AND heartbeat_at < ?",
+                (ABANDONED_ERROR, now, before),
+            )
+
+
+def _solve_in_process(database_uri, options, conn):
+    """Entry point of a solver process: run generate_schedule against its own app and send back the outcome."""
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = database_uri
+    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    db.init_app(app)
+    try:
+        with app.app_context():
+            result = generate_schedule(db.session, **options)
+        conn.send(("result", result))
+    except Exception as e:
+        conn.send(("error", f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+
+class ScheduleJobs:
+    """Runs generate_schedule in separate processes, at most max_workers at a time.
+    Jobs left unfinished by a process that died are marked failed on startup or lookup."""
+
+    def __init__(self, database_uri, max_workers=2, store=None, poll_interval=0.5,
+                 heartbeat_interval=HEARTBEAT_SECONDS, stale_after=STALE_AFTER_SECONDS):
+        self.database_uri = database_uri
+        self.max_workers = max_workers
+        self.store = store or MemoryJobStore()
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.stale_after = stale_after
+        self._queue = queue.Queue()
+        self._workers = []
+        self._lock = threading.Lock()
+        # Ids of the jobs submitted here that are not finished yet.
+        self._active = set()
+        self._heartbeat = None
+        self._expire()
+        # spawn gives every solver a clean interpreter instead of a fork of a threaded web worker.
+        self._context = multiprocessing.get_context("spawn")
+
+    def _ensure_workers(self):
+        with self._lock:
+            while len(self._workers) < self.max_workers:
+                worker = threading.Thread(target=self._work, daemon=True)
+                worker.start()
+                self._workers.append(worker)
+            if self._heartbeat is None:
+                self._heartbeat = threading.Thread(target=self._beat, daemon=True)
+                self._heartbeat.start()
+
+    def _beat(self):
+        while True:
+            time.sleep(self.heartbeat_interval)
+            with self._lock:
+                job_ids = list(self._active)
+            if job_ids:
+                self.store.touch(job_ids, time.time())
+
+    def _expire(self):
+        now = time.time()
+        self.store.expire(now - self.stale_after, now)
+
+    def submit(self, options=None):
+        """Queue a solve with the given generate_schedule keyword arguments and return its job id."""
+        job_id = uuid.uuid4().hex
+        self.store.create(job_id, options or {})
+        with self._lock:
+            self._active.add(job_id)
+        self._ensure_workers()
+        self._queue.put(job_id)
+        return job_id
+
+    def get(self, job_id):
+        job = self.store.get(job_id)
+        if job and job["status"] not in FINISHED_STATUSES and job["heartbeat_at"] < time.time() - self.stale_after:
+            self._expire()
+            job = self.store.get(job_id)
+        return job
+
+    def cancel(self, job_id):
+        """Cancel a queued or running job. Returns the job, or None if it does not exist."""
+        job = self.get(job_id)
+        if job is None or job["status"] in FINISHED_STATUSES:
+            return job
+        # If the job moved on in the meantime, report where it is now.
+        self.store.update_if(job_id, job["status"], status="cancelled", finished_at=time.time())
+        return self.store.get(job_id)
+
+    def _work(self):
+        while True:
+            job_id = self._queue.get()
+            try:
+                self._run(job_id)
+            finally:
+                with self._lock:
+                    self._active.discard(job_id)
+                self._queue.task_done()
+
+    def _run(self, job_id):
+        job = self.store.get(job_id)
+        if job is None or job["status"] != "queued":
+            return
+
+        # A cancel may have come in since the job was read; only start it if it is still queued.
+        if not self.store.update_if(job_id, "queued", status="running", started_at=time.time()):
+            return
+        receiver, sender = self._context.Pipe(duplex=False)
+        process = self._context.Process(
+            target=_solve_in_process, args=(self.database_uri, job["options"], sender), daemon=True
+        )
+        process.start()
+        sender.close()
+
+        outcome = None
+        while outcome is None:
+            # Poll instead of blocking on recv so a cancel from any web worker is noticed.
+            if self.store.get(job_id)["status"] != "running":
+                process.terminate()
+                break
+            if receiver.poll(self.poll_interval):
+                try:
+                    outcome = receiver.recv()
+                except EOFError:
+                    outcome = ("error", f"Solver process exited with code {process.exitcode}")
+        process.join()
+        receiver.close()
+
+        if outcome is None:
+            return
+        kind, payload = outcome
+        if kind == "result":
+            self.store.update_if(job_id, "running", status="finished", result=payload, finished_at=time.time())
+        else:
+            self.store.update_if(job_id, "running", status="failed", error=payload, finished_at=time.time())
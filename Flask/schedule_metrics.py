@@ -0,0 +1,109 @@
+import threading
+import time
+
+# Solver statistics that are summed over requests, by the name they have in solver_stats.
+SOLVER_COUNTERS = ("branches", "conflicts", "solutions")
+
+
+class RequestMetrics:
+    """Timing spans and counters of one generate_schedule call; build phases are children of the "build" span."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans = []
+        self.model = {}
+        self.solver = {}
+
+    def add_span(self, name, phase_started, phase_ended=None, children=None):
+        """Record a phase that started at the given perf_counter() time and ended at
+        phase_ended, or now. children maps sub-phases to their durations in seconds."""
+        phase_ended = time.perf_counter() if phase_ended is None else phase_ended
+        span = {
+            "name": name,
+            "start": round(phase_started - self.started, 4),
+            "seconds": round(phase_ended - phase_started, 4),
+        }
+        if children:
+            span["children"] = [{"name": child, "seconds": round(seconds, 4)}
+                                for child, seconds in children.items() if child != "total"]
+        self.spans.append(span)
+
+    def as_dict(self):
+        return {
+            "total_seconds": round(time.perf_counter() - self.started, 4),
+            "spans": self.spans,
+            "model": self.model,
+            "solver": self.solver,
+        }
+
+
+class MetricsRegistry:
+    """Thread-safe totals over every generate_schedule call of this process, in the Prometheus text format."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._requests = {}
+        self._phase_seconds = {}
+        self._phase_count = {}
+        self._solver_totals = dict.fromkeys(SOLVER_COUNTERS, 0)
+        self._last = {}
+
+    def record(self, outcome, metrics):
+        """Add one call, its outcome (e.g. "scheduled" or "infeasible") and its RequestMetrics."""
+        with self._lock:
+            self._requests[outcome] = self._requests.get(outcome, 0) + 1
+            for span in metrics.spans:
+                self._phase_seconds[span["name"]] = self._phase_seconds.get(span["name"], 0) + span["seconds"]
+                self._phase_count[span["name"]] = self._phase_count.get(span["name"], 0) + 1
+            for name in SOLVER_COUNTERS:
+                self._solver_totals[name] += metrics.solver.get(name) or 0
+            if metrics.model:
+                self._last["model"] = dict(metrics.model)
+            if metrics.solver:
+                self._last["solver"] = dict(metrics.solver)
+
+    def render(self):
+        """Return the totals as Prometheus text exposition format."""
+        with self._lock:
+            lines = [
+                "# HELP scheduler_requests_total Schedule generations by outcome.",
+                "# TYPE scheduler_requests_total counter",
+            ]
+            lines += [f'scheduler_requests_total{{outcome="{outcome}"}} {count}'
+                      for outcome, count in sorted(self._requests.items())]
+            lines += [
+                "# HELP scheduler_phase_seconds Time spent in each phase of schedule generation.",
+                "# TYPE scheduler_phase_seconds summary",
+            ]
+            for phase in sorted(self._phase_seconds):
+                lines.append(f'scheduler_phase_seconds_sum{{phase="{phase}"}} {self._phase_seconds[phase]:.6f}')
+                lines.append(f'scheduler_phase_seconds_count{{phase="{phase}"}} {self._phase_count[phase]}')
+            for name in SOLVER_COUNTERS:
+                lines += [
+                    f"# HELP scheduler_solver_{name}_total CP-SAT {name} summed over every solve.",
+                    f"# TYPE scheduler_solver_{name}_total counter",
+                    f"scheduler_solver_{name}_total {self._solver_totals[name]}",
+                ]
+            model = self._last.get("model", {})
+            solver = self._last.get("solver", {})
+            gauges = [
+                ("scheduler_last_model_variables", "Decision variables of the last model built.",
+                 [("", model.get("variables"))]),
+                ("scheduler_last_model_constraints", "Constraints of the last model built, by family.",
+                 [(f'{{family="{family}"}}', count)
+                  for family, count in sorted(model.get("constraints_by_family", {}).items())]),
+                ("scheduler_last_solve_seconds", "Wall time of the last solve.",
+                 [("", solver.get("wall_time"))]),
+                ("scheduler_last_objective_value", "Objective value of the last schedule found.",
+                 [("", solver.get("objective_value"))]),
+            ]
+            for name, help_text, samples in gauges:
+                samples = [(labels, value) for labels, value in samples if value is not None]
+                if samples:
+                    lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+                    lines += [f"{name}{labels} {value}" for labels, value in samples]
+        return "\n".join(lines) + "\n"
+
+
+# Shared by every request in this process, like schedule_cache.
+metrics_registry = MetricsRegistry()
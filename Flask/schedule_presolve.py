@@ -0,0 +1,139 @@
+def eligible_rooms(course, rooms, room_restrictions_map):
+    """Return the rooms that fit the course's enrollment and satisfy its room restrictions."""
+    eligible = []
+    for room in rooms:
+        if course.max_students > room.capacity:
+            continue
+        if course.id in room_restrictions_map and room.id not in room_restrictions_map[course.id]:
+            continue
+        eligible.append(room)
+    return eligible
+
+
+def _diagnostic(check, message, **ids):
+    return {"check": check, "message": message, **ids}
+
+
+def find_warnings(inputs):
+    """Report time slots whose days or time cannot be read, in the same form as
+    find_infeasibilities. The snapshot leaves them out, so the schedule can still be
+    solved without them, but they should be fixed rather than silently unused."""
+    return [
+        _diagnostic(
+            "unreadable_time_slot",
+            f"Time slot {ts.meeting_days} {ts.time} has no readable meeting days or time, "
+            f"so no class can be placed in it.",
+            time_slot_id=ts.id,
+        )
+        for ts in inputs["time_slots"] if not ts.days or ts.start_minute is None
+    ]
+
+
+def find_infeasibilities(inputs, room_constraint="no_overlap"):
+    """Check the loaded inputs for reasons no schedule can exist, without building a model.
+    Diagnostics are dicts with the failed "check", a readable "message" and the ids involved."""
+    diagnostics = []
+    professors_dict = {prof.id: prof for prof in inputs["professors"]}
+    rooms_per_slot = len(inputs["rooms"]) if room_constraint == "no_overlap" else 1
+    slot_demand_by_day = {}
+    credit_demand = 0
+    qualified_profs = set()
+
+    for course in inputs["courses"]:
+        course_secs = inputs["sections_by_course"].get(course.id, [])
+        if not course_secs:
+            continue
+        ts_list = inputs["time_slots_by_day"].get(course.meeting_days, [])
+        available_profs = [prof_id for prof_id in inputs["course_to_professors"].get(course.id, [])
+                           if prof_id in professors_dict]
+        course_rooms = eligible_rooms(course, inputs["rooms"], inputs["room_restrictions_map"])
+        duration = course.slots_needed
+        blocks = [{ts.id for ts in ts_list[s: s + duration]} for s in range(len(ts_list) - duration + 1)]
+        demand = len(course_secs) * course.credit_hours
+        slot_demand_by_day[course.meeting_days] = (
+            slot_demand_by_day.get(course.meeting_days, 0) + len(course_secs) * duration
+        )
+        credit_demand += demand
+        qualified_profs.update(available_profs)
+
+        if not available_profs:
+            diagnostics.append(_diagnostic(
+                "no_qualified_professor", f"No professor is qualified to teach {course.name}.",
+                course_id=course.id,
+            ))
+        if not course_rooms:
+            diagnostics.append(_diagnostic(
+                "no_eligible_room",
+                f"No allowed room holds the {course.max_students} students of {course.name}.",
+                course_id=course.id,
+            ))
+        if not blocks:
+            diagnostics.append(_diagnostic(
+                "no_time_block",
+                f"{course.name} needs {duration} consecutive slots but {course.meeting_days} "
+                f"only has {len(ts_list)} readable ones.",
+                course_id=course.id,
+            ))
+        if not available_profs or not blocks:
+            continue
+
+        # A professor can only teach the course in blocks that overlap no slot they are
+        # restricted from.
+        open_blocks_by_prof = {
+            prof_id: [block for block in blocks
+                      if not inputs["time_axis"].overlaps(block, inputs["restricted_slots_by_prof"].get(prof_id, []))]
+            for prof_id in available_profs
+        }
+        if not any(open_blocks_by_prof.values()):
+            diagnostics.append(_diagnostic(
+                "professors_restricted",
+                f"Every professor qualified for {course.name} is restricted from every time block it could use.",
+                course_id=course.id, professor_ids=available_profs,
+            ))
+
+        capacity = sum(professors_dict[prof_id].max_credit_hours for prof_id in available_profs)
+        if demand > capacity:
+            diagnostics.append(_diagnostic(
+                "professor_credit_hours",
+                f"{course.name} needs {demand} credit hours but its qualified professors can "
+                f"teach at most {capacity}.",
+                course_id=course.id, demand=demand, capacity=capacity,
+            ))
+
+        # Each block, room or professor takes at most one section at a time.
+        if course_rooms:
+            room_capacity = len(ts_list) * (len(course_rooms) if room_constraint == "no_overlap" else 1)
+            if len(course_secs) * duration > room_capacity:
+                diagnostics.append(_diagnostic(
+                    "room_capacity",
+                    f"{course.name} has {len(course_secs)} sections but its rooms only have "
+                    f"{room_capacity // duration} free blocks.",
+                    course_id=course.id, sections=len(course_secs), capacity=room_capacity // duration,
+                ))
+        prof_capacity = sum(len(open_blocks) for open_blocks in open_blocks_by_prof.values())
+        if any(open_blocks_by_prof.values()) and len(course_secs) > prof_capacity:
+            diagnostics.append(_diagnostic(
+                "professor_time",
+                f"{course.name} has {len(course_secs)} sections but its qualified professors "
+                f"only have {prof_capacity} open time blocks.",
+                course_id=course.id, sections=len(course_secs), capacity=prof_capacity,
+            ))
+
+    capacity = sum(professors_dict[prof_id].max_credit_hours for prof_id in qualified_profs)
+    if credit_demand > capacity:
+        diagnostics.append(_diagnostic(
+            "professor_credit_hours",
+            f"All sections need {credit_demand} credit hours but the qualified professors can "
+            f"teach at most {capacity}.",
+            demand=credit_demand, capacity=capacity,
+        ))
+
+    for day, slot_demand in slot_demand_by_day.items():
+        capacity = len(inputs["time_slots_by_day"].get(day, [])) * rooms_per_slot
+        if slot_demand > capacity:
+            diagnostics.append(_diagnostic(
+                "room_capacity",
+                f"{day} sections need {slot_demand} room slots but only {capacity} exist.",
+                day=day, demand=slot_demand, capacity=capacity,
+            ))
+    return diagnostics
@@ -0,0 +1,67 @@
+import numpy as np
+from ortools.graph.python import min_cost_flow
+
+
+def _match(sections, free_rooms, waste):
+    """Min-cost matching of sections to rooms, as {section index: room id} or None if some
+    section gets no room. free_rooms[i] lists the rooms section i may take and
+    waste[i][j] the cost of giving it free_rooms[i][j]."""
+    room_ids = sorted({room_id for rooms in free_rooms for room_id in rooms})
+    room_node = {room_id: len(sections) + 1 + index for index, room_id in enumerate(room_ids)}
+    source, sink = 0, len(sections) + len(room_ids) + 1
+    tails, heads, costs = [], [], []
+    for i, rooms in enumerate(free_rooms):
+        tails.append(source)
+        heads.append(i + 1)
+        costs.append(0)
+        for room_id, cost in zip(rooms, waste[i]):
+            tails.append(i + 1)
+            heads.append(room_node[room_id])
+            costs.append(cost)
+    for room_id in room_ids:
+        tails.append(room_node[room_id])
+        heads.append(sink)
+        costs.append(0)
+
+    flow = min_cost_flow.SimpleMinCostFlow()
+    arcs = flow.add_arcs_with_capacity_and_unit_cost(np.array(tails), np.array(heads),
+                                                     np.ones(len(tails), dtype=np.int64), np.array(costs))
+    flow.set_nodes_supplies(np.array([source, sink]), np.array([len(sections), -len(sections)]))
+    if flow.solve() != flow.OPTIMAL:
+        return None
+    matched = {}
+    for arc, tail, head in zip(arcs.tolist(), tails, heads):
+        if tail != source and head != sink and flow.flow(arc):
+            matched[tail - 1] = room_ids[head - len(sections) - 1]
+    return matched
+
+
+def assign_rooms(placements, inputs):
+    """Give every placed section a room, matching each start's sections by a min-cost flow over empty seats.
+    placements are (section id, course id, days, start minute, atoms, room ids); returns {section id: room id}
+    or None if some section finds no free room."""
+    rooms_dict = inputs["rooms_dict"]
+    courses_dict = inputs["courses_dict"]
+    # room id -> atoms already taken
+    busy = {}
+    by_start = {}
+    for placement in placements:
+        by_start.setdefault((placement[3], placement[2]), []).append(placement)
+
+    rooms = {}
+    for _, sections in sorted(by_start.items()):
+        free_rooms = []
+        waste = []
+        for _, course_id, _, _, atoms, room_ids in sections:
+            free = [room_id for room_id in room_ids if busy.get(room_id, set()).isdisjoint(atoms)]
+            free_rooms.append(free)
+            waste.append([rooms_dict[room_id].capacity - courses_dict[course_id].max_students
+                          for room_id in free])
+        matched = _match(sections, free_rooms, waste)
+        if matched is None:
+            return None
+        for i, room_id in matched.items():
+            section_id, _, _, _, atoms, _ = sections[i]
+            rooms[section_id] = room_id
+            busy.setdefault(room_id, set()).update(atoms)
+    return rooms
@@ -0,0 +1,90 @@
+from collections import namedtuple
+from immutabledict import immutabledict
+from models import Course, Professor, CourseProfessor, Room, RoomRestriction, TimeSlot, Section, TimeRestrictions
+from schedule_time import TimeAxis, day_mask, day_pattern, slot_minutes
+
+# Plain copies of the loaded rows, which can be hashed, shared between requests and sent
+# to another process.
+CourseRow = namedtuple("CourseRow", "id name credit_hours meeting_days slots_needed max_students")
+ProfessorRow = namedtuple("ProfessorRow", "id name max_credit_hours")
+RoomRow = namedtuple("RoomRow", "id name capacity")
+# start_minute and end_minute are resolved as slot_minutes reads them, and days is the
+# day mask of meeting_days; all three are None or 0 when they cannot be read.
+TimeSlotRow = namedtuple("TimeSlotRow", "id time meeting_days penalty start_minute end_minute days")
+SectionRow = namedtuple("SectionRow", "id course_id section_number")
+CourseProfessorRow = namedtuple("CourseProfessorRow", "course_id professor_id")
+RoomRestrictionRow = namedtuple("RoomRestrictionRow", "course_id room_id")
+
+
+def _rows(db_session, row_type, *columns):
+    """Read the given columns of every row as row_type tuples, ordered by the columns,
+    which starts with the table's primary key."""
+    return tuple(map(row_type._make, db_session.query(*columns).order_by(*columns).all()))
+
+
+def _group(pairs):
+    """Map each key to the tuple of values paired with it, in the order given."""
+    grouped = {}
+    for key, value in pairs:
+        grouped.setdefault(key, []).append(value)
+    return immutabledict((key, tuple(values)) for key, values in grouped.items())
+
+
+def _days(pattern):
+    """(canonical pattern, day mask) of a meeting pattern, or (pattern, 0) if it is not one."""
+    try:
+        mask = day_mask(pattern)
+    except ValueError:
+        return pattern, 0
+    return day_pattern(mask), mask
+
+
+def _time_slot_row(ts_id, time, meeting_days, penalty, start_minute, end_minute):
+    meeting_days, days = _days(meeting_days)
+    start_minute, end_minute = slot_minutes(time, start_minute, end_minute) or (None, None)
+    return TimeSlotRow(ts_id, time, meeting_days, penalty, start_minute, end_minute, days)
+
+
+def load_snapshot(db_session):
+    """Load everything the model is built from, one query per table, into an immutabledict indexed by id."""
+    courses = tuple(course._replace(meeting_days=_days(course.meeting_days)[0])
+                    for course in _rows(db_session, CourseRow, Course.id, Course.name, Course.credit_hours,
+                                        Course.meeting_days, Course.slots_needed, Course.max_students))
+    professors = _rows(db_session, ProfessorRow, Professor.id, Professor.name, Professor.max_credit_hours)
+    course_professors = _rows(db_session, CourseProfessorRow, CourseProfessor.course_id, CourseProfessor.professor_id)
+    rooms = _rows(db_session, RoomRow, Room.id, Room.name, Room.capacity)
+    room_restrictions = _rows(db_session, RoomRestrictionRow, RoomRestriction.course_id, RoomRestriction.room_id)
+    time_slots = tuple(_time_slot_row(*row) for row in db_session.query(
+        TimeSlot.id, TimeSlot.time, TimeSlot.meeting_days, TimeSlot.penalty, TimeSlot.start_minute, TimeSlot.end_minute
+    ).order_by(TimeSlot.id).all())
+    sections = _rows(db_session, SectionRow, Section.id, Section.course_id, Section.section_number)
+    time_restrictions = (db_session.query(TimeRestrictions.professor_id, TimeRestrictions.timeslot_id)
+                         .order_by(TimeRestrictions.professor_id, TimeRestrictions.timeslot_id).all())
+
+    # Professors without restrictions still get an entry.
+    restricted_slots = _group(time_restrictions)
+    restricted_slots_by_prof = immutabledict((prof.id, restricted_slots.get(prof.id, ())) for prof in professors)
+
+    return immutabledict({
+        "courses": courses,
+        "professors": professors,
+        "rooms": rooms,
+        "time_slots": time_slots,
+        "sections": sections,
+        "course_professors": course_professors,
+        "room_restrictions": room_restrictions,
+        "courses_dict": immutabledict((c.id, c) for c in courses),
+        "professors_dict": immutabledict((p.id, p) for p in professors),
+        "rooms_dict": immutabledict((r.id, r) for r in rooms),
+        "section_ids": frozenset(sec.id for sec in sections),
+        "time_str_by_id": immutabledict((ts.id, ts.time) for ts in time_slots),
+        "course_to_professors": _group(course_professors),
+        "room_restrictions_map": _group(room_restrictions),
+        # Each meeting pattern's slots in order of time, so consecutive slots form blocks.
+        "time_slots_by_day": _group((ts.meeting_days, ts) for ts in sorted(
+            (ts for ts in time_slots if ts.days and ts.start_minute is not None),
+            key=lambda ts: (ts.start_minute, ts.end_minute, ts.id))),
+        "time_axis": TimeAxis(time_slots),
+        "sections_by_course": _group((sec.course_id, sec) for sec in sections),
+        "restricted_slots_by_prof": restricted_slots_by_prof,
+    })
@@ -0,0 +1,137 @@
+from sqlalchemy import insert
+from models import db, Course, Professor, Room, Section, TimeSlot, ScheduleModel, ScheduleVersion
+from schedule_time import normalize_days, slot_minutes
+
+
+def save_schedule(db_session, assignments, objective_value=None):
+    """Store solved assignments as a new schedule version in one transaction and return its id."""
+    try:
+        version = ScheduleVersion(objective_value=objective_value)
+        db_session.add(version)
+        db_session.flush()
+        rows = [
+            {
+                "version_id": version.id,
+                "section_id": section_id,
+                "professor_id": prof_id,
+                "room_id": room_id,
+                "time_slot_id": ts_id,
+            }
+            for section_id, _, prof_id, _, block_slot_ids, room_id in assignments
+            for ts_id in block_slot_ids
+        ]
+        if rows:
+            db_session.execute(insert(ScheduleModel), rows)
+        db_session.commit()
+    except Exception:
+        db_session.rollback()
+        raise
+    return version.id
+
+
+def latest_version_id():
+    """Return the id of the most recently saved schedule version, or None."""
+    return db.session.query(db.func.max(ScheduleVersion.id)).scalar()
+
+
+def _slot_start(time, start_minute, end_minute):
+    """Sort key of a saved time slot: its start in minutes from midnight, unreadable slots last."""
+    minutes = slot_minutes(time, start_minute, end_minute)
+    return minutes[0] if minutes else float("inf")
+
+
+def _days(meeting_days):
+    """The canonical spelling of a saved slot's meeting days, as generate_schedule returns them."""
+    try:
+        return normalize_days(meeting_days)
+    except ValueError:
+        return meeting_days
+
+
+def load_assignments(version_id):
+    """Return {section_id: (professor_id, room_id, block_slot_ids)} for a saved schedule version,
+    with each block's slots in order of time."""
+    rows = (
+        db.session.query(
+            ScheduleModel.section_id,
+            ScheduleModel.professor_id,
+            ScheduleModel.room_id,
+            ScheduleModel.time_slot_id,
+            TimeSlot.time,
+            TimeSlot.start_minute,
+            TimeSlot.end_minute,
+        )
+        .join(TimeSlot, TimeSlot.id == ScheduleModel.time_slot_id)
+        .filter(ScheduleModel.version_id == version_id)
+        .order_by(ScheduleModel.section_id, ScheduleModel.time_slot_id)
+        .all()
+    )
+    slots_by_section = {}
+    assignments = {}
+    for section_id, prof_id, room_id, ts_id, *slot_time in rows:
+        slots_by_section.setdefault(section_id, []).append((_slot_start(*slot_time), ts_id))
+        assignments[section_id] = (prof_id, room_id)
+    return {
+        section_id: (prof_id, room_id, tuple(ts_id for _, ts_id in sorted(slots_by_section[section_id])))
+        for section_id, (prof_id, room_id) in assignments.items()
+    }
+
+
+def load_schedule(version_id):
+    """Read a saved schedule version back in the same layout generate_schedule returns.
+
+    Returns None if the version does not exist.
+    """
+    version = db.session.get(ScheduleVersion, version_id)
+    if version is None:
+        return None
+
+    rows = (
+        db.session.query(
+            ScheduleModel.section_id,
+            Course.name,
+            Professor.name,
+            Room.name,
+            TimeSlot.time,
+            TimeSlot.meeting_days,
+            TimeSlot.start_minute,
+            TimeSlot.end_minute,
+        )
+        .join(Section, Section.id == ScheduleModel.section_id)
+        .join(Course, Course.id == Section.course_id)
+        .join(Professor, Professor.id == ScheduleModel.professor_id)
+        .join(Room, Room.id == ScheduleModel.room_id)
+        .join(TimeSlot, TimeSlot.id == ScheduleModel.time_slot_id)
+        .filter(ScheduleModel.version_id == version_id)
+        .order_by(ScheduleModel.section_id, TimeSlot.id)
+        .all()
+    )
+
+    # One row per time slot; fold the rows of each section back into one entry, with its
+    # slots in order of time.
+    entries = {}
+    slots_by_section = {}
+    for section_id, course_name, prof_name, room_name, slot_time, meeting_days, start_minute, end_minute in rows:
+        if section_id not in entries:
+            entries[section_id] = {
+                "course_name": course_name,
+                "section_id": section_id,
+                "professor": prof_name,
+                "start_time": None,
+                "time_slots": [],
+                "room": room_name,
+                "days": _days(meeting_days),
+            }
+        slots_by_section.setdefault(section_id, []).append(
+            (_slot_start(slot_time, start_minute, end_minute), slot_time))
+    for section_id, slots in slots_by_section.items():
+        slots.sort()
+        entries[section_id]["start_time"] = slots[0][1]
+        entries[section_id]["time_slots"] = [slot_time for _, slot_time in slots]
+
+    schedule = sorted(entries.values(), key=lambda x: (x["days"], slots_by_section[x["section_id"]][0][0]))
+    return {
+        "status": "Schedule loaded successfully.",
+        "version": version.to_dict(),
+        "schedule": schedule,
+    }
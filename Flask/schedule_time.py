@@ -0,0 +1,180 @@
+import re
+import numpy as np
+
+# Weekdays and their bit in a day mask, in the order patterns are written.
+DAYS = (("M", 1), ("T", 2), ("W", 4), ("Th", 8), ("F", 16), ("Sa", 32), ("Su", 64))
+# Letters accepted in a meeting pattern. Thursday is "Th" or "R" and Sunday "Su" or "U",
+# so "TTh" and "TR" are the same pattern.
+_DAY_BITS = {"M": 1, "T": 2, "Tu": 2, "W": 4, "Th": 8, "R": 8, "F": 16, "Sa": 32, "Su": 64, "U": 64}
+_DAY_TOKEN = re.compile("Th|Tu|Sa|Su|[MTWRFU]")
+_CLOCK = re.compile(r"^\s*(\d{1,2})(?::(\d{2}))?\s*([AaPp])\.?[Mm]?\.?\s*$|^\s*(\d{1,2}):(\d{2})\s*$")
+# Length of a slot whose end is not stored, which is how long a class meets on MWF.
+DEFAULT_SLOT_MINUTES = 50
+
+
+def day_mask(pattern):
+    """Return the day mask of a meeting pattern such as "MWF", "TTh", "TR", "MW" or "Sa".
+
+    Raises ValueError if the pattern is empty or has anything but day letters.
+    """
+    tokens = _DAY_TOKEN.findall(pattern) if isinstance(pattern, str) else []
+    if not tokens or "".join(tokens) != pattern:
+        raise ValueError(f"meeting days must be day letters such as MWF, TTh or MW, got {pattern!r}")
+    mask = 0
+    for token in tokens:
+        mask |= _DAY_BITS[token]
+    return mask
+
+
+def day_pattern(mask):
+    """Return the canonical pattern of a day mask, e.g. "MWF" or "TTh"."""
+    return "".join(letter for letter, bit in DAYS if mask & bit)
+
+
+def normalize_days(pattern):
+    """Return the canonical spelling of a meeting pattern ("TR" becomes "TTh"); see day_mask."""
+    return day_pattern(day_mask(pattern))
+
+
+def _clock_parts(text):
+    """(hour, minute, "a" / "p" / None) of a clock time, or None if it is not one."""
+    match = _CLOCK.match(text)
+    if match is None:
+        return None
+    if match.group(1) is not None:
+        hour, minute, meridiem = int(match.group(1)), int(match.group(2) or 0), match.group(3).lower()
+        if not 1 <= hour <= 12:
+            return None
+    else:
+        hour, minute, meridiem = int(match.group(4)), int(match.group(5)), None
+        if hour > 23:
+            return None
+    return (hour, minute, meridiem) if minute < 60 else None
+
+
+def _minutes(hour, minute, meridiem):
+    if meridiem is not None:
+        hour = hour % 12 + (12 if meridiem == "p" else 0)
+    elif 1 <= hour <= 6:
+        hour += 12
+    return hour * 60 + minute
+
+
+def parse_clock(text):
+    """Return the minutes from midnight of a clock time such as "8:00AM", "2:30PM" or "14:30", or None.
+    Without AM or PM the hours 1 to 6 are afternoon hours."""
+    parts = _clock_parts(text) if isinstance(text, str) else None
+    return _minutes(*parts) if parts else None
+
+
+def format_clock(minute):
+    """Write minutes from midnight the way time slots are named, e.g. 570 as "9:30AM"."""
+    hour, minute = divmod(minute, 60)
+    return f"{(hour - 1) % 12 + 1}:{minute:02d}{'AM' if hour < 12 else 'PM'}"
+
+
+def slot_minutes(time, start_minute=None, end_minute=None):
+    """Return the (start, end) minutes of a time slot from its stored minutes or its time, or None if unknown."""
+    if start_minute is not None:
+        end = end_minute if end_minute is not None else start_minute + DEFAULT_SLOT_MINUTES
+        return (start_minute, end) if end > start_minute else None
+    if not isinstance(time, str):
+        return None
+    bounds = re.split("[-–]", time)
+    if len(bounds) == 1:
+        start = parse_clock(bounds[0])
+        return None if start is None else (start, start + DEFAULT_SLOT_MINUTES)
+    if len(bounds) != 2:
+        return None
+    first, last = _clock_parts(bounds[0]), _clock_parts(bounds[1])
+    if first is None or last is None:
+        return None
+    end = _minutes(*last)
+    start = _minutes(*first)
+    # In "1:00-2:15PM" the start takes the end's AM or PM, as long as it still comes first.
+    if first[2] is None and last[2] is not None and first[0] <= 12:
+        start = _minutes(first[0], first[1], last[2])
+        if start >= end:
+            start = _minutes(first[0], first[1], "a")
+    return (start, end) if end > start else None
+
+
+class TimeAxis:
+    """The time slots laid out on one axis of atoms per day group; slots overlap exactly when they share an atom."""
+
+    def __init__(self, time_slots):
+        self.slot_ids = [ts.id for ts in time_slots]
+        # Slots without days or minutes take no time and overlap nothing. Weekdays that
+        # carry exactly the same slots form a day group, whose slot bounds cut it into atoms.
+        timed = [ts for ts in time_slots if ts.days and ts.start_minute is not None]
+        slots_by_group = {}
+        for _, bit in DAYS:
+            members = tuple(ts for ts in timed if ts.days & bit)
+            if members:
+                slots_by_group[members] = slots_by_group.get(members, 0) | bit
+
+        # Day mask of each group, and ts_id -> (group, first atom, end atom) of every group the slot meets in
+        self.groups = []
+        self.spans = {}
+        # (group, start minute, end minute) of each atom
+        self.atoms = []
+        for group, (members, mask) in enumerate(slots_by_group.items()):
+            self.groups.append(mask)
+            cuts = sorted({minute for ts in members for minute in (ts.start_minute, ts.end_minute)})
+            # Stretches no slot covers get no atom.
+            segments = [(start, end) for start, end in zip(cuts, cuts[1:])
+                        if any(ts.start_minute <= start and end <= ts.end_minute for ts in members)]
+            first_atom = {start: len(self.atoms) + i for i, (start, _) in enumerate(segments)}
+            end_atom = {end: len(self.atoms) + i + 1 for i, (_, end) in enumerate(segments)}
+            self.atoms.extend((group, start, end) for start, end in segments)
+            for ts in members:
+                self.spans.setdefault(ts.id, []).append((group, first_atom[ts.start_minute], end_atom[ts.end_minute]))
+
+        # (group, end minute, start minute) of each slot's end and the first start after it among
+        # slots meeting on the same days, so classes in consecutive slots can be found.
+        self.adjacent = set()
+        for ts in timed:
+            later = [other.start_minute for other in timed
+                     if other.days == ts.days and other.start_minute >= ts.end_minute]
+            if later:
+                self.adjacent.update((group, ts.end_minute, min(later)) for group, _, _ in self.spans[ts.id])
+
+        covers = np.zeros((len(self.slot_ids), len(self.atoms)), dtype=bool)
+        for index, ts_id in enumerate(self.slot_ids):
+            for _, first, end in self.spans.get(ts_id, ()):
+                covers[index, first:end] = True
+        # overlap[t, u]: slots t and u meet at the same time, in slot_ids order
+        self.overlap = covers @ covers.T
+        slot_ids = np.array(self.slot_ids, dtype=np.int64)
+        self.overlapping = {ts_id: frozenset(slot_ids[self.overlap[index]].tolist())
+                            for index, ts_id in enumerate(self.slot_ids) if ts_id in self.spans}
+
+    @property
+    def num_atoms(self):
+        return len(self.atoms)
+
+    def block_spans(self, block_slot_ids):
+        """(group, first atom, end atom) of every group a block of slots of one pattern
+        meets in. The block holds its room and professor from the start of its earliest
+        slot to the end of its latest, breaks included."""
+        spans = [self.spans[ts_id] for ts_id in block_slot_ids]
+        return [(group_spans[0][0], min(span[1] for span in group_spans), max(span[2] for span in group_spans))
+                for group_spans in zip(*spans)]
+
+    def block_bounds(self, block_slot_ids):
+        """(group, start minute, end minute) of every group a block meets in (see block_spans)."""
+        return [(group, self.atoms[first][1], self.atoms[end - 1][2])
+                for group, first, end in self.block_spans(block_slot_ids)]
+
+    def block_atoms(self, block_slot_ids):
+        """The ids of every atom a block of slots holds (see block_spans)."""
+        return [atom for _, first, end in self.block_spans(block_slot_ids) for atom in range(first, end)]
+
+    def overlaps(self, slot_ids, other_slot_ids):
+        """Whether any of slot_ids meets at the same time as any of other_slot_ids."""
+        return any(not self.overlapping.get(ts_id, frozenset()).isdisjoint(other_slot_ids) for ts_id in slot_ids)
+
+    def describe(self, atom):
+        """Name an atom for people, e.g. "MWF 9:30AM-10:20AM"."""
+        group, start, end = self.atoms[atom]
+        return f"{day_pattern(self.groups[group])} {format_clock(start)}-{format_clock(end)}"
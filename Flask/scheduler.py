@@ -1,184 +1,1718 @@
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+import numpy as np
 from ortools.sat.python import cp_model
-from models import Course, Professor, CourseProfessor, Room, RoomRestriction, TimeSlot, Section, ScheduleModel
-
-def generate_schedule(db_session):
-    """Generate the schedule using OR-Tools allowing multi-slot courses and return the results as a dictionary."""
-    # Load data from the database
-    courses = Course.query.all()
-    professors = Professor.query.all()
-    course_professors = CourseProfessor.query.all()
-    rooms = Room.query.all()
-    room_restrictions = RoomRestriction.query.all()
-    time_slots = TimeSlot.query.all()
-    sections = Section.query.all()
-
-    # Build convenient mappings (by id)
-    courses_dict = {c.id: c for c in courses}
-    professors_dict = {p.id: p for p in professors}
-    rooms_dict = {r.id: r for r in rooms}
-    
-    # Map course_id to list of professor_ids who can teach that course.
-    course_to_professors = {}
-    for cp in course_professors:
-        course_to_professors.setdefault(cp.course_id, []).append(cp.professor_id)
-    
-    # Map course_id to allowed rooms (if a restriction exists)
-    room_restrictions_map = {}
-    for rr in room_restrictions:
-        room_restrictions_map.setdefault(rr.course_id, []).append(rr.room_id)
-    
-    # Map meeting_days (MWF, TTh) to list of time slots and sort them.
-    time_slots_by_day = {}
-    for ts in time_slots:
-        time_slots_by_day.setdefault(ts.meeting_days, []).append(ts)
-    for day in time_slots_by_day:
-        time_slots_by_day[day] = sorted(time_slots_by_day[day], key=lambda x: x.id)
-    
-    # Map course_id to list of sections
-    sections_by_course = {}
-    for sec in sections:
-        sections_by_course.setdefault(sec.course_id, []).append(sec)
-    
-    # Build a mapping from time slot ID to time string.
-    time_str_by_id = {ts.id: ts.time for ts in time_slots}
-    
-    # Build the CP model
+from schedule_cache import fingerprint, schedule_cache
+from schedule_decompose import course_components, subproblem_inputs
+from schedule_eligibility import Eligibility, group_rows
+from schedule_explain import explain_infeasibility
+from schedule_metrics import RequestMetrics, metrics_registry
+from schedule_presolve import find_infeasibilities, find_warnings
+from schedule_rooms import assign_rooms
+from schedule_snapshot import load_snapshot
+from schedule_store import latest_version_id, load_assignments, save_schedule
+
+ROOM_CONSTRAINTS = ("no_overlap", "global_slot")
+# How the joint formulation keeps a room to one class at a time under "no_overlap": at
+# most one chosen literal per (room, atom), or no overlap between optional intervals.
+# python -m benchmarks.room_occupancy compares the two.
+ROOM_OCCUPANCIES = ("at_most_one", "intervals")
+ROOM_OCCUPANCY = "at_most_one"
+FORMULATIONS = ("joint", "factored", "two_stage")
+# Keys of a schedule entry, in the column order of the compact layout.
+SCHEDULE_COLUMNS = ("course_name", "section_id", "professor", "start_time", "time_slots", "room", "days")
+# Grouped layouts and the entry key they group by.
+GROUPED_LAYOUTS = {"by_professor": "professor", "by_room": "room", "by_day": "days"}
+SCHEDULE_LAYOUTS = ("list", "compact", *GROUPED_LAYOUTS)
+
+
+def _parse_flag(value):
+    """Parse a boolean given either as a bool or as a query string value."""
+    if isinstance(value, bool):
+        return value
+    if str(value).lower() in ("1", "true", "yes"):
+        return True
+    if str(value).lower() in ("0", "false", "no"):
+        return False
+    raise ValueError(f"Expected a boolean, got {value!r}")
+
+
+# CP-SAT parameters that can be set through solver_config, with the parser for each value.
+SOLVER_PARAMETERS = {
+    "num_search_workers": int,
+    "max_time_in_seconds": float,
+    "random_seed": int,
+    "relative_gap_limit": float,
+    "log_search_progress": _parse_flag,
+}
+
+
+# Terms of the objective with their default weights: only the spread of professor
+# loads counts unless other weights are given (see _soft_terms).
+OBJECTIVE_WEIGHTS = {
+    "load_difference": 1,
+    "time_slot": 0,
+    "back_to_back": 0,
+    "room_fit": 0,
+}
+
+
+def parse_objective_weights(objective_weights):
+    """Validate objective weights and fill in the defaults, raising ValueError on bad input."""
+    parsed = dict(OBJECTIVE_WEIGHTS)
+    for name, value in (objective_weights or {}).items():
+        if name not in OBJECTIVE_WEIGHTS:
+            raise ValueError(f"Unknown objective term {name!r}, expected one of {tuple(OBJECTIVE_WEIGHTS)}")
+        try:
+            parsed[name] = int(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid weight {value!r} for objective term {name!r}")
+        if parsed[name] < 0:
+            raise ValueError(f"Weight for objective term {name!r} must not be negative")
+    return parsed
+
+
+# Most minutes between one class ending and the next starting for the back_to_back term
+# to count the two as back to back. None counts a class starting in the slot that follows,
+# on the same meeting days, the slot another one ends in (see TimeAxis.adjacent).
+BACK_TO_BACK_GAP = None
+
+
+def parse_back_to_back_gap(back_to_back_gap):
+    """Validate the back_to_back gap in minutes, or None/"adjacent", raising ValueError on bad input."""
+    if back_to_back_gap in (None, "", "adjacent"):
+        return None
+    try:
+        gap = int(back_to_back_gap)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid back_to_back_gap {back_to_back_gap!r}, expected minutes")
+    if gap < 0:
+        raise ValueError("back_to_back_gap must not be negative")
+    return gap
+
+
+# Stages of the staged mode unless others are given: balance the professor loads
+# first, then minimize the soft preferences without unbalancing them.
+DEFAULT_STAGES = (("load_difference",), ("time_slot", "back_to_back", "room_fit"))
+STAGE_SETTINGS = ("terms", "max_time_in_seconds", "tolerance")
+
+
+def parse_stages(stages, objective_weights):
+    """Validate staged optimization settings against parsed objective weights, raising ValueError on bad input.
+    Stages left without weighted terms are dropped; the rest get "weights" instead of "terms"."""
+    parsed = []
+    seen = set()
+    for stage in stages or ():
+        unknown = set(stage) - set(STAGE_SETTINGS)
+        if unknown:
+            raise ValueError(f"Unknown stage settings {sorted(unknown)}, expected any of {STAGE_SETTINGS}")
+        terms = stage.get("terms") or ()
+        if isinstance(terms, str):
+            terms = [terms]
+        for name in terms:
+            if name not in OBJECTIVE_WEIGHTS:
+                raise ValueError(f"Unknown objective term {name!r}, expected one of {tuple(OBJECTIVE_WEIGHTS)}")
+            if name in seen:
+                raise ValueError(f"Objective term {name!r} appears in more than one stage")
+            seen.add(name)
+        try:
+            max_time_in_seconds = stage.get("max_time_in_seconds")
+            if max_time_in_seconds is not None:
+                max_time_in_seconds = float(max_time_in_seconds)
+            tolerance = int(stage.get("tolerance", 0))
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid max_time_in_seconds or tolerance in stage {stage!r}")
+        if tolerance < 0:
+            raise ValueError("Stage tolerance must not be negative")
+        weights = {name: objective_weights[name] for name in terms if objective_weights[name]}
+        if weights:
+            parsed.append({"weights": weights, "max_time_in_seconds": max_time_in_seconds, "tolerance": tolerance})
+    return parsed
+
+
+def parse_solver_config(solver_config):
+    """Validate solver settings and convert their values, raising ValueError on bad input."""
+    parsed = {}
+    for name, value in (solver_config or {}).items():
+        if name not in SOLVER_PARAMETERS:
+            raise ValueError(f"Unknown solver parameter {name!r}, expected one of {tuple(SOLVER_PARAMETERS)}")
+        try:
+            parsed[name] = SOLVER_PARAMETERS[name](value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid value {value!r} for solver parameter {name!r}")
+    return parsed
+
+
+def _configure_solver(solver, solver_config):
+    """Apply already parsed solver settings to the CP-SAT solver parameters."""
+    for name, value in solver_config.items():
+        setattr(solver.parameters, name, value)
+
+
+def _solver_stats(solver, status, publisher):
+    """Summarize a finished solve for the API response."""
+    stats = {
+        "status": solver.StatusName(status),
+        "wall_time": round(solver.WallTime(), 4),
+        "branches": solver.NumBranches(),
+        "conflicts": solver.NumConflicts(),
+        "solutions": publisher.num_solutions,
+        "first_solution_time": (
+            round(publisher.first_solution_time, 4) if publisher.first_solution_time is not None else None
+        ),
+    }
+    if status in (cp_model.FEASIBLE, cp_model.OPTIMAL):
+        stats["objective_value"] = solver.ObjectiveValue()
+        stats["best_objective_bound"] = solver.BestObjectiveBound()
+    return stats
+
+
+def _locked_choices(previous_assignment, ts_list, duration, available_profs, course_rooms,
+                    restricted_slots_by_prof, time_axis):
+    """Narrow a section's choices to its previous (professor, room, block) assignment, or None if it is invalid now."""
+    prof_id, room_id, block_slot_ids = previous_assignment
+    block_slot_ids = tuple(block_slot_ids)
+    starts = [s for s in range(len(ts_list) - duration + 1)
+              if tuple(ts.id for ts in ts_list[s: s + duration]) == block_slot_ids]
+    rooms = [room for room in course_rooms if room.id == room_id]
+    if not starts or not rooms or prof_id not in available_profs:
+        return None
+    if time_axis.overlaps(block_slot_ids, restricted_slots_by_prof.get(prof_id, [])):
+        return None
+    return [prof_id], starts, rooms
+
+
+def _solution_values(solver):
+    """Return the value of every model variable in a CpSolver's or _SolutionPublisher's solution, by variable index."""
+    response = solver.Response() if isinstance(solver, cp_model.CpSolverSolutionCallback) else solver.ResponseProto()
+    return np.array(response.solution, dtype=np.int64)
+
+
+def _count_constraints(model, constraint_counts, phase):
+    """Record how many constraints the model gained since the previous phase was counted."""
+    constraint_counts[phase] = len(model.Proto().constraints) - sum(constraint_counts.values())
+
+
+def _occupied_intervals(model, inputs):
+    """Fixed intervals for the inputs' occupied_room_atoms, room time already taken by
+    sections scheduled outside this model, keyed by (room id, day group) on the atoms
+    of the time axis."""
+    atoms = inputs["time_axis"].atoms
+    intervals = {}
+    for room_id, atom in inputs.get("occupied_room_atoms", ()):
+        intervals.setdefault((room_id, atoms[atom][0]), []).append(
+            model.NewFixedSizeIntervalVar(atom, 1, f"occupied_room_{room_id}_atom_{atom}")
+        )
+    return intervals
+
+
+class _CandidateTable:
+    """Joint candidates as parallel int arrays, one row per (section, course, professor, start index, duration, room).
+    parts are (section ids, professor ids, start indexes, room ids, course) tuples of equally long arrays."""
+
+    COLUMNS = ("section", "course", "professor", "start", "duration", "room")
+
+    def __init__(self, parts):
+        columns = {column: [] for column in self.COLUMNS}
+        for section_ids, prof_ids, starts, room_ids, course in parts:
+            columns["section"].append(section_ids)
+            columns["course"].append(np.full(len(section_ids), course.id))
+            columns["professor"].append(prof_ids)
+            columns["start"].append(starts)
+            columns["duration"].append(np.full(len(section_ids), course.slots_needed))
+            columns["room"].append(room_ids)
+        for column, arrays in columns.items():
+            setattr(self, column, np.concatenate(arrays).astype(np.int32) if arrays else np.zeros(0, dtype=np.int32))
+
+    def __len__(self):
+        return len(self.section)
+
+
+class _JointFormulation:
+    """One BoolVar per (section, professor, start block, room) row of a _CandidateTable.
+    Sections in locked only get their previous assignment, as long as it is still valid."""
+
+    def __init__(self, model, inputs, room_constraint, build_timings, locked=None, variable_names=True,
+                 room_occupancy=ROOM_OCCUPANCY):
+        self.model = model
+        self.variable_names = variable_names
+        self.locked_sections = set()
+        # Constraints added by each build phase (see _count_constraints).
+        self.constraint_counts = {}
+        self.day_by_course = {course.id: course.meeting_days for course in inputs["courses"]}
+        # Slot ids of every block a course can use, by start index.
+        self.blocks_by_course = {}
+        time_axis = inputs["time_axis"]
+        # The time axis spans of every block, course by course; block_offset[course id]
+        # is the number of the course's first block.
+        block_spans = []
+        block_offset = {}
+
+        phase_started = time.perf_counter()
+        eligibility = Eligibility(inputs)
+        build_timings["eligibility"] = time.perf_counter() - phase_started
+
+        phase_started = time.perf_counter()
+        parts = []
+        for position, course in enumerate(inputs["courses"]):
+            ts_list = inputs["time_slots_by_day"].get(course.meeting_days, [])
+            course_secs = inputs["sections_by_course"].get(course.id, [])
+            duration = course.slots_needed  # number of consecutive slots this course requires
+            if not course_secs:
+                continue
+            self.blocks_by_course[course.id] = [tuple(ts.id for ts in ts_list[s: s + duration])
+                                                for s in range(len(ts_list) - duration + 1)]
+            block_offset[course.id] = len(block_spans)
+            block_spans.extend(time_axis.block_spans(block) for block in self.blocks_by_course[course.id])
+            # Constraint: Enforce professor time restrictions, by never creating the
+            # assignments of a professor to a block they are restricted from.
+            prof_ids, starts, room_ids = eligibility.joint_candidates(position)
+
+            free_section_ids = []
+            for sec in course_secs:
+                choices = None
+                if locked and sec.id in locked:
+                    choices = _locked_choices(locked[sec.id], ts_list, duration, eligibility.course_profs(position),
+                                              eligibility.course_rooms(position), inputs["restricted_slots_by_prof"],
+                                              inputs["time_axis"])
+                if choices is None:
+                    free_section_ids.append(sec.id)
+                    continue
+                # Keep the table in section order.
+                if free_section_ids:
+                    parts.append(_repeat_candidates(free_section_ids, prof_ids, starts, room_ids, course))
+                    free_section_ids = []
+                sec_profs, sec_starts, sec_rooms = choices
+                sec_candidates = np.array([(prof_id, start_index, room.id) for prof_id in sec_profs
+                                           for start_index in sec_starts for room in sec_rooms]).reshape(-1, 3)
+                parts.append(_repeat_candidates([sec.id], *sec_candidates.T, course))
+                self.locked_sections.add(sec.id)
+            if free_section_ids:
+                parts.append(_repeat_candidates(free_section_ids, prof_ids, starts, room_ids, course))
+        self.table = table = _CandidateTable(parts)
+
+        if variable_names:
+            names = (
+                f"sec_{section_id}_course_{course_id}_prof_{prof_id}_day_{self.day_by_course[course_id]}"
+                f"_slots_{self.blocks_by_course[course_id][start_index]}_room_{room_id}"
+                for section_id, course_id, prof_id, start_index, room_id in zip(
+                    table.section.tolist(), table.course.tolist(), table.professor.tolist(),
+                    table.start.tolist(), table.room.tolist())
+            )
+        else:
+            names = repeat("", len(table))
+        self.literals = literals = [model.NewBoolVar(name) for name in names]
+        # The literals are consecutive model variables, so row i's value in a solution is
+        # at index literal_offset + i (see assignments).
+        self.literal_offset = literals[0].Index() if literals else 0
+
+        credit_hours = {course.id: course.credit_hours for course in inputs["courses"]}
+        self.load_terms_by_prof = {
+            prof_id: [(credit_hours[course_id], literals[row])
+                      for row, course_id in zip(rows.tolist(), table.course[rows].tolist())]
+            for prof_id, rows in group_rows(table.professor)
+        }
+        self.rows_by_section = dict(group_rows(table.section))
+        build_timings["create_variables"] = time.perf_counter() - phase_started
+
+        phase_started = time.perf_counter()
+        # Constraint: Each section must be assigned exactly one block.
+        for sec in inputs["sections"]:
+            model.Add(cp_model.LinearExpr.Sum([literals[row] for row in self._section_rows(sec.id)]) == 1)
+        build_timings["section_constraints"] = time.perf_counter() - phase_started
+        _count_constraints(model, self.constraint_counts, "section_constraints")
+
+        # Each row's block, and the atoms of the time axis every block holds, padded with -1,
+        # so rows can be grouped by the atoms they share.
+        course_ids = np.array(sorted(block_offset), dtype=np.int64)
+        offsets = np.array([block_offset[course_id] for course_id in course_ids.tolist()], dtype=np.int64)
+        self.row_block = offsets[np.searchsorted(course_ids, table.course)] + table.start
+        atoms = [[atom for _, first, end in spans for atom in range(first, end)] for spans in block_spans]
+        self.block_atoms = np.full((len(atoms), max(map(len, atoms), default=0)), -1, dtype=np.int64)
+        for block, block_atoms in enumerate(atoms):
+            self.block_atoms[block, :len(block_atoms)] = block_atoms
+        self.num_atoms = time_axis.num_atoms
+
+        phase_started = time.perf_counter()
+        # Constraint: A room cannot be used by more than one class at any time.
+        if room_constraint == "no_overlap" and room_occupancy == "at_most_one":
+            # At most one of the rows holding each (room, atom) is chosen, and none that
+            # hold one taken by sections outside this model.
+            occupied = {room_id * self.num_atoms + atom for room_id, atom in inputs.get("occupied_room_atoms", ())}
+            keys, rows = self._atom_keys(table.room.astype(np.int64))
+            for row in np.unique(rows[np.isin(keys, list(occupied))]).tolist():
+                model.Add(literals[row] == 0)
+            for rows in self._rows_by_atom(table.room.astype(np.int64)):
+                model.AddAtMostOne(literals[row] for row in rows)
+        elif room_constraint == "no_overlap":
+            # On each day group the block meets in, it occupies [first atom, end atom) of the
+            # room's timeline, but only if the assignment is chosen.
+            occupied = _occupied_intervals(model, inputs)
+            intervals = {}
+            for row, room_id, block in zip(range(len(table)), table.room.tolist(), self.row_block.tolist()):
+                for group, first, end in block_spans[block]:
+                    intervals.setdefault((room_id, group), []).append(model.NewOptionalFixedSizeIntervalVar(
+                        first, end - first, literals[row], f"interval_{literals[row].Name()}" if variable_names else ""
+                    ))
+            for key, room_intervals in intervals.items():
+                model.AddNoOverlap(room_intervals + occupied.get(key, []))
+        else:
+            for rows in self._rows_by_atom(np.zeros(len(table), dtype=np.int64)):
+                model.Add(cp_model.LinearExpr.Sum([literals[row] for row in rows]) <= 1)
+        build_timings["room_constraints"] = time.perf_counter() - phase_started
+        _count_constraints(model, self.constraint_counts, "room_constraints")
+
+        phase_started = time.perf_counter()
+        # Constraint: A professor cannot be in more than one place at any time.
+        for rows in self._rows_by_atom(table.professor.astype(np.int64)):
+            model.Add(cp_model.LinearExpr.Sum([literals[row] for row in rows]) <= 1)
+        build_timings["professor_constraints"] = time.perf_counter() - phase_started
+        _count_constraints(model, self.constraint_counts, "professor_constraints")
+
+    def _atom_keys(self, base_keys):
+        """(keys, rows) with keys base_keys[row] * num_atoms + atom for every atom of the
+        time axis each row's block holds."""
+        keys = [np.zeros(0, dtype=np.int64)]
+        rows = [np.zeros(0, dtype=np.int64)]
+        for column in self.block_atoms.T:
+            atoms = column[self.row_block]
+            present = np.flatnonzero(atoms >= 0)
+            keys.append(base_keys[present] * self.num_atoms + atoms[present])
+            rows.append(present)
+        return np.concatenate(keys), np.concatenate(rows)
+
+    def _rows_by_atom(self, base_keys):
+        """Yield the groups of two or more rows with the same base_keys[row] whose blocks
+        hold a common atom of the time axis."""
+        keys, rows = self._atom_keys(base_keys)
+        for _, group in group_rows(keys):
+            if len(group) > 1:
+                yield rows[group].tolist()
+
+    def _section_rows(self, section_id):
+        return self.rows_by_section.get(section_id, np.zeros(0, dtype=np.int64)).tolist()
+
+    @property
+    def num_variables(self):
+        return len(self.table)
+
+    def started_by_exprs(self, section_id):
+        """Map each start index s the section can use to an expression that is 1 when it starts at or before s."""
+        vars_by_start = {}
+        for row in self._section_rows(section_id):
+            vars_by_start.setdefault(int(self.table.start[row]), []).append(self.literals[row])
+        exprs = {}
+        started = []
+        for start_index in sorted(vars_by_start):
+            started.extend(vars_by_start[start_index])
+            exprs[start_index] = sum(started)
+        return exprs
+
+    def _previous_row(self, section_id, previous_assignment):
+        rows = self.rows_by_section.get(section_id)
+        if rows is None:
+            return None
+        table = self.table
+        prof_id, room_id, block_slot_ids = previous_assignment
+        blocks = self.blocks_by_course[int(table.course[rows[0]])]
+        if tuple(block_slot_ids) not in blocks:
+            return None
+        start_index = blocks.index(tuple(block_slot_ids))
+        match = rows[(table.professor[rows] == prof_id) & (table.room[rows] == room_id)
+                     & (table.start[rows] == start_index)]
+        return int(match[0]) if len(match) else None
+
+    def add_hints(self, previous):
+        """Hint every section in previous towards its earlier assignment; return how many were hinted."""
+        hinted = 0
+        for section_id, previous_assignment in previous.items():
+            previous_row = self._previous_row(section_id, previous_assignment)
+            if previous_row is None:
+                continue
+            for row in self._section_rows(section_id):
+                self.model.AddHint(self.literals[row], 1 if row == previous_row else 0)
+            hinted += 1
+        return hinted
+
+    def kept_literal(self, section_id, previous_assignment):
+        """Literal that is 1 when the section keeps its previous assignment, or None if it no longer can."""
+        row = self._previous_row(section_id, previous_assignment)
+        return self.literals[row] if row is not None else None
+
+    def _keys(self, rows=None):
+        """Yield the (section, course, professor, day, block, room) key of each row."""
+        table = self.table
+        columns = [table.section, table.course, table.professor, table.start, table.room]
+        if rows is not None:
+            columns = [column[rows] for column in columns]
+        for section_id, course_id, prof_id, start_index, room_id in zip(*(column.tolist() for column in columns)):
+            yield (section_id, course_id, prof_id, self.day_by_course[course_id],
+                   self.blocks_by_course[course_id][start_index], room_id)
+
+    def block_terms(self):
+        """Yield (block slot ids, literal) pairs, the literal being 1 when that block is chosen."""
+        for key, literal in zip(self._keys(), self.literals):
+            yield key[4], literal
+
+    def room_terms(self):
+        """Yield (course id, room id, literal) pairs, the literal being 1 when that room is chosen."""
+        for course_id, room_id, literal in zip(self.table.course.tolist(), self.table.room.tolist(), self.literals):
+            yield course_id, room_id, literal
+
+    def boundary_exprs(self, time_axis):
+        """Map (professor, day group, minute) to expressions that are 1 when one of the
+        professor's classes ends, respectively starts, at that minute of the time axis."""
+        ends = {}
+        starts = {}
+        bounds_by_block = {}
+        for (_, _, prof_id, _, block_slot_ids, _), literal in zip(self._keys(), self.literals):
+            bounds = bounds_by_block.get(block_slot_ids)
+            if bounds is None:
+                bounds = bounds_by_block[block_slot_ids] = time_axis.block_bounds(block_slot_ids)
+            for group, start, end in bounds:
+                starts.setdefault((prof_id, group, start), []).append(literal)
+                ends.setdefault((prof_id, group, end), []).append(literal)
+        return ({key: sum(terms) for key, terms in ends.items()},
+                {key: sum(terms) for key, terms in starts.items()})
+
+    def assignments(self, solver):
+        """Yield the (section, course, professor, day, block, room) keys chosen by the solver."""
+        values = _solution_values(solver)[self.literal_offset:self.literal_offset + len(self.literals)]
+        yield from self._keys(np.flatnonzero(values))
+
+
+def _repeat_candidates(section_ids, prof_ids, starts, room_ids, course):
+    """Table rows giving every section in section_ids each of the course's candidates."""
+    count = len(prof_ids)
+    return (np.repeat(section_ids, count), np.tile(prof_ids, len(section_ids)), np.tile(starts, len(section_ids)),
+            np.tile(room_ids, len(section_ids)), course)
+
+
+class _FactoredFormulation:
+    """Separate time, room and professor choices per section, linked through intervals on the time axis.
+    Subclasses with choose_rooms False create no room variables (see _TwoStageFormulation)."""
+
+    choose_rooms = True
+
+    def __init__(self, model, inputs, room_constraint, build_timings, locked=None, variable_names=True):
+        self.model = model
+        self.variable_names = variable_names
+        self.sections = {}
+        self.locked_sections = set()
+        self.constraint_counts = {}
+        self.load_terms_by_prof = {}
+        self.time_vars_by_section = {}
+        self._num_variables = 0
+
+        time_axis = inputs["time_axis"]
+        # (room or professor id, day group) -> optional intervals on the time axis
+        intervals_by_room_day = {}
+        intervals_by_prof_day = {}
+        # atom -> expressions that are 1 when a section holds that atom
+        coverage_by_atom = {}
+
+        phase_started = time.perf_counter()
+        eligibility = Eligibility(inputs)
+        build_timings["eligibility"] = time.perf_counter() - phase_started
+
+        phase_started = time.perf_counter()
+        for position, course in enumerate(inputs["courses"]):
+            allowed_day = course.meeting_days
+            ts_list = inputs["time_slots_by_day"].get(allowed_day, [])
+            available_profs = eligibility.course_profs(position)
+            course_rooms = eligibility.course_rooms(position)
+            duration = course.slots_needed
+            # Skip the blocks every qualified professor is restricted from.
+            starts = eligibility.course_starts(position)
+
+            for sec in inputs["sections_by_course"].get(course.id, []):
+                sec_profs, sec_starts, sec_rooms = available_profs, starts, course_rooms
+                if locked and sec.id in locked:
+                    choices = _locked_choices(locked[sec.id], ts_list, duration, available_profs, course_rooms,
+                                              inputs["restricted_slots_by_prof"], inputs["time_axis"])
+                    if choices is not None:
+                        sec_profs, sec_starts, sec_rooms = choices
+                        self.locked_sections.add(sec.id)
+                prefix = f"sec_{sec.id}_course_{course.id}"
+                named = variable_names
+                time_vars = {s: model.NewBoolVar(f"{prefix}_start_{s}" if named else "") for s in sec_starts}
+                room_vars = {room.id: model.NewBoolVar(f"{prefix}_room_{room.id}" if named else "")
+                             for room in sec_rooms} if self.choose_rooms else {}
+                prof_vars = {p: model.NewBoolVar(f"{prefix}_prof_{p}" if named else "") for p in sec_profs}
+                self._num_variables += len(time_vars) + len(room_vars) + len(prof_vars)
+
+                # Constraint: Each section gets exactly one start block, one room and one professor.
+                model.Add(sum(time_vars.values()) == 1)
+                if self.choose_rooms:
+                    model.Add(sum(room_vars.values()) == 1)
+                model.Add(sum(prof_vars.values()) == 1)
+
+                self.time_vars_by_section[sec.id] = time_vars
+                self.sections[sec.id] = {
+                    "section_id": sec.id,
+                    "course_id": course.id,
+                    "day": allowed_day,
+                    "blocks": {s: tuple(ts.id for ts in ts_list[s: s + duration]) for s in sec_starts},
+                    "rooms": [room.id for room in sec_rooms],
+                    "time_vars": time_vars,
+                    "room_vars": room_vars,
+                    "prof_vars": prof_vars,
+                }
+                if not sec_starts:
+                    continue
+
+                blocks = self.sections[sec.id]["blocks"]
+                for spans in zip(*(time_axis.block_spans(blocks[s]) for s in sec_starts)):
+                    group = spans[0][0]
+                    # Channel the chosen block into its first atom on this day group, and into its
+                    # length and end atom if blocks differ in length, shared by the intervals below.
+                    firsts = [first for _, first, _ in spans]
+                    ends = [end for _, _, end in spans]
+                    lengths = [end - first for first, end in zip(firsts, ends)]
+                    start = model.NewIntVarFromDomain(cp_model.Domain.FromValues(firsts),
+                                                      f"{prefix}_start_{group}" if named else "")
+                    model.Add(start == sum(first * time_vars[s] for s, first in zip(sec_starts, firsts)))
+                    length, end = lengths[0], start + lengths[0]
+                    if len(set(lengths)) > 1:
+                        length = model.NewIntVarFromDomain(cp_model.Domain.FromValues(lengths),
+                                                           f"{prefix}_length_{group}" if named else "")
+                        model.Add(length == sum(size * time_vars[s] for s, size in zip(sec_starts, lengths)))
+                        end = model.NewIntVarFromDomain(cp_model.Domain.FromValues(ends),
+                                                        f"{prefix}_end_{group}" if named else "")
+                        model.Add(end == sum(last * time_vars[s] for s, last in zip(sec_starts, ends)))
+
+                    for room_id, room_var in room_vars.items():
+                        intervals_by_room_day.setdefault((room_id, group), []).append(model.NewOptionalIntervalVar(
+                            start, length, end, room_var, f"{prefix}_room_{room_id}_interval" if named else ""
+                        ))
+                    for prof_id, prof_var in prof_vars.items():
+                        intervals_by_prof_day.setdefault((prof_id, group), []).append(model.NewOptionalIntervalVar(
+                            start, length, end, prof_var, f"{prefix}_prof_{prof_id}_interval" if named else ""
+                        ))
+                for prof_id, prof_var in prof_vars.items():
+                    self.load_terms_by_prof.setdefault(prof_id, []).append((course.credit_hours, prof_var))
+
+                for s, var in time_vars.items():
+                    for atom in time_axis.block_atoms(blocks[s]):
+                        coverage_by_atom.setdefault(atom, []).append(var)
+        build_timings["create_variables"] = time.perf_counter() - phase_started
+        _count_constraints(model, self.constraint_counts, "create_variables")
+
+        phase_started = time.perf_counter()
+        self._add_room_constraints(inputs, room_constraint, intervals_by_room_day, coverage_by_atom)
+        build_timings["room_constraints"] = time.perf_counter() - phase_started
+        _count_constraints(model, self.constraint_counts, "room_constraints")
+
+        phase_started = time.perf_counter()
+        # Constraint: A professor cannot be in more than one place at any time.
+        for intervals in intervals_by_prof_day.values():
+            model.AddNoOverlap(intervals)
+        build_timings["professor_constraints"] = time.perf_counter() - phase_started
+        _count_constraints(model, self.constraint_counts, "professor_constraints")
+
+        phase_started = time.perf_counter()
+        # Constraint: Enforce professor time restrictions. A restricted professor may
+        # only be chosen if none of the blocks overlapping the slot is chosen.
+        for section in self.sections.values():
+            for prof_id, prof_var in section["prof_vars"].items():
+                for ts_id in inputs["restricted_slots_by_prof"].get(prof_id, []):
+                    overlapping = time_axis.overlapping.get(ts_id, frozenset())
+                    covering = [var for s, var in section["time_vars"].items()
+                                if not overlapping.isdisjoint(section["blocks"][s])]
+                    if covering:
+                        model.Add(prof_var + sum(covering) <= 1)
+        build_timings["time_restrictions"] = time.perf_counter() - phase_started
+        _count_constraints(model, self.constraint_counts, "time_restrictions")
+
+    def _add_room_constraints(self, inputs, room_constraint, intervals_by_room_day, coverage_by_atom):
+        # Constraint: A room cannot be used by more than one class at any time.
+        if room_constraint == "no_overlap":
+            occupied = _occupied_intervals(self.model, inputs)
+            for key, intervals in intervals_by_room_day.items():
+                self.model.AddNoOverlap(intervals + occupied.get(key, []))
+        else:
+            for covering in coverage_by_atom.values():
+                self.model.Add(sum(covering) <= 1)
+
+    @property
+    def num_variables(self):
+        return self._num_variables
+
+    def started_by_exprs(self, section_id):
+        """Map each start index s the section can use to an expression that is 1 when it starts at or before s."""
+        time_vars = self.time_vars_by_section.get(section_id, {})
+        exprs = {}
+        started = []
+        for start_index in sorted(time_vars):
+            started.append(time_vars[start_index])
+            exprs[start_index] = sum(started)
+        return exprs
+
+    def _previous_choices(self, section_id, previous_assignment):
+        """Return the (time, professor, room) variables matching the previous assignment, or None.
+
+        Without choose_rooms only the time and professor variables are returned."""
+        section = self.sections.get(section_id)
+        if section is None:
+            return None
+        prof_id, room_id, block_slot_ids = previous_assignment
+        start = next((s for s, block in section["blocks"].items() if block == tuple(block_slot_ids)), None)
+        if start is None or prof_id not in section["prof_vars"]:
+            return None
+        chosen = (section["time_vars"][start], section["prof_vars"][prof_id])
+        if not self.choose_rooms:
+            return chosen
+        if room_id not in section["room_vars"]:
+            return None
+        return chosen + (section["room_vars"][room_id],)
+
+    def add_hints(self, previous):
+        """Hint every section in previous towards its earlier assignment; return how many were hinted."""
+        hinted = 0
+        for section_id, previous_assignment in previous.items():
+            chosen = self._previous_choices(section_id, previous_assignment)
+            if chosen is None:
+                continue
+            section = self.sections[section_id]
+            for choices in (section["time_vars"], section["room_vars"], section["prof_vars"]):
+                for var in choices.values():
+                    self.model.AddHint(var, 1 if any(var is c for c in chosen) else 0)
+            hinted += 1
+        return hinted
+
+    def kept_literal(self, section_id, previous_assignment):
+        """Literal that is 1 when the section keeps its previous assignment, or None if it no longer can."""
+        chosen = self._previous_choices(section_id, previous_assignment)
+        if chosen is None:
+            return None
+        kept = self.model.NewBoolVar(f"sec_{section_id}_kept" if self.variable_names else "")
+        self.model.AddBoolAnd(chosen).OnlyEnforceIf(kept)
+        return kept
+
+    def block_terms(self):
+        """Yield (block slot ids, literal) pairs, the literal being 1 when that block is chosen."""
+        for section in self.sections.values():
+            for s, var in section["time_vars"].items():
+                yield section["blocks"][s], var
+
+    def room_terms(self):
+        """Yield (course id, room id, literal) pairs, the literal being 1 when that room is chosen."""
+        for section in self.sections.values():
+            for room_id, var in section["room_vars"].items():
+                yield section["course_id"], room_id, var
+
+    def boundary_exprs(self, time_axis):
+        """Map (professor, day group, minute) to literals that are 1 when one of the professor's classes ends,
+        respectively starts, at that minute of the time axis."""
+        ends = {}
+        starts = {}
+        for section in self.sections.values():
+            bounds = {s: time_axis.block_bounds(block) for s, block in section["blocks"].items()}
+            for prof_id, prof_var in section["prof_vars"].items():
+                for s, time_var in section["time_vars"].items():
+                    for group, start, end in bounds[s]:
+                        for boundaries, label, minute in ((starts, "start", start), (ends, "end", end)):
+                            key = (prof_id, group, minute)
+                            if key not in boundaries:
+                                boundaries[key] = self.model.NewBoolVar(
+                                    f"prof_{prof_id}_{label}_{group}_{minute}" if self.variable_names else "")
+                            self.model.Add(boundaries[key] >= prof_var + time_var - 1)
+        return ends, starts
+
+    def assignments(self, solver):
+        """Yield the (section, course, professor, day, block, room) keys chosen by the solver."""
+        values = _solution_values(solver)
+        for section in self.sections.values():
+            start = next(s for s, var in section["time_vars"].items() if values[var.Index()])
+            room_id = next(r for r, var in section["room_vars"].items() if values[var.Index()])
+            prof_id = next(p for p, var in section["prof_vars"].items() if values[var.Index()])
+            yield (section["section_id"], section["course_id"], prof_id, section["day"],
+                   section["blocks"][start], room_id)
+
+
+class _TwoStageFormulation(_FactoredFormulation):
+    """Stage one of two_stage: the factored model without room variables, under aggregate room capacities.
+    Rooms are then matched to the chosen times by assign_rooms; assignments returns None if that fails."""
+
+    choose_rooms = False
+
+    def __init__(self, model, inputs, room_constraint, build_timings, locked=None, variable_names=True):
+        self.inputs = inputs
+        super().__init__(model, inputs, room_constraint, build_timings, locked, variable_names)
+
+    def _add_room_constraints(self, inputs, room_constraint, intervals_by_room_day, coverage_by_atom):
+        # atom -> room set -> covering literals, and the sections they belong to
+        covering_by_atom = {}
+        sections_by_atom = {}
+        time_axis = inputs["time_axis"]
+        for section in self.sections.values():
+            rooms = frozenset(section["rooms"])
+            for s, var in section["time_vars"].items():
+                for atom in time_axis.block_atoms(section["blocks"][s]):
+                    covering_by_atom.setdefault(atom, {}).setdefault(rooms, []).append(var)
+                    sections_by_atom.setdefault(atom, {}).setdefault(rooms, set()).add(section["section_id"])
+
+        # Constraint: At any time, the sections that can only use rooms out of a set do
+        # not outnumber the rooms in it.
+        for atom, covering in covering_by_atom.items():
+            room_sets = set(covering)
+            room_sets.add(frozenset().union(*room_sets))
+            for room_set in room_sets:
+                inside = [rooms for rooms in covering if rooms <= room_set]
+                if sum(len(sections_by_atom[atom][rooms]) for rooms in inside) <= len(room_set):
+                    continue
+                self.model.Add(sum(var for rooms in inside for var in covering[rooms]) <= len(room_set))
+
+    def assignments(self, solver):
+        """Return the (section, course, professor, day, block, room) keys of the times and
+        professors chosen by the solver, with rooms from assign_rooms, or None if it
+        finds no room for some section."""
+        values = _solution_values(solver)
+        chosen = []
+        for section in self.sections.values():
+            start = next(s for s, var in section["time_vars"].items() if values[var.Index()])
+            prof_id = next(p for p, var in section["prof_vars"].items() if values[var.Index()])
+            chosen.append((section, start, prof_id))
+        time_axis = self.inputs["time_axis"]
+        start_minute = {ts.id: ts.start_minute for ts in self.inputs["time_slots"]}
+        rooms = assign_rooms([(section["section_id"], section["course_id"], section["day"],
+                               start_minute[section["blocks"][start][0]],
+                               time_axis.block_atoms(section["blocks"][start]), section["rooms"])
+                              for section, start, _ in chosen], self.inputs)
+        if rooms is None:
+            return None
+        return [(section["section_id"], section["course_id"], prof_id, section["day"], section["blocks"][start],
+                 rooms[section["section_id"]])
+                for section, start, prof_id in chosen]
+
+    def objective_value(self, assignments):
+        """The objective generate_schedule minimizes for matched assignments, rooms
+        included, which the stage one objective leaves out."""
+        return _objective_value(self.inputs, assignments, *self.objective_options)
+
+
+class _SolutionPublisher(cp_model.CpSolverSolutionCallback):
+    """Record when the first solution was found and hand each improving solution to on_solution, if given."""
+
+    def __init__(self, built, format_schedule, on_solution=None):
+        super().__init__()
+        self.built = built
+        self.format_schedule = format_schedule
+        self.on_solution = on_solution
+        self.first_solution_time = None
+        self.num_solutions = 0
+        self.best_objective_value = None
+
+    def on_solution_callback(self):
+        self.num_solutions += 1
+        if self.first_solution_time is None:
+            self.first_solution_time = self.WallTime()
+        if self.on_solution is None:
+            return
+        assignments = self.built.assignments(self)
+        if assignments is None:
+            # The two_stage formulation found no rooms for these times.
+            return
+        objective_value = self.ObjectiveValue()
+        if isinstance(self.built, _TwoStageFormulation):
+            objective_value = self.built.objective_value(assignments)
+            if self.best_objective_value is not None and objective_value >= self.best_objective_value:
+                return
+        self.best_objective_value = objective_value
+        stop = self.on_solution({
+            "objective_value": objective_value,
+            "elapsed": round(self.WallTime(), 4),
+            "schedule": self.format_schedule(assignments),
+        })
+        if stop:
+            self.StopSearch()
+
+
+def _input_fingerprint(inputs, options):
+    """Hash everything the model is built from, plus the options that change the answer."""
+    return fingerprint(
+        [(c.id, c.name, c.credit_hours, c.meeting_days, c.slots_needed, c.max_students) for c in inputs["courses"]],
+        [(p.id, p.name, p.max_credit_hours) for p in inputs["professors"]],
+        sorted((cp.course_id, cp.professor_id) for cp in inputs["course_professors"]),
+        [(r.id, r.name, r.capacity) for r in inputs["rooms"]],
+        sorted((rr.course_id, rr.room_id) for rr in inputs["room_restrictions"]),
+        [(ts.id, ts.time, ts.meeting_days, ts.penalty, ts.start_minute, ts.end_minute)
+         for ts in inputs["time_slots"]],
+        [(sec.id, sec.course_id, sec.section_number) for sec in inputs["sections"]],
+        sorted((prof_id, sorted(slot_ids)) for prof_id, slot_ids in inputs["restricted_slots_by_prof"].items()),
+        options,
+    )
+
+
+def _back_to_back_pairs(ends, starts, gap, adjacent):
+    """Yield the (end, start) pairs of boundaries keyed (professor, day group, minute) where
+    a class of the professor starts at most gap minutes after another one ends, or, with
+    gap None, in the next slot (adjacent holds (group, end, start) of those slots)."""
+    start_minutes = {}
+    for prof_id, group, minute in starts:
+        start_minutes.setdefault((prof_id, group), []).append(minute)
+    for prof_id, group, end in ends:
+        for minute in start_minutes.get((prof_id, group), ()):
+            if gap is None:
+                close = (group, end, minute) in adjacent
+            else:
+                close = end <= minute <= end + gap
+            if close:
+                yield (prof_id, group, end), (prof_id, group, minute)
+
+
+def _soft_terms(model, built, inputs, names, back_to_back_gap=BACK_TO_BACK_GAP):
+    """Return the unweighted soft preference terms of the objective (time_slot, back_to_back, room_fit) by name."""
+    terms = {}
+    if "time_slot" in names:
+        penalty_by_slot = {ts.id: ts.penalty for ts in inputs["time_slots"]}
+        literals, costs = [], []
+        for block_slot_ids, literal in built.block_terms():
+            cost = sum(penalty_by_slot[ts_id] for ts_id in block_slot_ids)
+            if cost:
+                literals.append(literal)
+                costs.append(cost)
+        terms["time_slot"] = cp_model.LinearExpr.WeightedSum(literals, costs)
+    if "room_fit" in names:
+        literals, costs = [], []
+        for course_id, room_id, literal in built.room_terms():
+            waste = inputs["rooms_dict"][room_id].capacity - inputs["courses_dict"][course_id].max_students
+            if waste:
+                literals.append(literal)
+                costs.append(waste)
+        terms["room_fit"] = cp_model.LinearExpr.WeightedSum(literals, costs)
+    if "back_to_back" in names:
+        groups = inputs["time_axis"].groups
+        ends, starts = built.boundary_exprs(inputs["time_axis"])
+        pairs, days = [], []
+        for end_key, start_key in _back_to_back_pairs(ends, starts, back_to_back_gap, inputs["time_axis"].adjacent):
+            prof_id, group, end_minute = end_key
+            pair = model.NewBoolVar(f"prof_{prof_id}_{group}_{end_minute}_{start_key[2]}_back_to_back"
+                                    if built.variable_names else "")
+            model.Add(pair >= ends[end_key] + starts[start_key] - 1)
+            pairs.append(pair)
+            days.append(bin(groups[group]).count("1"))
+        terms["back_to_back"] = cp_model.LinearExpr.WeightedSum(pairs, days)
+    return terms
+
+
+def _build_model(inputs, room_constraint, formulation, symmetry_breaking, previous, disruption_weight,
+                 locked, build_timings, hints=None, objective_weights=None, variable_names=True,
+                 back_to_back_gap=BACK_TO_BACK_GAP, room_occupancy=ROOM_OCCUPANCY):
+    """Build the CP model and return it with the formulation holding its decision variables.
+    room_occupancy is one of ROOM_OCCUPANCIES and only changes the joint formulation."""
+    objective_weights = objective_weights or OBJECTIVE_WEIGHTS
     model = cp_model.CpModel()
-    schedule_vars = {}
-
-    print("Model Started")
-    
-    # Modified variable creation: choose a starting time slot block.
-    for course in courses:
-        allowed_day = course.meeting_days
-        ts_list = time_slots_by_day.get(allowed_day, [])
-        course_secs = sections_by_course.get(course.id, [])
-        available_profs = course_to_professors.get(course.id, [])
-        duration = course.slots_needed  # number of consecutive slots this course requires
-        
-        # Only consider valid blocks within the day.
-        num_slots = len(ts_list)
-        for sec in course_secs:
-            for prof_id in available_profs:
-                # iterate over possible starting indices where a block fits
-                for start_index in range(num_slots - duration + 1):
-                    block = ts_list[start_index: start_index + duration]
-                    block_slot_ids = tuple(ts.id for ts in block)
-                    # Loop over all rooms and check room capacity restrictions
-                    for room in rooms:
-                        if course.max_students > room.capacity:
-                            continue
-                        if course.id in room_restrictions_map and room.id not in room_restrictions_map[course.id]:
-                            continue
-
-                        key = (sec.id, course.id, prof_id, allowed_day, block_slot_ids, room.id)
-                        schedule_vars[key] = model.NewBoolVar(
-                            f"sec_{sec.id}_course_{course.id}_prof_{prof_id}_day_{allowed_day}_slots_{block_slot_ids}_room_{room.id}"
-                        )
-
-    # Constraint: Each section must be assigned exactly one block.
-    for course in courses:
-        for sec in sections_by_course.get(course.id, []):
-            relevant_vars = [var for key, var in schedule_vars.items() if key[0] == sec.id]
-            model.Add(sum(relevant_vars) == 1)
-    
-    # Constraint: A room cannot be used by more than one class in any time slot.
-    for day in ['MWF', 'TTh']:
-        for ts in time_slots_by_day.get(day, []):
-            vars_in_slot = []
-            for key, var in schedule_vars.items():
-                # key[3] is the day; key[4] is a tuple of time slot ids for the block
-                if key[3] == day and ts.id in key[4]:
-                    vars_in_slot.append(var)
-            model.Add(sum(vars_in_slot) <= 1)
-    
-    # Constraint: A professor cannot be in more than one place during any time slot.
-    for prof in professors:
-        for day in time_slots_by_day:
-            for ts in time_slots_by_day.get(day, []):
-                prof_time_vars = [
-                    var for key, var in schedule_vars.items()
-                    if key[2] == prof.id and key[3] == day and ts.id in key[4]
-                ]
-                model.Add(sum(prof_time_vars) <= 1)
-    
-    # Constraint: Enforce professor time restrictions.
-    for prof in professors:
-        for restricted_ts in prof.time_restrictions:
-            day = restricted_ts.meeting_days
-            ts_id = restricted_ts.id
-            prof_vars = [
-                var for key, var in schedule_vars.items()
-                if key[2] == prof.id and key[3] == day and ts_id in key[4]
-            ]
-            model.Add(sum(prof_vars) == 0)
+
+    if formulation == "joint":
+        built = _JointFormulation(model, inputs, room_constraint, build_timings, locked, variable_names,
+                                  room_occupancy)
+    elif formulation == "two_stage":
+        built = _TwoStageFormulation(model, inputs, room_constraint, build_timings, locked, variable_names)
+    else:
+        built = _FactoredFormulation(model, inputs, room_constraint, build_timings, locked, variable_names)
+
+    if hints is None:
+        hints = previous
+    if symmetry_breaking:
+        phase_started = time.perf_counter()
+        # Constraint: Sections of one course start in non-decreasing section order.
+        # Any schedule can be relabelled to satisfy this, so no solution is lost. It is
+        # posted as "a later section has started by slot s only if the earlier one has",
+        # which propagates on the Boolean start choices directly. Sections that are
+        # locked, hinted or measured against a previous assignment are no longer
+        # interchangeable, so their courses are left alone.
+        tied = set(locked or ()) | set(hints or ()) | set(previous or ())
+        for course in inputs["courses"]:
+            course_secs = inputs["sections_by_course"].get(course.id, [])
+            if any(sec.id in tied for sec in course_secs):
+                continue
+            for earlier, later in zip(course_secs, course_secs[1:]):
+                earlier_started = built.started_by_exprs(earlier.id)
+                for start_index, later_started in built.started_by_exprs(later.id).items():
+                    if start_index in earlier_started:
+                        model.Add(later_started <= earlier_started[start_index])
+        build_timings["symmetry_breaking"] = time.perf_counter() - phase_started
+        _count_constraints(model, built.constraint_counts, "symmetry_breaking")
 
         # ----- START PROFESSOR WORKLOAD CONSTRAINTS -----
 
+    phase_started = time.perf_counter()
     # Create a variable for each professor representing their total teaching load (weighted by credit hours)
+    professors = inputs["professors"]
     prof_load = {}
+    max_possible_load = 0
     for prof in professors:
-        # Gather all schedule variables (each is 0 or 1) associated with this professor.
-        # Multiply each by the corresponding course's credit hours.
-        relevant_assignments = [
-            courses_dict[key[1]].credit_hours * var 
-            for key, var in schedule_vars.items() 
-            if key[2] == prof.id
-        ]
+        # All assignment variables (each is 0 or 1) associated with this professor,
+        # paired with the corresponding course's credit hours.
+        load_terms = built.load_terms_by_prof.get(prof.id, [])
+        relevant_assignments = cp_model.LinearExpr.WeightedSum([var for _, var in load_terms],
+                                                               [credit_hours for credit_hours, _ in load_terms])
         # The upper bound can be the sum of credit hours for all courses that can possibly be taught by this professor.
-        max_possible_load = sum(courses_dict[key[1]].credit_hours for key in schedule_vars if key[2] == prof.id)
-        
+        prof_max_load = sum(credit_hours for credit_hours, _ in load_terms)
+        max_possible_load = max(max_possible_load, prof_max_load)
+
         # Create an integer variable representing the total load.
-        prof_load[prof.id] = model.NewIntVar(0, max_possible_load, f"load_{prof.id}")
-        
+        prof_load[prof.id] = model.NewIntVar(0, prof_max_load, f"load_{prof.id}")
+
         # Enforce that the professor's load equals the weighted sum of assignments.
-        model.Add(prof_load[prof.id] == sum(relevant_assignments))
-        
+        model.Add(prof_load[prof.id] == relevant_assignments)
+
         # Hard constraint: Ensure the load does not exceed the professor's maximum allowed credit hours.
         model.Add(prof_load[prof.id] <= prof.max_credit_hours)
 
     # Optionally, if you want to balance workloads across professors, you can add an optimization objective.
     # For instance, you can minimize the difference between the highest and lowest loads.
-    max_load = model.NewIntVar(0, max(max_possible_load for _ in professors), "max_load")
-    min_load = model.NewIntVar(0, max(max_possible_load for _ in professors), "min_load")
+    max_load = model.NewIntVar(0, max_possible_load, "max_load")
+    min_load = model.NewIntVar(0, max_possible_load, "min_load")
     model.AddMaxEquality(max_load, [prof_load[prof.id] for prof in professors])
     model.AddMinEquality(min_load, [prof_load[prof.id] for prof in professors])
-    load_difference = model.NewIntVar(0, max(max_possible_load for _ in professors), "load_difference")
+    load_difference = model.NewIntVar(0, max_possible_load, "load_difference")
     model.Add(load_difference == max_load - min_load)
+    build_timings["workload_constraints"] = time.perf_counter() - phase_started
+    _count_constraints(model, built.constraint_counts, "workload_constraints")
+
+    built.objective_terms = {"load_difference": load_difference}
+    soft_names = [name for name, weight in objective_weights.items() if weight and name != "load_difference"]
+    if soft_names:
+        phase_started = time.perf_counter()
+        built.objective_terms.update(_soft_terms(model, built, inputs, soft_names, back_to_back_gap))
+        build_timings["soft_penalties"] = time.perf_counter() - phase_started
+        _count_constraints(model, built.constraint_counts, "soft_penalties")
+    objective = sum(objective_weights[name] * term for name, term in built.objective_terms.items())
+    built.disruption = 0
+
+    built.hinted_sections = 0
+    if previous or hints:
+        phase_started = time.perf_counter()
+        # Start the search from the previous schedule.
+        built.hinted_sections = built.add_hints(hints)
+        if disruption_weight and previous:
+            # Count every still existing section that does not keep its previous assignment.
+            changed = []
+            for section_id, previous_assignment in previous.items():
+                if section_id not in inputs["section_ids"]:
+                    continue
+                kept = built.kept_literal(section_id, previous_assignment)
+                changed.append(1 - kept if kept is not None else 1)
+            built.disruption = disruption_weight * sum(changed)
+            objective = objective + built.disruption
+        build_timings["warm_start"] = time.perf_counter() - phase_started
+        _count_constraints(model, built.constraint_counts, "warm_start")
+
+    built.prof_load = prof_load
+    # What _objective_value needs, besides the inputs and assignments, to evaluate this objective.
+    built.objective_options = (previous, disruption_weight, objective_weights, back_to_back_gap)
 
     # Set the solver to minimize the difference in load, thereby encouraging a balanced assignment.
-    model.Minimize(load_difference)
+    model.Minimize(objective)
 
     # ----- END PROFESSOR WORKLOAD CONSTRAINTS -----
 
-    
-    # Solve the model
-    solver = cp_model.CpSolver()
-    status = solver.Solve(model)
-    
-    if status not in (cp_model.FEASIBLE, cp_model.OPTIMAL):
-        return {"status": "No feasible schedule found."}
-    
+    return model, built
+
+
+def _format_schedule(inputs, assignments):
+    """Turn (section, course, professor, day, block, room) keys into the API's schedule entries,
+    sorted by day and start time."""
+    time_str_by_id = inputs["time_str_by_id"]
+    start_minute = {ts.id: ts.start_minute for ts in inputs["time_slots"]}
+    courses_dict = inputs["courses_dict"]
+    professors_dict = inputs["professors_dict"]
+    rooms_dict = inputs["rooms_dict"]
+    # Many sections share a block, so its time strings are looked up once.
+    times_by_block = {}
     result_schedule = []
-    for key, var in schedule_vars.items():
-        if solver.Value(var) == 1:
-            section_id, course_id, prof_id, day, block_slot_ids, room_id = key
+    sort_keys = []
+    for section_id, course_id, prof_id, day, block_slot_ids, room_id in assignments:
+        block_slot_ids = tuple(block_slot_ids)
+        time_slots = times_by_block.get(block_slot_ids)
+        if time_slots is None:
+            time_slots = times_by_block[block_slot_ids] = [time_str_by_id.get(tsid, "Unknown")
+                                                           for tsid in block_slot_ids]
+        result_schedule.append({
+            "course_name": courses_dict[course_id].name,
+            "section_id": section_id,
+            "professor": professors_dict[prof_id].name,
             # Here we display the starting time of the block.
-            # Optionally, you could also output the entire list of time strings.
-            start_time = time_str_by_id.get(block_slot_ids[0], "Unknown")
-            result_schedule.append({
-                "course_name": courses_dict[course_id].name,
-                "section_id": section_id,
-                "professor": professors_dict[prof_id].name,
-                "start_time": start_time,
-                "time_slots": [time_str_by_id.get(tsid, "Unknown") for tsid in block_slot_ids],
-                "room": rooms_dict[room_id].name,
-                "days": day
-            })
-
-            result_schedule.sort(key=lambda x: (x["days"], x["start_time"]))
-    
+            "start_time": time_slots[0] if time_slots else "Unknown",
+            "time_slots": list(time_slots),
+            "room": rooms_dict[room_id].name,
+            "days": day
+        })
+        first_minute = start_minute.get(block_slot_ids[0]) if block_slot_ids else None
+        sort_keys.append((day, first_minute or 0))
+    order = sorted(range(len(result_schedule)), key=sort_keys.__getitem__)
+    return [result_schedule[i] for i in order]
+
+
+def layout_schedule(schedule, layout="list"):
+    """Arrange a schedule's entries as a list, as compact columns and rows, or grouped by professor, room or day."""
+    if layout not in SCHEDULE_LAYOUTS:
+        raise ValueError(f"Unknown layout {layout!r}, expected one of {SCHEDULE_LAYOUTS}")
+    if layout == "list":
+        return schedule
+    if layout == "compact":
+        return {
+            "columns": list(SCHEDULE_COLUMNS),
+            "rows": [[entry[column] for column in SCHEDULE_COLUMNS] for entry in schedule],
+        }
+    field = GROUPED_LAYOUTS[layout]
+    groups = {}
+    for entry in schedule:
+        groups.setdefault(entry[field], []).append(entry)
+    return groups
+
+
+def _solve(model, built, inputs, solver_config, on_solution=None):
+    """Solve the model and return the solver, its status and the statistics for the response."""
+    solver = cp_model.CpSolver()
+    _configure_solver(solver, solver_config)
+    publisher = _SolutionPublisher(built, lambda assignments: _format_schedule(inputs, assignments), on_solution)
+    status = solver.Solve(model, publisher)
+    return solver, status, _solver_stats(solver, status, publisher)
+
+
+def _solve_staged(model, built, inputs, solver_config, stages, on_solution=None):
+    """Minimize the objective terms lexicographically, one parsed stage at a time, each bounding the stages after it."""
+    stage_stats = []
+    best = None
+    for position, stage in enumerate(stages):
+        objective = sum(weight * built.objective_terms[name] for name, weight in stage["weights"].items())
+        last = position == len(stages) - 1
+        if last:
+            objective = objective + built.disruption
+        model.Minimize(objective)
+        stage_config = dict(solver_config)
+        if stage["max_time_in_seconds"] is not None:
+            stage_config["max_time_in_seconds"] = stage["max_time_in_seconds"]
+        solver, status, stats = _solve(model, built, inputs, stage_config, on_solution)
+        stage_stats.append({"terms": list(stage["weights"]), "tolerance": stage["tolerance"],
+                            "max_time_in_seconds": stage_config.get("max_time_in_seconds"), **stats})
+        if status not in (cp_model.FEASIBLE, cp_model.OPTIMAL):
+            break
+        best = solver
+        if not last:
+            model.Add(objective <= round(solver.ObjectiveValue()) + stage["tolerance"])
+            model.ClearHints()
+            for index, value in enumerate(solver.ResponseProto().solution):
+                model.AddHint(model.GetIntVarFromProtoIndex(index), value)
+
+    if best is None:
+        overall = status
+    else:
+        solver = best
+        overall = cp_model.OPTIMAL
+        if any(stats["status"] != "OPTIMAL" for stats in stage_stats):
+            overall = cp_model.FEASIBLE
+    first_solution_time = stage_stats[0]["first_solution_time"]
+    return solver, overall, {
+        "status": solver.StatusName(overall),
+        "wall_time": round(sum(stats["wall_time"] for stats in stage_stats), 4),
+        "branches": sum(stats["branches"] for stats in stage_stats),
+        "conflicts": sum(stats["conflicts"] for stats in stage_stats),
+        "solutions": sum(stats["solutions"] for stats in stage_stats),
+        "first_solution_time": first_solution_time,
+        "stages": stage_stats,
+    }
+
+
+CHANGE_KINDS = ("courses", "professors", "rooms", "time_slots")
+
+
+def parse_changed(changed):
+    """Validate the changed ids of an incremental solve, raising ValueError on bad input."""
+    if not isinstance(changed, dict):
+        raise ValueError("changed must map change kinds to lists of ids")
+    unknown = set(changed) - set(CHANGE_KINDS)
+    if unknown:
+        raise ValueError(f"Unknown change kinds {sorted(unknown)}, expected any of {CHANGE_KINDS}")
+    parsed = {}
+    for kind, ids in changed.items():
+        if not isinstance(ids, list) or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+            raise ValueError(f"{kind} must be a list of integer ids, got {ids!r}")
+        parsed[kind] = sorted(ids)
+    return parsed
+
+
+def _affected_sections(changed, inputs, previous):
+    """Return the ids of sections the changed entities can affect, and of those with no previous assignment."""
+    changed_courses = set(changed.get("courses", []))
+    changed_profs = set(changed.get("professors", []))
+    changed_rooms = set(changed.get("rooms", []))
+    changed_slots = set(changed.get("time_slots", []))
+    for course_id, prof_ids in inputs["course_to_professors"].items():
+        if changed_profs.intersection(prof_ids):
+            changed_courses.add(course_id)
+
+    affected = set()
+    for sec in inputs["sections"]:
+        previous_assignment = previous.get(sec.id)
+        if previous_assignment is None or sec.course_id in changed_courses:
+            affected.add(sec.id)
+            continue
+        prof_id, room_id, block_slot_ids = previous_assignment
+        if prof_id in changed_profs or room_id in changed_rooms or changed_slots.intersection(block_slot_ids):
+            affected.add(sec.id)
+    return affected
+
+
+def _expand_neighborhood(neighborhood, inputs, previous):
+    """Add the sections that previously shared a professor or room with the neighborhood,
+    or that a professor qualified for one of its courses was teaching."""
+    course_by_section = {sec.id: sec.course_id for sec in inputs["sections"]}
+    profs = set()
+    rooms = set()
+    for section_id in neighborhood:
+        if section_id in previous:
+            profs.add(previous[section_id][0])
+            rooms.add(previous[section_id][1])
+        profs.update(inputs["course_to_professors"].get(course_by_section.get(section_id), []))
+    return neighborhood | {
+        section_id for section_id, (prof_id, room_id, _) in previous.items()
+        if section_id in course_by_section and (prof_id in profs or room_id in rooms)
+    }
+
+
+def _solve_component(inputs, formulation, symmetry_breaking, solver_config, previous, disruption_weight,
+                     objective_weights, stages, variable_names, back_to_back_gap):
+    """Build and solve one component of a decomposed schedule. Runs in a worker process,
+    so it only takes and returns plain data."""
+    build_timings = {}
+    model, built = _build_model(inputs, "no_overlap", formulation, symmetry_breaking, previous,
+                                disruption_weight, {}, build_timings, objective_weights=objective_weights,
+                                variable_names=variable_names, back_to_back_gap=back_to_back_gap)
+    if stages:
+        solver, status, solver_stats = _solve_staged(model, built, inputs, solver_config, stages)
+    else:
+        solver, status, solver_stats = _solve(model, built, inputs, solver_config)
+    assignments = list(built.assignments(solver)) if status in (cp_model.FEASIBLE, cp_model.OPTIMAL) else []
+    return {
+        "status": status,
+        "assignments": assignments,
+        "solver_stats": solver_stats,
+        "num_variables": built.num_variables,
+        "num_constraints": len(model.Proto().constraints),
+        "constraint_counts": built.constraint_counts,
+        "hinted_sections": built.hinted_sections,
+        "courses": len(inputs["courses"]),
+        "sections": len(inputs["sections"]),
+    }
+
+
+def _solve_decomposed(inputs, formulation, symmetry_breaking, solver_config, previous, disruption_weight,
+                      objective_weights, stages, variable_names, back_to_back_gap):
+    """Solve the components of the schedule separately and merge them, or return None to solve it whole."""
+    components = course_components(inputs)
+    if len(components) > 1:
+        mode = "independent"
+        subproblems = [subproblem_inputs(inputs, course_ids) for course_ids in components]
+        num_processes = min(len(subproblems), os.cpu_count() or 1)
+        if not solver_config.get("num_search_workers"):
+            # Split the cores between the solver processes instead of oversubscribing them.
+            solver_config = {**solver_config, "num_search_workers": max(1, (os.cpu_count() or 1) // num_processes)}
+        with ProcessPoolExecutor(num_processes, mp_context=multiprocessing.get_context("spawn")) as pool:
+            outcomes = list(pool.map(
+                _solve_component, subproblems, repeat(formulation), repeat(symmetry_breaking),
+                repeat(solver_config), repeat(previous), repeat(disruption_weight), repeat(objective_weights),
+                repeat(stages), repeat(variable_names), repeat(back_to_back_gap),
+            ))
+    else:
+        components = course_components(inputs, share_rooms=False)
+        if len(components) < 2:
+            return None
+        mode = "sequential"
+        outcomes = []
+        occupied = []
+        for course_ids in components:
+            outcome = _solve_component(subproblem_inputs(inputs, course_ids, occupied), formulation,
+                                       symmetry_breaking, solver_config, previous, disruption_weight,
+                                       objective_weights, stages, variable_names, back_to_back_gap)
+            outcomes.append(outcome)
+            if outcome["status"] not in (cp_model.FEASIBLE, cp_model.OPTIMAL):
+                # An earlier component may have taken rooms this one needed.
+                return None
+            # Whole blocks, so the breaks between their slots stay taken too.
+            occupied.extend((room_id, atom) for *_, block_slot_ids, room_id in outcome["assignments"]
+                            for atom in inputs["time_axis"].block_atoms(block_slot_ids))
+
+    statuses = [outcome["status"] for outcome in outcomes]
+    if cp_model.INFEASIBLE in statuses:
+        status = cp_model.INFEASIBLE
+    elif any(status not in (cp_model.FEASIBLE, cp_model.OPTIMAL) for status in statuses):
+        status = cp_model.UNKNOWN
+    else:
+        # Each component is optimal for its own professors only.
+        status = cp_model.FEASIBLE
     return {
+        "mode": mode,
+        "status": status,
+        "assignments": [key for outcome in outcomes for key in outcome["assignments"]],
+        "outcomes": outcomes,
+    }
+
+
+def _professor_loads(inputs, assignments):
+    """Credit hours each professor teaches in the given assignments."""
+    loads = {prof.id: 0 for prof in inputs["professors"]}
+    for _, course_id, prof_id, *_ in assignments:
+        loads[prof_id] += inputs["courses_dict"][course_id].credit_hours
+    return loads
+
+
+def _objective_terms(inputs, assignments, back_to_back_gap=BACK_TO_BACK_GAP):
+    """Evaluate every term in OBJECTIVE_WEIGHTS, unweighted, for a complete set of assignments."""
+    loads = _professor_loads(inputs, assignments)
+    penalty_by_slot = {ts.id: ts.penalty for ts in inputs["time_slots"]}
+    time_axis = inputs["time_axis"]
+    terms = {
+        "load_difference": max(loads.values(), default=0) - min(loads.values(), default=0),
+        "time_slot": 0,
+        "back_to_back": 0,
+        "room_fit": 0,
+    }
+    starts = set()
+    ends = set()
+    for _, course_id, prof_id, _, block_slot_ids, room_id in assignments:
+        terms["time_slot"] += sum(penalty_by_slot[ts_id] for ts_id in block_slot_ids)
+        terms["room_fit"] += inputs["rooms_dict"][room_id].capacity - inputs["courses_dict"][course_id].max_students
+        for group, start, end in time_axis.block_bounds(block_slot_ids):
+            starts.add((prof_id, group, start))
+            ends.add((prof_id, group, end))
+    terms["back_to_back"] = sum(bin(time_axis.groups[group]).count("1")
+                                for (_, group, _), _ in _back_to_back_pairs(ends, starts, back_to_back_gap,
+                                                                               time_axis.adjacent))
+    return terms
+
+
+def _objective_value(inputs, assignments, previous, disruption_weight, objective_weights,
+                     back_to_back_gap=BACK_TO_BACK_GAP):
+    """Evaluate the objective generate_schedule minimizes for a complete set of assignments."""
+    terms = _objective_terms(inputs, assignments, back_to_back_gap)
+    objective = sum(weight * terms[name] for name, weight in objective_weights.items())
+    if disruption_weight:
+        chosen = {section_id: (prof_id, room_id, tuple(block_slot_ids))
+                  for section_id, _, prof_id, _, block_slot_ids, room_id in assignments}
+        objective += disruption_weight * sum(
+            1 for section_id, previous_assignment in previous.items()
+            if section_id in chosen and chosen[section_id] != tuple(previous_assignment)
+        )
+    return objective
+
+
+LNS_NEIGHBORHOODS = ("professor", "time_slot", "room")
+# Time limit of each neighborhood re-solve, in seconds.
+LNS_SUBPROBLEM_SECONDS = 2.0
+
+
+def _lns_neighborhood(kind, inputs, current, prof_id, rng):
+    """Pick the section ids of one professor, time slot or room to free for one improvement step."""
+    if kind == "professor":
+        courses = {course_id for course_id, prof_ids in inputs["course_to_professors"].items() if prof_id in prof_ids}
+        return {sec.id for sec in inputs["sections"]
+                if sec.course_id in courses or current.get(sec.id, (None,))[0] == prof_id}
+    if kind == "time_slot":
+        ts_id = rng.choice(inputs["time_slots"]).id
+        return {section_id for section_id, (_, _, block_slot_ids) in current.items()
+                if inputs["time_axis"].overlaps(block_slot_ids, [ts_id])}
+    room_id = rng.choice(inputs["rooms"]).id
+    return {section_id for section_id, (_, assigned_room, _) in current.items() if assigned_room == room_id}
+
+
+def _improve_with_lns(inputs, room_constraint, formulation, symmetry_breaking, solver_config, previous,
+                      disruption_weight, objective_weights, assignments, objective_value, budget,
+                      on_solution=None, variable_names=True, back_to_back_gap=BACK_TO_BACK_GAP, bound=0):
+    """Improve a feasible schedule by large neighborhood search for budget seconds or until it reaches bound."""
+    started = time.perf_counter()
+    rng = random.Random(solver_config.get("random_seed", 0))
+    # The gap limit is meant for the initial solve; a step that stops at its hint never improves.
+    sub_config = {name: value for name, value in solver_config.items() if name != "relative_gap_limit"}
+
+    def extremes(loads):
+        return sum(1 for load in loads.values() if load in (max(loads.values()), min(loads.values())))
+
+    loads = _professor_loads(inputs, assignments)
+    trajectory = [{"elapsed": 0.0, "objective_value": objective_value, "neighborhood": None}]
+    iterations = 0
+    moves = 0
+    while objective_value > bound and time.perf_counter() - started < budget:
+        iterations += 1
+        current = {section_id: (prof_id, room_id, tuple(block_slot_ids))
+                   for section_id, _, prof_id, _, block_slot_ids, room_id in assignments}
+        kind = LNS_NEIGHBORHOODS[iterations % len(LNS_NEIGHBORHOODS)]
+        # Alternate between the most and the least loaded professors.
+        extreme_load = max(loads.values()) if iterations % 2 else min(loads.values())
+        prof_id = rng.choice([p for p, load in loads.items() if load == extreme_load])
+        neighborhood = _lns_neighborhood(kind, inputs, current, prof_id, rng)
+        locked = {section_id: assignment for section_id, assignment in current.items()
+                  if section_id not in neighborhood}
+
+        remaining = budget - (time.perf_counter() - started)
+        sub_config["max_time_in_seconds"] = max(0.1, min(LNS_SUBPROBLEM_SECONDS, remaining))
+        model, built = _build_model(inputs, room_constraint, formulation, symmetry_breaking, previous,
+                                    disruption_weight, locked, {}, hints=current,
+                                    objective_weights=objective_weights, variable_names=variable_names,
+                                    back_to_back_gap=back_to_back_gap)
+        # The load difference only drops once every professor at an extreme load has moved,
+        # so a professor step requires its professor to move off it.
+        if kind == "professor":
+            if extreme_load == max(loads.values()):
+                model.Add(built.prof_load[prof_id] < extreme_load)
+            else:
+                model.Add(built.prof_load[prof_id] > extreme_load)
+        solver, status, _ = _solve(model, built, inputs, sub_config)
+        if status not in (cp_model.FEASIBLE, cp_model.OPTIMAL):
+            continue
+        new_assignments = list(built.assignments(solver))
+        new_loads = _professor_loads(inputs, new_assignments)
+        # Keep steps that lower the objective, or keep it with fewer professors at either extreme.
+        # The objective is integral; the solver's float can be a hair below the current one.
+        new_objective = round(solver.ObjectiveValue())
+        if (new_objective, extremes(new_loads)) >= (objective_value, extremes(loads)):
+            continue
+
+        moves += 1
+        improved = new_objective < objective_value
+        assignments, loads, objective_value = new_assignments, new_loads, new_objective
+        if not improved:
+            continue
+        elapsed = round(time.perf_counter() - started, 4)
+        trajectory.append({"elapsed": elapsed, "objective_value": objective_value, "neighborhood": kind})
+        if on_solution is not None and on_solution({
+            "objective_value": objective_value,
+            "elapsed": elapsed,
+            "schedule": _format_schedule(inputs, assignments),
+        }):
+            break
+
+    report = {
+        "budget": budget,
+        "bound": bound,
+        "iterations": iterations,
+        "moves": moves,
+        "improvements": len(trajectory) - 1,
+        "trajectory": trajectory,
+    }
+    return assignments, objective_value, report
+
+
+def generate_schedule(db_session, room_constraint="no_overlap", formulation="joint", symmetry_breaking=False,
+                      solver_config=None, on_solution=None, persist=False, use_cache=False,
+                      warm_start=None, disruption_weight=0, changed=None, explain=False,
+                      decompose=False, lns_budget=0, objective_weights=None, stages=None,
+                      variable_names=True, back_to_back_gap=BACK_TO_BACK_GAP):
+    """Generate the schedule using OR-Tools allowing multi-slot courses and return the results as a dictionary.
+    The options are listed under "Scheduler options" in README.md."""
+    if room_constraint not in ROOM_CONSTRAINTS:
+        raise ValueError(f"Unknown room_constraint {room_constraint!r}, expected one of {ROOM_CONSTRAINTS}")
+    if formulation not in FORMULATIONS:
+        raise ValueError(f"Unknown formulation {formulation!r}, expected one of {FORMULATIONS}")
+    if changed is not None:
+        changed = parse_changed(changed)
+        warm_start = True if warm_start is None else warm_start
+    if decompose and (on_solution is not None or changed is not None or room_constraint != "no_overlap"):
+        raise ValueError("decompose only supports the no_overlap room constraint without on_solution or changed")
+    if formulation == "two_stage" and (decompose or lns_budget or room_constraint != "no_overlap"):
+        raise ValueError("two_stage only supports the no_overlap room constraint without decompose or lns_budget")
+    solver_config = parse_solver_config(solver_config)
+    objective_weights = parse_objective_weights(objective_weights)
+    stages = parse_stages(stages, objective_weights)
+    back_to_back_gap = parse_back_to_back_gap(back_to_back_gap)
+
+    metrics = RequestMetrics()
+    build_started = time.perf_counter()
+    inputs = load_snapshot(db_session)
+    metrics.add_span("load_data", build_started)
+
+    previous_version = None
+    previous = {}
+    if warm_start:
+        phase_started = time.perf_counter()
+        previous_version = latest_version_id() if warm_start is True else warm_start
+        if previous_version is not None:
+            previous = load_assignments(previous_version)
+        metrics.add_span("load_warm_start", phase_started)
+
+    phase_started = time.perf_counter()
+    input_fingerprint = _input_fingerprint(inputs, [
+        room_constraint, formulation, symmetry_breaking, sorted(solver_config.items()),
+        previous_version, disruption_weight, changed, explain, decompose, lns_budget,
+        sorted(objective_weights.items()), stages, back_to_back_gap,
+    ])
+    metrics.add_span("fingerprint", phase_started)
+    # A saved schedule is a new version every time, so persist always solves.
+    if use_cache and not persist:
+        cached = schedule_cache.get(input_fingerprint)
+        if cached is not None:
+            return _with_metrics({**cached, "cache": {"fingerprint": input_fingerprint, "hit": True}},
+                                 metrics, "cached")
+
+    build_timings = {"load_data": time.perf_counter() - build_started}
+
+    # Reject inputs that cannot have a schedule before spending any time on the model.
+    phase_started = time.perf_counter()
+    diagnostics = find_infeasibilities(inputs, room_constraint)
+    warnings = find_warnings(inputs)
+    build_timings["presolve"] = time.perf_counter() - phase_started
+    metrics.add_span("presolve", phase_started)
+    if diagnostics:
+        result = {
+            "status": "No feasible schedule found.",
+            "diagnostics": diagnostics,
+            "model_build": {"timings": {phase: round(seconds, 4) for phase, seconds in build_timings.items()}},
+        }
+        if warnings:
+            result["warnings"] = warnings
+        return _with_metrics(result, metrics, "diagnosed")
+
+    locked = {}
+    if changed is not None:
+        neighborhood = _affected_sections(changed, inputs, previous)
+        locked = {section_id: assignment for section_id, assignment in previous.items()
+                  if section_id in inputs["section_ids"] and section_id not in neighborhood}
+
+    decomposed = None
+    if decompose:
+        phase_started = time.perf_counter()
+        decomposed = _solve_decomposed(inputs, formulation, symmetry_breaking, solver_config, previous,
+                                       disruption_weight, objective_weights, stages, variable_names,
+                                       back_to_back_gap)
+        build_timings["decomposed_solve"] = time.perf_counter() - phase_started
+        metrics.add_span("decomposed_solve", phase_started)
+
+    if decomposed is not None:
+        build_timings["total"] = time.perf_counter() - build_started
+        outcomes = decomposed["outcomes"]
+        status = decomposed["status"]
+        assignments = decomposed["assignments"]
+        hinted_sections = sum(outcome["hinted_sections"] for outcome in outcomes)
+        model_build = {
+            "formulation": formulation,
+            "symmetry_breaking": symmetry_breaking,
+            "num_variables": sum(outcome["num_variables"] for outcome in outcomes),
+            "num_constraints": sum(outcome["num_constraints"] for outcome in outcomes),
+            "timings": {phase: round(seconds, 4) for phase, seconds in build_timings.items()},
+            "decomposition": {
+                "mode": decomposed["mode"],
+                "components": [
+                    {key: outcome[key] for key in ("courses", "sections", "num_variables", "num_constraints")}
+                    | {"status": outcome["solver_stats"]["status"], "wall_time": outcome["solver_stats"]["wall_time"]}
+                    for outcome in outcomes
+                ],
+            },
+        }
+        first_solution_times = [outcome["solver_stats"]["first_solution_time"] for outcome in outcomes]
+        solver_stats = {
+            "status": {cp_model.INFEASIBLE: "INFEASIBLE", cp_model.UNKNOWN: "UNKNOWN"}.get(status, "FEASIBLE"),
+            "wall_time": round(build_timings["decomposed_solve"], 4),
+            "branches": sum(outcome["solver_stats"]["branches"] for outcome in outcomes),
+            "conflicts": sum(outcome["solver_stats"]["conflicts"] for outcome in outcomes),
+            "solutions": min(outcome["solver_stats"]["solutions"] for outcome in outcomes),
+            "first_solution_time": None if None in first_solution_times else max(first_solution_times),
+        }
+        if status == cp_model.FEASIBLE:
+            objective_value = _objective_value(inputs, assignments, previous, disruption_weight,
+                                              objective_weights, back_to_back_gap)
+            solver_stats["objective_value"] = objective_value
+        locked_sections = set()
+        constraint_counts = {}
+        for outcome in outcomes:
+            for phase, count in outcome["constraint_counts"].items():
+                constraint_counts[phase] = constraint_counts.get(phase, 0) + count
+    else:
+        attempts = 0
+        while True:
+            attempts += 1
+            phase_started = time.perf_counter()
+            phase_timings = {}
+            model, built = _build_model(inputs, room_constraint, formulation, symmetry_breaking, previous,
+                                        disruption_weight, locked, phase_timings,
+                                        objective_weights=objective_weights, variable_names=variable_names,
+                                        back_to_back_gap=back_to_back_gap)
+            build_timings.update(phase_timings)
+            build_timings["total"] = time.perf_counter() - build_started
+            metrics.add_span("build", phase_started, children=phase_timings)
+
+            # Solve the model
+            phase_started = time.perf_counter()
+            if stages:
+                solver, status, solver_stats = _solve_staged(model, built, inputs, solver_config, stages,
+                                                             on_solution)
+            else:
+                solver, status, solver_stats = _solve(model, built, inputs, solver_config, on_solution)
+            metrics.add_span("solve", phase_started)
+            if status != cp_model.INFEASIBLE or not locked:
+                break
+            # The locked sections leave no room for the affected ones: free their neighbours,
+            # and fall back to a full solve once the neighborhood stops growing.
+            neighborhood = _expand_neighborhood(neighborhood, inputs, previous)
+            still_locked = {section_id: assignment for section_id, assignment in locked.items()
+                            if section_id not in neighborhood}
+            locked = still_locked if len(still_locked) < len(locked) else {}
+
+        assignments = None
+        room_matching = None
+        if formulation == "two_stage" and status in (cp_model.FEASIBLE, cp_model.OPTIMAL):
+            phase_started = time.perf_counter()
+            assignments = built.assignments(solver)
+            build_timings["room_matching"] = time.perf_counter() - phase_started
+            metrics.add_span("room_matching", phase_started)
+            room_matching = {"status": "MATCHED" if assignments is not None else "NO_MATCHING"}
+            if assignments is None:
+                # No rooms fit the times of stage one: solve the joint model, which chooses
+                # rooms together with times, instead.
+                room_matching["stage_one"] = solver_stats
+                room_matching["fallback"] = "joint"
+                phase_started = time.perf_counter()
+                phase_timings = {}
+                model, built = _build_model(inputs, room_constraint, "joint", symmetry_breaking, previous,
+                                            disruption_weight, locked, phase_timings,
+                                            objective_weights=objective_weights, variable_names=variable_names,
+                                            back_to_back_gap=back_to_back_gap)
+                build_timings["fallback_build"] = time.perf_counter() - phase_started
+                metrics.add_span("fallback_build", phase_started, children=phase_timings)
+                phase_started = time.perf_counter()
+                if stages:
+                    solver, status, solver_stats = _solve_staged(model, built, inputs, solver_config, stages,
+                                                                 on_solution)
+                else:
+                    solver, status, solver_stats = _solve(model, built, inputs, solver_config, on_solution)
+                metrics.add_span("fallback_solve", phase_started)
+
+        model_build = {
+            "formulation": formulation,
+            "symmetry_breaking": symmetry_breaking,
+            "num_variables": built.num_variables,
+            "num_constraints": len(model.Proto().constraints),
+            "timings": {phase: round(seconds, 4) for phase, seconds in build_timings.items()},
+        }
+        if decompose:
+            model_build["decomposition"] = {"mode": "monolithic"}
+        if room_matching is not None:
+            model_build["room_matching"] = room_matching
+        if status in (cp_model.FEASIBLE, cp_model.OPTIMAL):
+            if assignments is None:
+                assignments = list(built.assignments(solver))
+            objective_value = solver.ObjectiveValue()
+            if stages or room_matching is not None:
+                # The last stage's objective leaves out the terms of the earlier ones, and
+                # stage one of two_stage leaves out the rooms.
+                objective_value = _objective_value(inputs, assignments, previous, disruption_weight,
+                                                   objective_weights, back_to_back_gap)
+                solver_stats["objective_value"] = objective_value
+        hinted_sections = built.hinted_sections
+        locked_sections = built.locked_sections
+        constraint_counts = built.constraint_counts
+    metrics.model = {
+        "variables": model_build["num_variables"],
+        "constraints": model_build["num_constraints"],
+        "constraints_by_family": constraint_counts,
+    }
+
+    lns_start = "solver"
+    if lns_budget and status == cp_model.UNKNOWN and previous:
+        # The solver found nothing in time, but the search can still start from the warm
+        # start schedule, placing only the sections it does not cover.
+        phase_started = time.perf_counter()
+        locked = {section_id: assignment for section_id, assignment in previous.items()
+                  if section_id in inputs["section_ids"]}
+        model, built = _build_model(inputs, room_constraint, formulation, symmetry_breaking, previous,
+                                    disruption_weight, locked, {}, objective_weights=objective_weights,
+                                    variable_names=variable_names, back_to_back_gap=back_to_back_gap)
+        solver, start_status, _ = _solve(model, built, inputs,
+                                         {**solver_config, "max_time_in_seconds": LNS_SUBPROBLEM_SECONDS})
+        if start_status in (cp_model.FEASIBLE, cp_model.OPTIMAL):
+            status = start_status
+            assignments = list(built.assignments(solver))
+            objective_value = solver.ObjectiveValue()
+            lns_start = "warm_start"
+        metrics.add_span("lns_start", phase_started)
+    metrics.solver = dict(solver_stats)
+
+    if status not in (cp_model.FEASIBLE, cp_model.OPTIMAL):
+        result = {"status": "No feasible schedule found.", "model_build": model_build, "solver_stats": solver_stats}
+        if explain and status == cp_model.INFEASIBLE:
+            phase_started = time.perf_counter()
+            result["conflict"] = explain_infeasibility(inputs, room_constraint,
+                                                       solver_config.get("max_time_in_seconds"))
+            metrics.add_span("explain", phase_started)
+        # A time limit may stop the search before it finds anything; only a proof of
+        # infeasibility is worth remembering.
+        if use_cache and status == cp_model.INFEASIBLE:
+            schedule_cache.put(input_fingerprint, result)
+        return _with_metrics(result, metrics, "infeasible" if status == cp_model.INFEASIBLE else "unknown")
+
+    lns_report = None
+    if lns_budget:
+        phase_started = time.perf_counter()
+        # The search stops at the solver's bound, which is the objective itself once the
+        # schedule is proven optimal. The bound only holds for the objective the solver
+        # minimized, which staged solves and the warm start's locked model do not share,
+        # so optimal staged schedules are taken as they are.
+        bound = 0
+        if lns_start == "solver" and decomposed is None and not stages:
+            bound = max(0, solver.BestObjectiveBound())
+        elif lns_start == "solver" and status == cp_model.OPTIMAL:
+            bound = objective_value
+        assignments, objective_value, lns_report = _improve_with_lns(
+            inputs, room_constraint, formulation, symmetry_breaking, solver_config, previous, disruption_weight,
+            objective_weights, assignments, objective_value, lns_budget, on_solution, variable_names,
+            back_to_back_gap, bound,
+        )
+        lns_report["start"] = lns_start
+        # Report the objective of the schedule that is returned, not the one LNS started from.
+        objective_value = _objective_value(inputs, assignments, previous, disruption_weight, objective_weights,
+                                           back_to_back_gap)
+        solver_stats["objective_value"] = objective_value
+        metrics.solver = dict(solver_stats)
+        metrics.add_span("lns", phase_started)
+
+    phase_started = time.perf_counter()
+    result_schedule = _format_schedule(inputs, assignments)
+
+    result = {
         "status": "Schedule generated successfully.",
         "schedule": result_schedule,
+        "model_build": model_build,
+        "solver_stats": solver_stats,
+        "objective_terms": _objective_terms(inputs, assignments, back_to_back_gap),
     }
+    if warnings:
+        result["warnings"] = warnings
+    if warm_start:
+        result["warm_start"] = {
+            "version": previous_version,
+            "hinted_sections": hinted_sections,
+            "changed_sections": sum(
+                1 for section_id, _, prof_id, _, block_slot_ids, room_id in assignments
+                if section_id in previous and previous[section_id] != (prof_id, room_id, tuple(block_slot_ids))
+            ),
+        }
+    if lns_report is not None:
+        result["lns"] = lns_report
+    if changed is not None:
+        result["incremental"] = {
+            "locked_sections": len(locked_sections),
+            "reoptimized_sections": len(inputs["section_ids"]) - len(locked_sections),
+            "attempts": attempts,
+        }
+    metrics.add_span("serialize", phase_started)
+    if use_cache:
+        schedule_cache.put(input_fingerprint, result)
+        result = {**result, "cache": {"fingerprint": input_fingerprint, "hit": False}}
+    if persist:
+        phase_started = time.perf_counter()
+        result["version"] = save_schedule(db_session, assignments, objective_value)
+        metrics.add_span("persist", phase_started)
+    return _with_metrics(result, metrics, "scheduled")
+
+
+def _with_metrics(result, metrics, outcome):
+    """Add the call's RequestMetrics to the process totals and return a copy of the result
+    with them under "metrics", leaving the (possibly cached) result itself untouched."""
+    metrics_registry.record(outcome, metrics)
+    return {**result, "metrics": metrics.as_dict()}
@@ -0,0 +1,35 @@
+import pytest
+from config import Config
+from models import db
+from routes.courses import courses_blueprint
+from routes.professors import professors_blueprint
+from routes.rooms import rooms_blueprint
+from routes.time_slots import time_slots_blueprint
+from routes.scheduler import scheduler_blueprint
+from schedule_cache import schedule_cache
+from benchmarks.catalog import make_app
+
+
+@pytest.fixture
+def app():
+    """The API on an empty in-memory SQLite database instead of MySQL."""
+    app = make_app()
+    app.config.from_object(Config)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+    app.config["SOLVER_NUM_SEARCH_WORKERS"] = 1
+    app.config["SOLVER_MAX_TIME_IN_SECONDS"] = 10
+    for blueprint in (courses_blueprint, professors_blueprint, rooms_blueprint, time_slots_blueprint,
+                      scheduler_blueprint):
+        app.register_blueprint(blueprint)
+    # Results of earlier tests would otherwise be served from the process-wide cache.
+    schedule_cache.clear()
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
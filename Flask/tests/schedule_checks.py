@@ -0,0 +1,39 @@
+from itertools import combinations
+
+# Small solves in tests: one worker, so results do not depend on the machine.
+SOLVER_CONFIG = {"max_time_in_seconds": 20, "num_search_workers": 1, "random_seed": 0}
+
+
+def assert_valid(inputs, assignments):
+    """Check (section, course, professor, day, block, room) keys against every hard constraint."""
+    time_axis = inputs["time_axis"]
+    assert sorted(key[0] for key in assignments) == sorted(inputs["section_ids"])
+    loads = {}
+    for section_id, course_id, prof_id, day, block, room_id in assignments:
+        course = inputs["courses_dict"][course_id]
+        slot_ids = [ts.id for ts in inputs["time_slots_by_day"][day]]
+        assert day == course.meeting_days
+        assert tuple(block) in [tuple(slot_ids[s: s + course.slots_needed])
+                                for s in range(len(slot_ids) - course.slots_needed + 1)]
+        assert prof_id in inputs["course_to_professors"][course_id]
+        assert inputs["rooms_dict"][room_id].capacity >= course.max_students
+        assert room_id in inputs["room_restrictions_map"].get(course_id, [room_id])
+        assert not time_axis.overlaps(block, inputs["restricted_slots_by_prof"][prof_id])
+        loads[prof_id] = loads.get(prof_id, 0) + course.credit_hours
+    for prof_id, load in loads.items():
+        assert load <= inputs["professors_dict"][prof_id].max_credit_hours
+    for first, second in combinations(assignments, 2):
+        if time_axis.overlaps(first[4], second[4]):
+            assert first[2] != second[2], "professor booked twice"
+            assert first[5] != second[5], "room booked twice"
+
+
+def schedule_keys(inputs, schedule):
+    """The keys of generate_schedule's schedule entries, which name professors, rooms and slots."""
+    professors = {prof.name: prof.id for prof in inputs["professors"]}
+    rooms = {room.name: room.id for room in inputs["rooms"]}
+    slots = {(ts.meeting_days, ts.time): ts.id for ts in inputs["time_slots"]}
+    courses = {sec.id: sec.course_id for sec in inputs["sections"]}
+    return [(entry["section_id"], courses[entry["section_id"]], professors[entry["professor"]], entry["days"],
+             tuple(slots[(entry["days"], slot_time)] for slot_time in entry["time_slots"]), rooms[entry["room"]])
+            for entry in schedule]
@@ -0,0 +1,39 @@
+from schedule_cache import schedule_cache
+from benchmarks.catalog import seed_catalog
+
+
+def _generate(client, query=""):
+    response = client.get(f"/schedules/generate?num_search_workers=1&random_seed=0{query}")
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+
+def test_same_inputs_are_served_from_the_cache(client):
+    seed_catalog(4, 2, num_professors=3, num_rooms=2)
+    first = _generate(client)
+    second = _generate(client)
+    assert (first["cache"]["hit"], second["cache"]["hit"]) == (False, True)
+    assert first["cache"]["fingerprint"] == second["cache"]["fingerprint"]
+    assert first["schedule"] == second["schedule"]
+    assert "version" not in second
+
+
+def test_writes_invalidate_the_cache(client):
+    seed_catalog(4, 2, num_professors=3, num_rooms=2)
+    _generate(client)
+    assert len(schedule_cache) == 1
+    assert client.post("/rooms", json={"name": "Lab 103", "capacity": 10}).status_code == 201
+    assert len(schedule_cache) == 0
+    assert _generate(client)["cache"]["hit"] is False
+
+
+def test_saving_always_saves_a_new_version(client):
+    seed_catalog(4, 2, num_professors=3, num_rooms=2)
+    _generate(client)
+    first = _generate(client, "&save=true")
+    second = _generate(client, "&save=true")
+    assert (first["cache"]["hit"], second["cache"]["hit"]) == (False, False)
+    assert second["version"] == first["version"] + 1
+    assert client.get("/schedules/latest").get_json()["version"]["id"] == second["version"]
+    # A later request without save is served from the cache, without a version.
+    assert "version" not in _generate(client)
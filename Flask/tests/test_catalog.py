@@ -0,0 +1,47 @@
+import pytest
+from models import db
+from scheduler import FORMULATIONS, ROOM_OCCUPANCIES, _build_model, _solve, generate_schedule
+from schedule_snapshot import load_snapshot
+from benchmarks.catalog import seed_synthetic
+from schedule_checks import SOLVER_CONFIG, assert_valid, schedule_keys
+
+
+@pytest.fixture
+def catalog(app):
+    planted = seed_synthetic(12, 2, num_professors=6, num_rooms=4, qualification_density=0.3, seed=3)
+    return load_snapshot(db.session), planted
+
+
+def test_planted_schedule_is_valid(catalog):
+    inputs, planted = catalog
+    assert_valid(inputs, planted)
+
+
+def test_same_seed_gives_same_catalog(app):
+    assert seed_synthetic(12, 2, 6, 4, seed=5) == seed_synthetic(12, 2, 6, 4, seed=5)
+
+
+def test_too_few_rooms_is_rejected(app):
+    with pytest.raises(ValueError):
+        seed_synthetic(40, 3, num_professors=20, num_rooms=1)
+
+
+@pytest.mark.parametrize("formulation", FORMULATIONS)
+def test_generated_schedule_is_valid(catalog, formulation):
+    inputs, _ = catalog
+    result = generate_schedule(db.session, formulation=formulation, solver_config=SOLVER_CONFIG)
+    assert result["status"] == "Schedule generated successfully.", result
+    assert_valid(inputs, schedule_keys(inputs, result["schedule"]))
+
+
+@pytest.mark.parametrize("room_occupancy", ROOM_OCCUPANCIES)
+def test_room_occupancies_keep_rooms_free(catalog, room_occupancy):
+    inputs, planted = catalog
+    # A room taken all week by sections outside the model stays unused.
+    taken_room = planted[0][5]
+    inputs = inputs | {"occupied_room_atoms": [(taken_room, atom) for atom in range(inputs["time_axis"].num_atoms)]}
+    model, built = _build_model(inputs, "no_overlap", "joint", False, {}, 0, {}, {}, room_occupancy=room_occupancy)
+    solver, status, _ = _solve(model, built, inputs, SOLVER_CONFIG)
+    assignments = list(built.assignments(solver))
+    assert_valid(inputs, assignments)
+    assert taken_room not in {key[5] for key in assignments}
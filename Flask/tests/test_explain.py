@@ -0,0 +1,47 @@
+import pytest
+from models import db, Course, Professor, Room, Section, TimeSlot
+from scheduler import generate_schedule
+from schedule_explain import explain_infeasibility
+from schedule_snapshot import load_snapshot
+from schedule_checks import SOLVER_CONFIG
+
+
+@pytest.fixture
+def clash(app):
+    """Dr P teaches A and B but is restricted from two of the three MWF slots; C is fine."""
+    slots = [TimeSlot(time=time, meeting_days="MWF") for time in ("8:00AM", "9:00AM", "10:00AM")]
+    slots.append(TimeSlot(time="8:00AM", meeting_days="TTh"))
+    p, q = Professor(name="Dr P", max_credit_hours=18), Professor(name="Dr Q", max_credit_hours=18)
+    p.time_restrictions = slots[:2]
+    db.session.add_all(slots + [p, q, Room(name="Hall", capacity=50), Room(name="Lab", capacity=50)])
+    for name, meeting_days, professor in (("A", "MWF", p), ("B", "MWF", p), ("C", "TTh", q)):
+        course = Course(name=name, credit_hours=3, meeting_days=meeting_days, max_students=10, slots_needed=1)
+        course.professors = [professor]
+        db.session.add(course)
+        db.session.flush()
+        db.session.add(Section(course_id=course.id, section_number=1))
+    db.session.commit()
+
+
+def test_conflict_names_only_the_clashing_constraints(clash):
+    conflict = explain_infeasibility(load_snapshot(db.session), max_time_in_seconds=10)
+    assert sorted(item["course"] for item in conflict if item["kind"] == "section") == ["A", "B"]
+    assert {"kind": "professor_availability", "professor": "Dr P"} in conflict
+    assert sorted(item["time_slot"] for item in conflict if item["kind"] == "time_restriction") == [
+        "MWF 8:00AM", "MWF 9:00AM"]
+    assert all(item.get("professor") != "Dr Q" and item.get("course") != "C" for item in conflict)
+
+
+@pytest.mark.parametrize("formulation", ["joint", "factored"])
+def test_generate_explains_only_when_asked(clash, formulation):
+    result = generate_schedule(db.session, formulation=formulation, solver_config=SOLVER_CONFIG)
+    assert result["solver_stats"]["status"] == "INFEASIBLE"
+    assert "conflict" not in result
+    result = generate_schedule(db.session, formulation=formulation, solver_config=SOLVER_CONFIG, explain=True)
+    assert {"kind": "professor_availability", "professor": "Dr P"} in result["conflict"]
+
+
+def test_feasible_inputs_have_no_conflict(clash):
+    db.session.add(TimeSlot(time="11:00AM", meeting_days="MWF"))
+    db.session.commit()
+    assert explain_infeasibility(load_snapshot(db.session), max_time_in_seconds=10) is None
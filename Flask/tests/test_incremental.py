@@ -0,0 +1,44 @@
+import pytest
+from models import db
+from scheduler import generate_schedule
+from schedule_snapshot import load_snapshot
+from schedule_store import load_assignments
+from benchmarks.catalog import seed_catalog
+from schedule_checks import SOLVER_CONFIG, assert_valid, schedule_keys
+
+
+@pytest.fixture
+def saved(app):
+    seed_catalog(6, 2, num_professors=4, num_rooms=3)
+    result = generate_schedule(db.session, solver_config=SOLVER_CONFIG, persist=True)
+    return load_snapshot(db.session), load_assignments(result["version"])
+
+
+def test_sections_a_change_cannot_affect_stay_locked(saved):
+    inputs, previous = saved
+    changed_room = next(iter(previous.values()))[1]
+    result = generate_schedule(db.session, solver_config=SOLVER_CONFIG, changed={"rooms": [changed_room]})
+    assert result["status"] == "Schedule generated successfully.", result
+    assignments = schedule_keys(inputs, result["schedule"])
+    assert_valid(inputs, assignments)
+    unaffected = {section_id for section_id, (_, room_id, _) in previous.items() if room_id != changed_room}
+    assert result["incremental"]["locked_sections"] == len(unaffected)
+    for section_id, _, prof_id, _, block, room_id in assignments:
+        if section_id in unaffected:
+            assert (prof_id, room_id, block) == previous[section_id]
+
+
+def test_changed_without_warm_start_solves_everything(saved):
+    inputs, previous = saved
+    result = generate_schedule(db.session, solver_config=SOLVER_CONFIG, warm_start=False,
+                               changed={"rooms": [next(iter(previous.values()))[1]]})
+    assert result["incremental"]["locked_sections"] == 0
+    assert result["incremental"]["reoptimized_sections"] == len(inputs["section_ids"])
+    assert "warm_start" not in result
+
+
+def test_changed_ids_are_validated(app):
+    with pytest.raises(ValueError):
+        generate_schedule(db.session, changed={"buildings": [1]})
+    with pytest.raises(ValueError):
+        generate_schedule(db.session, changed={"rooms": ["1"]})
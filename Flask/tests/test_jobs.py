@@ -0,0 +1,72 @@
+import time
+import pytest
+from models import db
+from schedule_jobs import ABANDONED_ERROR, MemoryJobStore, ScheduleJobs, SQLiteJobStore
+from benchmarks.catalog import make_app, seed_catalog
+from schedule_checks import SOLVER_CONFIG
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    return MemoryJobStore() if request.param == "memory" else SQLiteJobStore(str(tmp_path / "jobs.db"))
+
+
+def _wait(jobs, job_id, timeout=60):
+    deadline = time.time() + timeout
+    while jobs.get(job_id)["status"] in ("queued", "running"):
+        assert time.time() < deadline, jobs.get(job_id)
+        time.sleep(0.1)
+    return jobs.get(job_id)
+
+
+def test_update_if_only_changes_the_expected_status(store):
+    store.create("job", {})
+    assert store.update_if("job", "queued", status="running")
+    assert not store.update_if("job", "queued", status="cancelled")
+    assert store.get("job")["status"] == "running"
+    assert not store.update_if("missing", "queued", status="running")
+
+
+def test_cancelled_job_is_not_started(store):
+    jobs = ScheduleJobs("sqlite://", store=store)
+    store.create("job", {})
+    queued = store.get("job")
+    assert jobs.cancel("job")["status"] == "cancelled"
+    # The worker read the job before the cancel came in.
+    store.get = lambda job_id: queued
+    jobs._run("job")
+    del store.get
+    assert store.get("job")["status"] == "cancelled"
+    assert store.get("job")["started_at"] is None
+
+
+def test_abandoned_jobs_expire(store):
+    store.create("old", {})
+    store.update("old", heartbeat_at=0)
+    store.create("new", {})
+    jobs = ScheduleJobs("sqlite://", store=store)
+    assert store.get("old")["status"] == "failed"
+    assert store.get("old")["error"] == ABANDONED_ERROR
+    assert store.get("new")["status"] == "queued"
+    # A job whose heartbeat stops later expires when it is looked up.
+    store.update("new", heartbeat_at=time.time() - jobs.stale_after - 1)
+    assert jobs.get("new")["status"] == "failed"
+
+
+def test_submitted_job_finishes_and_can_be_cancelled(store, tmp_path):
+    database_uri = f"sqlite:///{tmp_path / 'catalog.db'}"
+    app = make_app(database_uri)
+    with app.app_context():
+        db.create_all()
+        seed_catalog(4, 2, num_professors=3, num_rooms=2)
+    jobs = ScheduleJobs(database_uri, max_workers=1, store=store, poll_interval=0.1)
+    job_id = jobs.submit({"solver_config": SOLVER_CONFIG})
+    cancelled_id = jobs.submit({"solver_config": SOLVER_CONFIG})
+    assert jobs.cancel(cancelled_id)["status"] == "cancelled"
+    job = _wait(jobs, job_id)
+    assert job["status"] == "finished", job
+    assert job["result"]["status"] == "Schedule generated successfully."
+    assert len(job["result"]["schedule"]) == 8
+    jobs._queue.join()
+    assert jobs.get(cancelled_id)["status"] == "cancelled"
+    assert jobs.get(cancelled_id)["started_at"] is None
@@ -0,0 +1,48 @@
+import pytest
+from models import db
+from scheduler import SCHEDULE_COLUMNS, SCHEDULE_LAYOUTS, generate_schedule, layout_schedule
+from schedule_snapshot import load_snapshot
+from benchmarks.catalog import seed_catalog
+from schedule_checks import SOLVER_CONFIG
+
+
+@pytest.fixture
+def schedule(app):
+    seed_catalog(6, 2, num_professors=4, num_rooms=3)
+    return generate_schedule(db.session, solver_config=SOLVER_CONFIG)["schedule"]
+
+
+def test_schedule_is_sorted_by_day_and_start(schedule):
+    start_minute = {(ts.meeting_days, ts.time): ts.start_minute for ts in load_snapshot(db.session)["time_slots"]}
+    keys = [(entry["days"], start_minute[(entry["days"], entry["start_time"])]) for entry in schedule]
+    assert keys == sorted(keys)
+
+
+def test_compact_layout_keeps_every_value(schedule):
+    compact = layout_schedule(schedule, "compact")
+    assert compact["columns"] == list(SCHEDULE_COLUMNS)
+    assert [dict(zip(compact["columns"], row)) for row in compact["rows"]] == schedule
+
+
+@pytest.mark.parametrize("layout, field", [("by_professor", "professor"), ("by_room", "room"), ("by_day", "days")])
+def test_grouped_layouts(schedule, layout, field):
+    groups = layout_schedule(schedule, layout)
+    assert sorted(groups) == sorted({entry[field] for entry in schedule})
+    for value, entries in groups.items():
+        assert entries == [entry for entry in schedule if entry[field] == value]
+
+
+def test_unknown_layout_is_rejected(schedule):
+    assert layout_schedule(schedule, "list") is schedule
+    with pytest.raises(ValueError):
+        layout_schedule(schedule, "grid")
+
+
+def test_routes_lay_out_the_schedule(client):
+    seed_catalog(6, 2, num_professors=4, num_rooms=3)
+    version = client.get("/schedules/generate?num_search_workers=1&save=true").get_json()["version"]
+    for layout in SCHEDULE_LAYOUTS:
+        generated = client.get(f"/schedules/generate?num_search_workers=1&layout={layout}").get_json()
+        saved = client.get(f"/schedules/{version}?layout={layout}").get_json()
+        assert type(generated["schedule"]) is type(saved["schedule"]) is (list if layout == "list" else dict)
+    assert client.get("/schedules/latest?layout=grid").status_code == 400
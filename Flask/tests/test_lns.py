@@ -0,0 +1,45 @@
+import pytest
+import scheduler
+from models import db
+from scheduler import OBJECTIVE_WEIGHTS, _improve_with_lns, _objective_terms, _objective_value, generate_schedule
+from schedule_metrics import metrics_registry
+from schedule_snapshot import load_snapshot
+from benchmarks.catalog import seed_synthetic
+from schedule_checks import SOLVER_CONFIG, assert_valid, schedule_keys
+
+
+@pytest.fixture
+def catalog(app):
+    planted = seed_synthetic(12, 2, num_professors=6, num_rooms=4, qualification_density=0.3, seed=3)
+    return load_snapshot(db.session), planted
+
+
+def test_lns_never_worsens_the_start(catalog):
+    inputs, planted = catalog
+    start = _objective_value(inputs, planted, {}, 0, OBJECTIVE_WEIGHTS)
+    assignments, objective_value, report = _improve_with_lns(
+        inputs, "no_overlap", "joint", True, SOLVER_CONFIG, {}, 0, OBJECTIVE_WEIGHTS, planted, start, 2,
+    )
+    assert_valid(inputs, assignments)
+    assert objective_value == _objective_value(inputs, assignments, {}, 0, OBJECTIVE_WEIGHTS)
+    objectives = [step["objective_value"] for step in report["trajectory"]]
+    assert objectives[0] == start
+    assert objectives == sorted(objectives, reverse=True)
+
+
+def test_reported_objective_is_that_of_the_returned_schedule(catalog, monkeypatch):
+    inputs, planted = catalog
+
+    def improve(*args):
+        # Pretend LNS found the planted schedule but kept the start's objective value.
+        return planted, args[9], {"iterations": 1, "trajectory": []}
+
+    monkeypatch.setattr(scheduler, "_improve_with_lns", improve)
+    result = generate_schedule(db.session, solver_config=SOLVER_CONFIG, lns_budget=1)
+    assignments = schedule_keys(inputs, result["schedule"])
+    assert sorted(assignments) == sorted(planted)
+    objective_value = _objective_value(inputs, planted, {}, 0, OBJECTIVE_WEIGHTS)
+    assert result["solver_stats"]["objective_value"] == objective_value
+    assert result["metrics"]["solver"]["objective_value"] == objective_value
+    assert result["objective_terms"] == _objective_terms(inputs, planted)
+    assert f"scheduler_last_objective_value {objective_value}\n" in metrics_registry.render()
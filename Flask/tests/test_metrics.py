@@ -0,0 +1,59 @@
+import os
+import re
+from models import db, Course, Section
+from scheduler import generate_schedule
+from schedule_metrics import metrics_registry
+from benchmarks.catalog import seed_catalog
+from schedule_checks import SOLVER_CONFIG
+
+
+def _requests(outcome):
+    match = re.search(rf'^scheduler_requests_total{{outcome="{outcome}"}} (\d+)$', metrics_registry.render(), re.M)
+    return int(match.group(1)) if match else 0
+
+
+def test_result_breaks_the_call_down(app):
+    seed_catalog(4, 2, num_professors=3, num_rooms=2)
+    scheduled = _requests("scheduled")
+    result = generate_schedule(db.session, solver_config=SOLVER_CONFIG)
+    metrics = result["metrics"]
+    names = [span["name"] for span in metrics["spans"]]
+    assert names[:2] == ["load_data", "fingerprint"] and {"presolve", "build", "solve", "serialize"} <= set(names)
+    starts = [span["start"] for span in metrics["spans"]]
+    assert starts == sorted(starts)
+    assert metrics["model"]["variables"] == result["model_build"]["num_variables"]
+    assert sum(metrics["model"]["constraints_by_family"].values()) == result["model_build"]["num_constraints"]
+    assert metrics["solver"] == result["solver_stats"]
+    assert _requests("scheduled") == scheduled + 1
+
+
+def test_metrics_route_renders_the_totals(client):
+    seed_catalog(4, 2, num_professors=3, num_rooms=2)
+    diagnosed = _requests("diagnosed")
+    result = client.get("/schedules/generate?num_search_workers=1").get_json()
+    # A section nobody can teach is diagnosed without building a model.
+    course = Course(name="Untaught", credit_hours=3, meeting_days="MWF", max_students=20, slots_needed=1)
+    db.session.add(course)
+    db.session.flush()
+    db.session.add(Section(course_id=course.id, section_number=1))
+    db.session.commit()
+    assert client.get("/schedules/generate").status_code == 400
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    text = response.get_data(as_text=True)
+    assert _requests("diagnosed") == diagnosed + 1
+    assert re.search(r'^scheduler_phase_seconds_count\{phase="solve"\} \d+$', text, re.M)
+    # The last model and solve are the last ones that got that far.
+    assert f"scheduler_last_model_variables {result['model_build']['num_variables']}\n" in text
+    assert f"scheduler_last_objective_value {result['solver_stats']['objective_value']}\n" in text
+
+
+def test_profile_writes_a_dump(client, app, tmp_path):
+    seed_catalog(4, 2, num_professors=3, num_rooms=2)
+    assert client.get("/schedules/generate?profile=true").status_code == 400
+    app.config["SCHEDULE_PROFILE_DIR"] = str(tmp_path)
+    profile = client.get("/schedules/generate?num_search_workers=1&profile=true").get_json()["metrics"]["profile"]
+    assert os.path.dirname(profile["path"]) == str(tmp_path) and os.path.exists(profile["path"])
+    assert profile["top"] and {"function", "calls", "cumulative_seconds", "own_seconds"} <= set(profile["top"][0])
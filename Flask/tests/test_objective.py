@@ -0,0 +1,63 @@
+import pytest
+from models import db, Course, Professor, Room, Section, TimeSlot
+from scheduler import generate_schedule, parse_back_to_back_gap
+from schedule_checks import SOLVER_CONFIG
+
+
+def _seed(slots, num_courses, room_capacities=(30,)):
+    """One professor teaching num_courses single-section MWF courses of 20 students."""
+    db.session.add_all(TimeSlot(time=time, meeting_days="MWF", penalty=penalty) for time, penalty in slots)
+    professor = Professor(name="Dr A", max_credit_hours=3 * num_courses)
+    db.session.add_all([Room(name=f"Room {i}", capacity=capacity) for i, capacity in enumerate(room_capacities)])
+    for i in range(num_courses):
+        course = Course(name=f"Course {i}", credit_hours=3, meeting_days="MWF", max_students=20, slots_needed=1)
+        course.professors = [professor]
+        db.session.add(course)
+        db.session.flush()
+        db.session.add(Section(course_id=course.id, section_number=1))
+    db.session.commit()
+
+
+def _solve(**options):
+    result = generate_schedule(db.session, solver_config=SOLVER_CONFIG, **options)
+    assert result["status"] == "Schedule generated successfully.", result
+    return result
+
+
+def test_classes_in_consecutive_slots_are_back_to_back(app):
+    # Slots 90 minutes apart, like benchmarks.catalog.SLOT_TIMES: 40 minutes between classes.
+    _seed([("8:00AM", 0), ("9:30AM", 0)], num_courses=2)
+    result = _solve(objective_weights={"back_to_back": 1})
+    # Once on each of Monday, Wednesday and Friday.
+    assert result["objective_terms"]["back_to_back"] == 3
+    assert _solve(back_to_back_gap=15)["objective_terms"]["back_to_back"] == 0
+    assert _solve(back_to_back_gap=40)["objective_terms"]["back_to_back"] == 3
+
+
+def test_back_to_back_weight_spreads_a_professors_classes(app):
+    _seed([("8:00AM", 0), ("9:30AM", 0), ("11:00AM", 0)], num_courses=2)
+    result = _solve(objective_weights={"back_to_back": 1})
+    assert result["objective_terms"]["back_to_back"] == 0
+    assert sorted(entry["start_time"] for entry in result["schedule"]) == ["11:00AM", "8:00AM"]
+
+
+def test_time_slot_weight_avoids_penalized_slots(app):
+    _seed([("8:00AM", 5), ("9:30AM", 0)], num_courses=1)
+    result = _solve(objective_weights={"time_slot": 1})
+    assert result["schedule"][0]["start_time"] == "9:30AM"
+    assert result["objective_terms"]["time_slot"] == 0
+
+
+def test_room_fit_weight_picks_the_snuggest_room(app):
+    _seed([("8:00AM", 0)], num_courses=1, room_capacities=(100, 24, 40))
+    result = _solve(objective_weights={"room_fit": 1})
+    assert result["schedule"][0]["room"] == "Room 1"
+    assert result["objective_terms"]["room_fit"] == 4
+
+
+def test_parse_back_to_back_gap():
+    assert parse_back_to_back_gap("20") == 20
+    assert parse_back_to_back_gap("") is None and parse_back_to_back_gap("adjacent") is None
+    for value in ("soon", -5):
+        with pytest.raises(ValueError):
+            parse_back_to_back_gap(value)
@@ -0,0 +1,47 @@
+import pytest
+from scheduler import OBJECTIVE_WEIGHTS, parse_objective_weights, parse_solver_config, parse_stages
+
+
+def test_parse_solver_config_converts_values():
+    parsed = parse_solver_config({"max_time_in_seconds": "30", "num_search_workers": "8",
+                                  "log_search_progress": "true"})
+    assert parsed == {"max_time_in_seconds": 30.0, "num_search_workers": 8, "log_search_progress": True}
+    assert parse_solver_config(None) == {}
+
+
+@pytest.mark.parametrize("solver_config", [
+    {"max_time": 30},
+    {"max_time_in_seconds": "soon"},
+    {"num_search_workers": None},
+    {"log_search_progress": "maybe"},
+])
+def test_parse_solver_config_rejects_bad_input(solver_config):
+    with pytest.raises(ValueError):
+        parse_solver_config(solver_config)
+
+
+def test_parse_stages_keeps_weighted_terms():
+    weights = parse_objective_weights({"time_slot": 2})
+    stages = parse_stages([{"terms": ["load_difference"], "max_time_in_seconds": "5"},
+                           {"terms": ["time_slot", "back_to_back"], "tolerance": "1"}], weights)
+    assert stages == [
+        {"weights": {"load_difference": 1}, "max_time_in_seconds": 5.0, "tolerance": 0},
+        {"weights": {"time_slot": 2}, "max_time_in_seconds": None, "tolerance": 1},
+    ]
+
+
+def test_parse_stages_drops_stages_without_weight():
+    assert parse_stages([{"terms": "room_fit"}], dict(OBJECTIVE_WEIGHTS)) == []
+    assert parse_stages(None, dict(OBJECTIVE_WEIGHTS)) == []
+
+
+@pytest.mark.parametrize("stages", [
+    [{"terms": ["speed"]}],
+    [{"terms": ["load_difference"]}, {"terms": ["load_difference"]}],
+    [{"terms": ["load_difference"], "order": 1}],
+    [{"terms": ["load_difference"], "tolerance": -1}],
+    [{"terms": ["load_difference"], "max_time_in_seconds": "soon"}],
+])
+def test_parse_stages_rejects_bad_input(stages):
+    with pytest.raises(ValueError):
+        parse_stages(stages, dict(OBJECTIVE_WEIGHTS))
@@ -0,0 +1,57 @@
+import pytest
+from models import db, Course, Professor, Room, Section, TimeSlot, TimeRestrictions
+from schedule_presolve import find_infeasibilities
+from schedule_snapshot import load_snapshot
+
+
+def _seed(sections=1, slots=2, slots_needed=1, rooms=1, max_students=20, max_credit_hours=9, qualified=True,
+          restricted=False):
+    """One course taught by one professor in MWF slots an hour apart and rooms of 30 seats."""
+    time_slots = [TimeSlot(time=f"{8 + i}:00AM", meeting_days="MWF") for i in range(slots)]
+    professor = Professor(name="Dr A", max_credit_hours=max_credit_hours)
+    course = Course(name="Course 1", credit_hours=3, meeting_days="MWF", max_students=max_students,
+                    slots_needed=slots_needed)
+    if qualified:
+        course.professors = [professor]
+    db.session.add_all(time_slots + [professor, course] + [Room(name=f"Room {i}", capacity=30) for i in range(rooms)])
+    db.session.flush()
+    db.session.add_all(Section(course_id=course.id, section_number=i + 1) for i in range(sections))
+    if restricted:
+        db.session.add_all(TimeRestrictions(professor_id=professor.id, timeslot_id=ts.id) for ts in time_slots)
+    db.session.commit()
+
+
+def _checks(room_constraint="no_overlap"):
+    return sorted({diagnostic["check"]
+                   for diagnostic in find_infeasibilities(load_snapshot(db.session), room_constraint)})
+
+
+@pytest.mark.parametrize("options, checks", [
+    ({}, []),
+    ({"qualified": False}, ["no_qualified_professor", "professor_credit_hours"]),
+    ({"max_students": 50}, ["no_eligible_room"]),
+    ({"slots_needed": 3}, ["no_time_block", "room_capacity"]),
+    ({"restricted": True}, ["professors_restricted"]),
+    ({"max_credit_hours": 0}, ["professor_credit_hours"]),
+    ({"sections": 3, "slots": 1}, ["professor_time", "room_capacity"]),
+    ({"sections": 3, "rooms": 2}, ["professor_time"]),
+])
+def test_find_infeasibilities(app, options, checks):
+    _seed(**options)
+    assert _checks() == checks
+
+
+def test_global_slot_counts_one_room_per_slot(app):
+    _seed(sections=2, slots=1, rooms=2, max_credit_hours=6)
+    assert _checks() == ["professor_time"]
+    assert _checks("global_slot") == ["professor_time", "room_capacity"]
+
+
+def test_generate_responds_with_the_diagnostics(client):
+    _seed(max_students=50)
+    response = client.get("/schedules/generate")
+    assert response.status_code == 400
+    body = response.get_json()
+    assert [diagnostic["check"] for diagnostic in body["diagnostics"]] == ["no_eligible_room"]
+    assert body["diagnostics"][0]["course_id"] == 1
+    assert "solver_stats" not in body
@@ -0,0 +1,175 @@
+import time
+import pytest
+from config import Config
+from models import db
+from routes.scheduler import scheduler_blueprint
+from benchmarks.catalog import make_app, seed_catalog
+
+
+def test_generate_reports_the_solver_settings_it_used(client):
+    seed_catalog(4, 2, num_professors=3, num_rooms=2)
+    response = client.get("/schedules/generate?max_time_in_seconds=5&num_search_workers=1&relative_gap_limit=0.5")
+    assert response.status_code == 200
+    solver_stats = response.get_json()["solver_stats"]
+    assert solver_stats["status"] in ("OPTIMAL", "FEASIBLE")
+    assert solver_stats["wall_time"] <= 5
+    assert solver_stats["objective_value"] >= solver_stats["best_objective_bound"]
+
+
+@pytest.mark.parametrize("query, message", [
+    ("max_time_in_seconds=soon", "max_time_in_seconds"),
+    ("num_search_workers=many", "num_search_workers"),
+    ("log_search_progress=maybe", "log_search_progress"),
+    ("weight_time_slot=-1", "time_slot"),
+    ("weight_room_fit=lots", "room_fit"),
+    ("back_to_back_gap=short", "back_to_back_gap"),
+    ("layout=grid", "layout"),
+    ("warm_start=yesterday", "warm_start"),
+    ("disruption_weight=high", "disruption_weight"),
+    ("lns_budget=forever", "lns_budget"),
+    ("staged=true&stage_seconds=a,b", "stage_seconds"),
+    ("profile=true", "SCHEDULE_PROFILE_DIR"),
+])
+def test_generate_rejects_bad_query(client, query, message):
+    response = client.get(f"/schedules/generate?{query}")
+    assert response.status_code == 400
+    assert message in response.get_json()["error"]
+
+
+@pytest.mark.parametrize("body, message", [
+    (["courses"], "JSON object"),
+    ({"courses": "abc"}, "courses must be a list of integer ids"),
+    ({"courses": ["a"]}, "courses must be a list of integer ids"),
+    ({"rooms": [True]}, "rooms must be a list of integer ids"),
+    ({"teachers": [1]}, "teachers"),
+])
+def test_resolve_rejects_bad_changes(client, body, message):
+    response = client.post("/schedules/resolve", json=body)
+    assert response.status_code == 400
+    assert message in response.get_json()["error"]
+
+
+@pytest.mark.parametrize("body, message", [
+    ({"time": "8:00AM", "meeting_days": "XYZ"}, "meeting days"),
+    ({"time": "8:00AM", "meeting_days": "MWF", "penalty": None}, "penalty"),
+    ({"time": "8:00AM", "meeting_days": "MWF", "penalty": -1}, "penalty"),
+    ({"meeting_days": "MWF", "start_time": "noon"}, "start_time"),
+    ({"meeting_days": "MWF", "start_minute": 600, "end_minute": 500}, "start before its end"),
+    ({"time": "whenever", "meeting_days": "MWF"}, "8:00AM"),
+])
+def test_add_time_slot_rejects_bad_input(client, body, message):
+    response = client.post("/time_slots", json=body)
+    assert response.status_code == 400
+    assert message in response.get_json()["error"]
+
+
+def test_add_time_slot(client):
+    response = client.post("/time_slots", json={"time": "6:00PM-8:45PM", "meeting_days": "TR", "penalty": 2})
+    assert response.status_code == 201
+    response = client.post("/time_slots", json={"meeting_days": "MWF", "start_time": "9:00AM", "end_minute": 590})
+    assert response.status_code == 201
+    ranged, timed = client.get("/time_slots").get_json()
+    # Minutes are only stored when given; otherwise the solver reads them from time.
+    assert (ranged["meeting_days"], ranged["start_minute"], ranged["penalty"]) == ("TTh", None, 2)
+    assert (timed["time"], timed["start_minute"], timed["end_minute"], timed["penalty"]) == ("9:00AM-9:50AM", 540, 590, 0)
+
+
+@pytest.mark.parametrize("body", [
+    {"name": "Math 101", "credit_hours": 3, "meeting_Days": "MWF"},
+    {"name": "Math 101", "credit_hours": 3, "meeting_Days": "Mondays", "max_students": 30},
+])
+def test_add_course_rejects_bad_input(client, body):
+    assert client.post("/courses", json=body).status_code == 400
+
+
+def test_courses_crud(client):
+    client.post("/professors", json={"name": "Dr. Smith", "max_credit_hours": 6})
+    client.post("/rooms", json={"name": "Room A", "capacity": 40})
+    response = client.post("/courses", json={"name": "Math 101", "credit_hours": 3, "meeting_Days": "MWF",
+                                             "max_students": 30, "numberOfSections": 2, "professors": [1],
+                                             "rooms": [1]})
+    assert response.status_code == 201
+    [course] = client.get("/courses").get_json()
+    assert (course["name"], course["number_of_sections"], course["professors"]) == ("Math 101", 2, ["Dr. Smith"])
+    response = client.put(f"/courses/{course['id']}", json={"meeting_days": "TR", "numberOfSections": 1})
+    assert response.status_code == 200
+    course = client.get(f"/courses/{course['id']}").get_json()
+    assert (course["meeting_days"], course["number_of_sections"]) == ("TTh", 1)
+    assert [room["name"] for room in course["rooms"]] == ["Room A"]
+    assert client.delete(f"/courses/{course['id']}").status_code == 200
+    assert client.get("/courses").get_json() == []
+    assert client.delete(f"/courses/{course['id']}").status_code == 404
+
+
+def test_professors_crud(client):
+    client.post("/time_slots", json={"time": "8:00AM-8:50AM", "meeting_days": "MWF"})
+    response = client.post("/professors", json={"name": "Dr. Smith", "max_credit_hours": 6,
+                                                "timeSlotRestrictions": [1]})
+    assert response.status_code == 201
+    [professor] = client.get("/professors").get_json()
+    assert professor["name"] == "Dr. Smith"
+    response = client.put(f"/professors/{professor['id']}", json={"max_credit_hours": 9})
+    assert response.status_code == 200
+    professor = client.get(f"/professors/{professor['id']}").get_json()
+    assert (professor["max_credit_hours"], professor["timeSlotRestrictions"]) == (9, [1])
+    assert client.delete(f"/professors/{professor['id']}").status_code == 200
+    assert client.get(f"/professors/{professor['id']}").status_code == 404
+
+
+def test_rooms_crud(client):
+    assert client.post("/rooms", json={"name": "Room A", "capacity": 40}).status_code == 201
+    [room] = client.get("/rooms").get_json()
+    assert client.put(f"/rooms/{room['id']}", json={"name": "Hall", "capacity": 120}).status_code == 200
+    assert client.get(f"/rooms/{room['id']}").get_json() == {"id": room["id"], "name": "Hall", "capacity": 120}
+    assert client.delete(f"/rooms/{room['id']}").status_code == 200
+    assert client.get(f"/rooms/{room['id']}").status_code == 404
+
+
+def test_delete_time_slot(client):
+    client.post("/time_slots", json={"time": "8:00AM-8:50AM", "meeting_days": "MWF"})
+    [slot] = client.get("/time_slots").get_json()
+    assert client.delete(f"/time_slots/{slot['id']}").status_code == 200
+    assert client.get("/time_slots").get_json() == []
+    assert client.delete(f"/time_slots/{slot['id']}").status_code == 404
+
+
+def test_resolve_saves_a_new_version(client):
+    seed_catalog(4, 2, num_professors=3, num_rooms=2)
+    saved = client.get("/schedules/generate?num_search_workers=1&random_seed=0&save=true").get_json()
+    response = client.post("/schedules/resolve?num_search_workers=1&random_seed=0&save=true", json={"rooms": [1]})
+    assert response.status_code == 200, response.get_json()
+    result = response.get_json()
+    assert result["version"] > saved["version"]
+    assert len(result["schedule"]) == 8
+    assert result["incremental"]["locked_sections"] + result["incremental"]["reoptimized_sections"] == 8
+
+
+def test_schedule_jobs(tmp_path):
+    # Solver processes open their own connection, so the catalog has to live in a file.
+    app = make_app(f"sqlite:///{tmp_path / 'catalog.db'}")
+    app.config.from_object(Config)
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path / 'catalog.db'}"
+    app.config["SCHEDULE_JOB_STORE"] = "memory"
+    app.config["SCHEDULE_JOB_WORKERS"] = 1
+    app.register_blueprint(scheduler_blueprint)
+    with app.app_context():
+        db.create_all()
+        seed_catalog(4, 2, num_professors=3, num_rooms=2)
+    client = app.test_client()
+
+    response = client.post("/schedules/jobs?num_search_workers=1&random_seed=0&max_time_in_seconds=20")
+    assert response.status_code == 202
+    job_id = response.get_json()["job_id"]
+    deadline = time.time() + 60
+    while client.get(f"/schedules/jobs/{job_id}").get_json()["status"] in ("queued", "running"):
+        assert time.time() < deadline
+        time.sleep(0.1)
+    assert client.get(f"/schedules/jobs/{job_id}").get_json()["status"] == "finished"
+    response = client.get(f"/schedules/jobs/{job_id}/result")
+    assert response.status_code == 200
+    assert len(response.get_json()["schedule"]) == 8
+    # Cancelling a finished job leaves it as it is.
+    assert client.post(f"/schedules/jobs/{job_id}/cancel").get_json()["status"] == "finished"
+    for path in ("", "/result"):
+        assert client.get(f"/schedules/jobs/missing{path}").status_code == 404
+    assert client.post("/schedules/jobs/missing/cancel").status_code == 404
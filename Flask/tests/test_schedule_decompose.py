@@ -0,0 +1,80 @@
+from immutabledict import immutabledict
+from models import db, Course, Professor, Room, Section, TimeSlot
+from scheduler import generate_schedule
+from schedule_decompose import course_components
+from schedule_snapshot import CourseRow, RoomRow, SectionRow, load_snapshot
+from benchmarks.catalog import seed_departments
+from schedule_checks import SOLVER_CONFIG, assert_valid, schedule_keys
+
+
+def _inputs(course_to_professors, rooms, room_restrictions_map=None, sizes=None):
+    courses = [CourseRow(course_id, f"Course {course_id}", 3, "MWF", 1, (sizes or {}).get(course_id, 20))
+               for course_id in course_to_professors]
+    return immutabledict({
+        "courses": courses,
+        "rooms": rooms,
+        "course_to_professors": course_to_professors,
+        "room_restrictions_map": room_restrictions_map or {},
+        "sections_by_course": {course.id: [SectionRow(course.id, course.id, 1)] for course in courses},
+    })
+
+
+def test_courses_sharing_a_professor_are_one_component():
+    inputs = _inputs({1: [10], 2: [10, 11], 3: [11], 4: [12]}, [RoomRow(1, "Room", 30)])
+    assert course_components(inputs, share_rooms=False) == [[1, 2, 3], [4]]
+    # All four can use the only room.
+    assert course_components(inputs) == [[1, 2, 3, 4]]
+
+
+def test_rooms_link_courses_only_where_they_fit():
+    rooms = [RoomRow(1, "Small", 30), RoomRow(2, "Lab", 30), RoomRow(3, "Hall", 100)]
+    inputs = _inputs({1: [10], 2: [11], 3: [12]}, rooms, room_restrictions_map={2: [2]}, sizes={1: 80})
+    # Course 1 only fits the hall, course 2 is restricted to the lab and course 3 fits all three.
+    assert course_components(inputs) == [[1, 2, 3]]
+    inputs = _inputs({1: [10], 2: [11]}, rooms, room_restrictions_map={2: [2]}, sizes={1: 80})
+    assert course_components(inputs) == [[1], [2]]
+
+
+def test_courses_without_sections_are_left_out():
+    inputs = _inputs({1: [10], 2: [10]}, [])
+    inputs = inputs.set("sections_by_course", {1: inputs["sections_by_course"][1]})
+    assert course_components(inputs) == [[1]]
+
+
+def test_sequential_components_keep_the_break_of_a_block(app):
+    # The lab holds its room from 8:00 to 10:20 on MWF, break included, and the only
+    # cheap MW slot falls into that break.
+    db.session.add_all([
+        TimeSlot(time="8:00AM-8:50AM", meeting_days="MWF"),
+        TimeSlot(time="9:30AM-10:20AM", meeting_days="MWF"),
+        TimeSlot(time="9:00AM-9:20AM", meeting_days="MW"),
+        TimeSlot(time="11:00AM-11:50AM", meeting_days="MW", penalty=5),
+        Room(name="Room 1", capacity=30),
+    ])
+    for name, meeting_days, slots_needed in (("Lab", "MWF", 2), ("Seminar", "MW", 1)):
+        course = Course(name=name, credit_hours=3, meeting_days=meeting_days, max_students=20,
+                        slots_needed=slots_needed)
+        course.professors = [Professor(name=f"{name} professor", max_credit_hours=3)]
+        db.session.add(course)
+        db.session.flush()
+        db.session.add(Section(course_id=course.id, section_number=1))
+    db.session.commit()
+
+    result = generate_schedule(db.session, solver_config=SOLVER_CONFIG, decompose=True,
+                               objective_weights={"time_slot": 1})
+    assert result["model_build"]["decomposition"]["mode"] == "sequential"
+    inputs = load_snapshot(db.session)
+    assert_valid(inputs, schedule_keys(inputs, result["schedule"]))
+    seminar = next(entry for entry in result["schedule"] if entry["course_name"] == "Seminar")
+    assert seminar["time_slots"] == ["11:00AM-11:50AM"]
+
+
+def test_independent_departments_are_solved_separately(app):
+    seed_departments(3, 3, 2, professors_per_department=2, rooms_per_department=2)
+    result = generate_schedule(db.session, solver_config=SOLVER_CONFIG, decompose=True)
+    assert result["status"] == "Schedule generated successfully.", result
+    decomposition = result["model_build"]["decomposition"]
+    assert decomposition["mode"] == "independent"
+    assert [component["sections"] for component in decomposition["components"]] == [6, 6, 6]
+    inputs = load_snapshot(db.session)
+    assert_valid(inputs, schedule_keys(inputs, result["schedule"]))
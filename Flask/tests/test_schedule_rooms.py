@@ -0,0 +1,59 @@
+import pytest
+from immutabledict import immutabledict
+from models import db
+from scheduler import generate_schedule
+from schedule_rooms import assign_rooms
+from schedule_snapshot import CourseRow, RoomRow, load_snapshot
+from benchmarks.catalog import seed_synthetic
+from schedule_checks import SOLVER_CONFIG, assert_valid, schedule_keys
+
+
+def _inputs(course_sizes, room_capacities):
+    return immutabledict({
+        "courses_dict": {course_id: CourseRow(course_id, f"Course {course_id}", 3, "MWF", 1, size)
+                         for course_id, size in course_sizes.items()},
+        "rooms_dict": {room_id: RoomRow(room_id, f"Room {room_id}", capacity)
+                       for room_id, capacity in room_capacities.items()},
+    })
+
+
+def test_rooms_go_to_the_classes_that_need_them():
+    inputs = _inputs({1: 25, 2: 50}, {1: 30, 2: 60})
+    # Section 1 fits both rooms and comes first, but taking the large room would leave none for section 2.
+    placements = [(1, 1, "MWF", 540, [0], [1, 2]), (2, 2, "MWF", 540, [0], [2])]
+    assert assign_rooms(placements, inputs) == {1: 1, 2: 2}
+
+
+def test_the_smallest_room_that_fits_is_chosen():
+    inputs = _inputs({1: 25}, {1: 100, 2: 30, 3: 60})
+    assert assign_rooms([(1, 1, "MWF", 540, [0], [1, 2, 3])], inputs) == {1: 2}
+
+
+def test_a_room_is_reused_once_free():
+    inputs = _inputs({1: 25}, {1: 30})
+    placements = [(1, 1, "MWF", 540, [0], [1]), (2, 1, "MWF", 600, [1], [1])]
+    assert assign_rooms(placements, inputs) == {1: 1, 2: 1}
+
+
+def test_overlapping_classes_cannot_share_the_only_room():
+    inputs = _inputs({1: 25}, {1: 30})
+    # A long class holding atoms 0 and 1, and one starting later in atom 1.
+    placements = [(1, 1, "MWF", 540, [0, 1], [1]), (2, 1, "MWF", 600, [1], [1])]
+    assert assign_rooms(placements, inputs) is None
+
+
+def test_two_stage_matches_rooms_after_solving(app):
+    seed_synthetic(12, 2, num_professors=6, num_rooms=4, qualification_density=0.3, seed=3)
+    result = generate_schedule(db.session, formulation="two_stage", solver_config=SOLVER_CONFIG,
+                               objective_weights={"room_fit": 1})
+    assert result["model_build"]["room_matching"]["status"] == "MATCHED"
+    inputs = load_snapshot(db.session)
+    assert_valid(inputs, schedule_keys(inputs, result["schedule"]))
+    assert result["solver_stats"]["objective_value"] == (
+        result["objective_terms"]["load_difference"] + result["objective_terms"]["room_fit"])
+
+
+@pytest.mark.parametrize("options", [{"decompose": True}, {"lns_budget": 1}, {"room_constraint": "global_slot"}])
+def test_two_stage_rejects_what_it_cannot_combine_with(app, options):
+    with pytest.raises(ValueError):
+        generate_schedule(db.session, formulation="two_stage", **options)
@@ -0,0 +1,103 @@
+import pytest
+from models import db, Course, Professor, Room, Section, TimeSlot
+from scheduler import generate_schedule
+from schedule_snapshot import TimeSlotRow
+from schedule_store import load_schedule
+from schedule_time import TimeAxis, day_mask, normalize_days, parse_clock, slot_minutes
+from schedule_checks import SOLVER_CONFIG
+
+
+@pytest.mark.parametrize("text, minute", [
+    ("8:00AM", 480),
+    ("8 am", 480),
+    ("12:00PM", 720),
+    ("12:30AM", 30),
+    ("2:30PM", 870),
+    ("2:30", 870),
+    ("14:30", 870),
+    ("9:15", 555),
+])
+def test_parse_clock(text, minute):
+    assert parse_clock(text) == minute
+
+
+@pytest.mark.parametrize("text", ["", "8", "13:00PM", "8:75AM", "noon", None])
+def test_parse_clock_rejects_other_text(text):
+    assert parse_clock(text) is None
+
+
+def test_day_mask():
+    assert day_mask("MWF") == 1 | 4 | 16
+    assert day_mask("TTh") == day_mask("TR") == 2 | 8
+    assert normalize_days("TR") == "TTh"
+    for pattern in ("", "MX", "mwf", None):
+        with pytest.raises(ValueError):
+            day_mask(pattern)
+
+
+def test_slot_minutes():
+    assert slot_minutes("8:00AM") == (480, 530)
+    assert slot_minutes("6:00PM-8:45PM") == (1080, 1245)
+    assert slot_minutes("1:00-2:15PM") == (780, 855)
+    assert slot_minutes("whenever") is None
+    assert slot_minutes(None, 600, 650) == (600, 650)
+
+
+def _slot(ts_id, pattern, start, end):
+    return TimeSlotRow(ts_id, None, pattern, 0, start, end, day_mask(pattern))
+
+
+def test_time_axis_overlap_follows_clock_time():
+    slots = [
+        _slot(1, "MWF", 540, 590),   # MWF 9:00-9:50
+        _slot(2, "MW", 540, 615),    # MW 9:00-10:15
+        _slot(3, "MWF", 600, 650),   # MWF 10:00-10:50
+        _slot(4, "TTh", 540, 615),   # TTh 9:00-10:15
+        TimeSlotRow(5, "whenever", "MWF", 0, None, None, day_mask("MWF")),
+    ]
+    axis = TimeAxis(slots)
+    assert axis.overlapping[1] == {1, 2}
+    assert axis.overlapping[2] == {1, 2, 3}
+    assert axis.overlapping[4] == {4}
+    assert 5 not in axis.overlapping
+    assert axis.overlaps([3], [2]) and not axis.overlaps([1], [3, 4])
+    # Monday/Wednesday and Friday carry different slots, so they are separate groups.
+    assert sorted(axis.groups) == sorted([1 | 4, 16, 2 | 8])
+    assert axis.block_bounds([1, 3]) == [(group, 540, 650) for group, _, _ in axis.block_spans([1, 3])]
+    # Only the two MWF slots follow one another, once in each of their two groups.
+    assert sorted((end, start) for _, end, start in axis.adjacent) == [(590, 600), (590, 600)]
+
+
+def _seed(slots, meeting_days="MWF"):
+    """One section of a one-slot course in meeting_days, and slots as (time, days)."""
+    db.session.add_all(TimeSlot(time=time, meeting_days=days) for time, days in slots)
+    professor = Professor(name="Dr A", max_credit_hours=3)
+    db.session.add(Room(name="Room 1", capacity=30))
+    course = Course(name="Course 1", credit_hours=3, meeting_days=meeting_days, max_students=20, slots_needed=1)
+    course.professors = [professor]
+    db.session.add(course)
+    db.session.flush()
+    db.session.add(Section(course_id=course.id, section_number=1))
+    db.session.commit()
+
+
+def test_unreadable_time_slot_is_a_warning(app):
+    _seed([("8:00AM", "MWF"), ("whenever", "MWF")])
+    result = generate_schedule(db.session, solver_config=SOLVER_CONFIG)
+    assert result["status"] == "Schedule generated successfully.", result
+    assert [warning["check"] for warning in result["warnings"]] == ["unreadable_time_slot"]
+    assert result["schedule"][0]["time_slots"] == ["8:00AM"]
+
+
+def test_course_without_a_readable_time_slot_is_refused(app):
+    _seed([("whenever", "MWF"), ("8:00AM", "TTh")])
+    result = generate_schedule(db.session, solver_config=SOLVER_CONFIG)
+    assert "no_time_block" in [diagnostic["check"] for diagnostic in result["diagnostics"]]
+    assert [warning["check"] for warning in result["warnings"]] == ["unreadable_time_slot"]
+
+
+def test_saved_schedule_has_canonical_days(app):
+    _seed([("9:30AM", "TR")], meeting_days="TR")
+    result = generate_schedule(db.session, solver_config=SOLVER_CONFIG, persist=True)
+    assert result["schedule"][0]["days"] == "TTh"
+    assert load_schedule(result["version"])["schedule"][0]["days"] == "TTh"
@@ -0,0 +1,55 @@
+import pytest
+from models import db, Course, Professor, Room, Section, TimeSlot
+from scheduler import generate_schedule
+from schedule_checks import SOLVER_CONFIG
+
+WEIGHTS = {"load_difference": 0, "time_slot": 1, "back_to_back": 10}
+
+
+@pytest.fixture
+def catalog(app):
+    """Two MWF courses of one professor: 8:00 and 9:30 are free but back to back, 11:00 costs 1."""
+    db.session.add_all(TimeSlot(time=time, meeting_days="MWF", penalty=penalty)
+                       for time, penalty in (("8:00AM", 0), ("9:30AM", 0), ("11:00AM", 1)))
+    professor = Professor(name="Dr A", max_credit_hours=6)
+    db.session.add(Room(name="Room 1", capacity=30))
+    for i in range(2):
+        course = Course(name=f"Course {i}", credit_hours=3, meeting_days="MWF", max_students=20, slots_needed=1)
+        course.professors = [professor]
+        db.session.add(course)
+        db.session.flush()
+        db.session.add(Section(course_id=course.id, section_number=1))
+    db.session.commit()
+
+
+def _start_times(result):
+    return sorted(entry["start_time"] for entry in result["schedule"])
+
+
+def test_weighted_sum_trades_terms_against_each_other(catalog):
+    result = generate_schedule(db.session, solver_config=SOLVER_CONFIG, objective_weights=WEIGHTS)
+    assert _start_times(result) == ["11:00AM", "8:00AM"]
+
+
+def test_stages_minimize_earlier_terms_first(catalog):
+    stages = [{"terms": ["time_slot"]}, {"terms": ["back_to_back"]}]
+    result = generate_schedule(db.session, solver_config=SOLVER_CONFIG, objective_weights=WEIGHTS, stages=stages)
+    assert _start_times(result) == ["8:00AM", "9:30AM"]
+    assert [stage["terms"] for stage in result["solver_stats"]["stages"]] == [["time_slot"], ["back_to_back"]]
+    assert result["objective_terms"]["time_slot"] == 0
+    assert result["solver_stats"]["objective_value"] == 10 * result["objective_terms"]["back_to_back"]
+
+
+def test_tolerance_lets_later_stages_worsen_earlier_ones(catalog):
+    # Moving a class to 11:00 costs 1, which the tolerance allows.
+    stages = [{"terms": ["time_slot"], "tolerance": 1}, {"terms": ["back_to_back"]}]
+    result = generate_schedule(db.session, solver_config=SOLVER_CONFIG, objective_weights=WEIGHTS, stages=stages)
+    assert result["objective_terms"]["back_to_back"] == 0
+
+
+def test_route_stages_the_default_terms(client, catalog):
+    response = client.get("/schedules/generate?num_search_workers=1&weight_time_slot=1&staged=true&stage_seconds=5,5")
+    assert response.status_code == 200
+    stages = response.get_json()["solver_stats"]["stages"]
+    assert [stage["terms"] for stage in stages] == [["load_difference"], ["time_slot"]]
+    assert [stage["max_time_in_seconds"] for stage in stages] == [5, 5]
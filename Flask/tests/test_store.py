@@ -0,0 +1,42 @@
+from models import db
+from scheduler import generate_schedule
+from schedule_snapshot import load_snapshot
+from schedule_store import latest_version_id, load_assignments, load_schedule
+from benchmarks.catalog import seed_synthetic
+from schedule_checks import SOLVER_CONFIG, schedule_keys
+
+
+def _by_section(schedule):
+    return sorted(schedule, key=lambda entry: entry["section_id"])
+
+
+def test_saved_version_reads_back_as_generated(app):
+    seed_synthetic(12, 2, num_professors=6, num_rooms=4, qualification_density=0.3, seed=3)
+    inputs = load_snapshot(db.session)
+    assert latest_version_id() is None
+    result = generate_schedule(db.session, solver_config=SOLVER_CONFIG, persist=True)
+    assert latest_version_id() == result["version"]
+
+    saved = load_schedule(result["version"])
+    assert saved["version"]["objective_value"] == result["solver_stats"]["objective_value"]
+    assert _by_section(saved["schedule"]) == _by_section(result["schedule"])
+    assert load_assignments(result["version"]) == {
+        section_id: (prof_id, room_id, block)
+        for section_id, _, prof_id, _, block, room_id in schedule_keys(inputs, result["schedule"])
+    }
+    assert load_schedule(result["version"] + 1) is None
+
+
+def test_versions_are_kept_side_by_side(client):
+    seed_synthetic(12, 2, num_professors=6, num_rooms=4, qualification_density=0.3, seed=3)
+    assert client.get("/schedules/latest").status_code == 404
+    first = client.get("/schedules/generate?num_search_workers=1&save=true").get_json()
+    second = client.get("/schedules/generate?num_search_workers=1&save=true").get_json()
+    assert second["version"] == first["version"] + 1
+
+    response = client.get(f"/schedules/{first['version']}")
+    assert response.status_code == 200
+    assert response.get_json()["version"]["id"] == first["version"]
+    assert _by_section(response.get_json()["schedule"]) == _by_section(first["schedule"])
+    assert client.get("/schedules/latest").get_json()["version"]["id"] == second["version"]
+    assert client.get(f"/schedules/{second['version'] + 1}").status_code == 404
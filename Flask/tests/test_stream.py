@@ -0,0 +1,47 @@
+import json
+from models import db
+from scheduler import generate_schedule
+from benchmarks.catalog import seed_catalog
+from schedule_checks import SOLVER_CONFIG
+
+
+def _events(response):
+    """(event, data) of every Server-Sent Event in a finished response."""
+    events = []
+    for message in response.get_data(as_text=True).split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in message.splitlines() if not line.startswith(":"))
+        if lines:
+            events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_stream_sends_improving_solutions_then_the_result(client):
+    seed_catalog(6, 2, num_professors=4, num_rooms=3)
+    response = client.get("/schedules/generate/stream?num_search_workers=1&random_seed=0&save=true")
+    assert response.status_code == 200
+    assert response.mimetype == "text/event-stream"
+    events = _events(response)
+    names = [event for event, _ in events]
+    assert names[-1] == "result" and set(names[:-1]) == {"solution"}
+    objectives = [data["objective_value"] for event, data in events if event == "solution"]
+    assert objectives == sorted(objectives, reverse=True)
+    result = events[-1][1]
+    assert result["status"] == "Schedule generated successfully."
+    assert result["solver_stats"]["objective_value"] == objectives[-1]
+    assert len(events[-2][1]["schedule"]) == len(result["schedule"]) == 12
+    assert client.get("/schedules/latest").get_json()["version"]["id"] == result["version"]
+
+
+def test_stream_rejects_bad_query_before_streaming(client):
+    response = client.get("/schedules/generate/stream?max_time_in_seconds=soon")
+    assert response.status_code == 400
+    assert "max_time_in_seconds" in response.get_json()["error"]
+
+
+def test_on_solution_can_stop_the_search(app):
+    seed_catalog(6, 2, num_professors=4, num_rooms=3)
+    solutions = []
+    result = generate_schedule(db.session, solver_config=SOLVER_CONFIG,
+                               on_solution=lambda solution: solutions.append(solution) or True)
+    assert result["status"] == "Schedule generated successfully."
+    assert len(solutions) == result["solver_stats"]["solutions"] == 1
@@ -0,0 +1,43 @@
+import pytest
+from models import db, Room
+from scheduler import generate_schedule
+from benchmarks.catalog import seed_catalog
+from schedule_checks import SOLVER_CONFIG
+
+
+@pytest.fixture
+def saved(app):
+    seed_catalog(6, 2, num_professors=4, num_rooms=3)
+    return generate_schedule(db.session, solver_config=SOLVER_CONFIG, persist=True)
+
+
+def test_warm_start_hints_the_saved_schedule(saved):
+    result = generate_schedule(db.session, solver_config=SOLVER_CONFIG, warm_start=True)
+    assert result["warm_start"]["version"] == saved["version"]
+    assert result["warm_start"]["hinted_sections"] == len(saved["schedule"])
+
+
+def test_disruption_weight_keeps_sections_in_place(saved):
+    # A new room gives every section somewhere else to go, but moving costs more than it gains.
+    db.session.add(Room(name="New room", capacity=100))
+    db.session.commit()
+    newer = generate_schedule(db.session, solver_config=SOLVER_CONFIG, persist=True)
+    result = generate_schedule(db.session, solver_config=SOLVER_CONFIG, warm_start=saved["version"],
+                               disruption_weight=100)
+    assert result["warm_start"]["version"] == saved["version"] != newer["version"]
+    assert result["warm_start"]["changed_sections"] == 0
+    assert result["schedule"] == saved["schedule"]
+
+
+def test_warm_start_without_a_saved_schedule(app):
+    seed_catalog(2, 1, num_professors=2, num_rooms=1)
+    result = generate_schedule(db.session, solver_config=SOLVER_CONFIG, warm_start=True)
+    assert result["status"] == "Schedule generated successfully."
+    assert result["warm_start"] == {"version": None, "hinted_sections": 0, "changed_sections": 0}
+
+
+def test_route_warm_starts_from_latest(client):
+    seed_catalog(6, 2, num_professors=4, num_rooms=3)
+    saved = client.get("/schedules/generate?num_search_workers=1&save=true").get_json()
+    result = client.get("/schedules/generate?num_search_workers=1&warm_start=latest&disruption_weight=1").get_json()
+    assert result["warm_start"]["version"] == saved["version"]
@@ -0,0 +1,9 @@
+-- Allows any meeting pattern (MW, TTh, Th, ...) instead of MWF or TTh, and stores
+-- when a time slot starts and ends (TimeSlot.start_minute and end_minute).
+
+ALTER TABLE Courses MODIFY meeting_days VARCHAR(14) NOT NULL;
+
+ALTER TABLE Time_Slots
+    MODIFY meeting_days VARCHAR(14) NOT NULL,
+    ADD COLUMN start_minute INT NULL,
+    ADD COLUMN end_minute INT NULL;
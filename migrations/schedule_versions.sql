@@ -0,0 +1,21 @@
+-- Saves generated schedules as versions (ScheduleVersion, Schedule.version_id).
+-- db.create_all() creates Schedule_Versions but does not add version_id to an
+-- existing Schedule table, which saving a schedule needs.
+
+CREATE TABLE IF NOT EXISTS Schedule_Versions (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    created_at DATETIME NOT NULL,
+    objective_value FLOAT NULL
+);
+
+ALTER TABLE Schedule ADD COLUMN version_id INT NULL;
+
+-- Rows saved before versions existed become one version of their own.
+INSERT INTO Schedule_Versions (created_at)
+SELECT UTC_TIMESTAMP() FROM DUAL WHERE EXISTS (SELECT 1 FROM Schedule);
+UPDATE Schedule SET version_id = LAST_INSERT_ID() WHERE version_id IS NULL;
+
+ALTER TABLE Schedule
+    MODIFY version_id INT NOT NULL,
+    ADD INDEX ix_Schedule_version_id (version_id),
+    ADD FOREIGN KEY (version_id) REFERENCES Schedule_Versions (id) ON DELETE CASCADE;
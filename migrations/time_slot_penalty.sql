@@ -0,0 +1,5 @@
+-- Adds the penalty of holding a class in a time slot (TimeSlot.penalty).
+-- db.create_all() does not add columns to existing tables, so databases created
+-- before the column existed need this once.
+
+ALTER TABLE Time_Slots ADD COLUMN penalty INT NOT NULL DEFAULT 0;